@@ -1,24 +1,23 @@
-from typing import Annotated, Any, cast
+from typing import Annotated, Any
 
-from fastapi import Depends, HTTPException, Request
+from fastapi import Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.config import settings
 from ..core.db.database import async_get_db
 from ..core.exceptions.http_exceptions import ForbiddenException, RateLimitException, UnauthorizedException
 from ..core.logger import logging
-from ..core.security import TokenType, oauth2_scheme, verify_token
+from ..core.security import TokenType, oauth2_scheme, principal_tag, principals, verify_token
 from ..core.utils.rate_limit import rate_limiter
-from ..crud.crud_rate_limit import crud_rate_limits
-from ..crud.crud_tier import crud_tiers
 from ..crud.crud_users import crud_users
-from ..schemas.rate_limit import RateLimitRead, sanitize_path
-from ..schemas.tier import TierRead
+from ..schemas.rate_limit import RateLimitAlgorithm, sanitize_path
+from ..schemas.user import UserPrincipal
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_LIMIT = settings.DEFAULT_RATE_LIMIT_LIMIT
 DEFAULT_PERIOD = settings.DEFAULT_RATE_LIMIT_PERIOD
+DEFAULT_ALGORITHM = RateLimitAlgorithm(settings.DEFAULT_RATE_LIMIT_ALGORITHM)
 
 
 async def get_current_user(
@@ -28,15 +27,21 @@ async def get_current_user(
     if token_data is None:
         raise UnauthorizedException("User not authenticated.")
 
-    if "@" in token_data.username_or_email:
-        user = await crud_users.get(db=db, email=token_data.username_or_email, is_deleted=False)
-    else:
-        user = await crud_users.get(db=db, username=token_data.username_or_email, is_deleted=False)
+    subject = token_data.username_or_email
+    user = principals.get(subject)
+    if user is None:
+        if "@" in subject:
+            db_user = await crud_users.get(db=db, email=subject, is_deleted=False)
+        else:
+            db_user = await crud_users.get(db=db, username=subject, is_deleted=False)
 
-    if user:
-        return cast(dict[str, Any], user)
+        if not db_user:
+            raise UnauthorizedException("User not authenticated.")
+
+        user = UserPrincipal.model_validate(db_user).model_dump()
+        principals.set(subject, user, tags=[principal_tag(user["username"])])
 
-    raise UnauthorizedException("User not authenticated.")
+    return dict(user)
 
 
 async def get_optional_user(request: Request, db: AsyncSession = Depends(async_get_db)) -> dict | None:
@@ -49,10 +54,6 @@ async def get_optional_user(request: Request, db: AsyncSession = Depends(async_g
         if token_type.lower() != "bearer" or not token_value:
             return None
 
-        token_data = await verify_token(token_value, TokenType.ACCESS, db)
-        if token_data is None:
-            return None
-
         return await get_current_user(token_value, db=db)
 
     except HTTPException as http_exc:
@@ -82,34 +83,42 @@ async def get_current_admin_user(current_user: Annotated[dict, Depends(get_curre
 
 
 async def rate_limiter_dependency(
-    request: Request, db: Annotated[AsyncSession, Depends(async_get_db)], user: dict | None = Depends(get_optional_user)
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    user: dict | None = Depends(get_optional_user),
 ) -> None:
     if hasattr(request.app.state, "initialization_complete"):
         await request.app.state.initialization_complete.wait()
 
     path = sanitize_path(request.url.path)
+    limit, period, algorithm = DEFAULT_LIMIT, DEFAULT_PERIOD, DEFAULT_ALGORITHM
     if user:
         user_id = user["id"]
-        tier = await crud_tiers.get(db, id=user["tier_id"], schema_to_select=TierRead)
-        if tier:
-            tier = cast(TierRead, tier)
-            rate_limit = await crud_rate_limits.get(db=db, tier_id=tier.id, path=path, schema_to_select=RateLimitRead)
-            if rate_limit:
-                rate_limit = cast(RateLimitRead, rate_limit)
-                limit, period = rate_limit.limit, rate_limit.period
+        rules = rate_limiter.rules
+        if not rules.loaded:
+            await rules.load(db)
+
+        tier_name = rules.tiers.get(user["tier_id"])
+        if tier_name is not None:
+            rule = rules.get(user["tier_id"], path)
+            if rule:
+                limit, period = rule.limit, rule.period
+                algorithm = rule.algorithm or DEFAULT_ALGORITHM
             else:
                 logger.warning(
-                    f"User {user_id} with tier '{tier.name}' has no specific rate limit for path '{path}'. \
+                    f"User {user_id} with tier '{tier_name}' has no specific rate limit for path '{path}'. \
                         Applying default rate limit."
                 )
-                limit, period = DEFAULT_LIMIT, DEFAULT_PERIOD
         else:
             logger.warning(f"User {user_id} has no assigned tier. Applying default rate limit.")
-            limit, period = DEFAULT_LIMIT, DEFAULT_PERIOD
     else:
         user_id = request.client.host if request.client else "unknown"
-        limit, period = DEFAULT_LIMIT, DEFAULT_PERIOD
 
-    is_limited = await rate_limiter.is_rate_limited(db=db, user_id=user_id, path=path, limit=limit, period=period)
-    if is_limited:
-        raise RateLimitException("Rate limit exceeded.")
+    result = await rate_limiter.check(
+        user_id=user_id, path=path, limit=limit, period=period, algorithm=algorithm, approximate=user is None
+    )
+    if result.limited:
+        raise RateLimitException("Rate limit exceeded.", headers=result.headers)
+
+    response.headers.update(result.headers)
@@ -4,7 +4,7 @@ from sqlalchemy import select, func, and_
 from typing import List, Optional
 from datetime import datetime, timedelta
 
-from app.core.db.database import async_get_db
+from app.core.db.database import async_get_read_db
 from app.api.dependencies import get_current_admin_user
 from app.models.user_profile import UserProfile
 from app.models.assessment import Assessment
@@ -16,7 +16,7 @@ router = APIRouter(prefix="/admin/analytics", tags=["Admin - Analytics"])
 @router.get("")
 async def get_analytics(
     period: str = Query("30d", description="Time period: 7d, 30d, 90d, 1y"),
-    db: AsyncSession = Depends(async_get_db),
+    db: AsyncSession = Depends(async_get_read_db),
     admin_user: dict = Depends(get_current_admin_user)
 ):
     """Get detailed analytics data (Admin only)"""
@@ -137,7 +137,7 @@ async def get_analytics(
 
 @router.get("/stats")
 async def get_system_stats(
-    db: AsyncSession = Depends(async_get_db),
+    db: AsyncSession = Depends(async_get_read_db),
     admin_user: dict = Depends(get_current_admin_user)
 ):
     """Get basic system statistics (Admin only)"""
@@ -5,7 +5,7 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 import math
 
-from app.core.db.database import async_get_db
+from app.core.db.database import async_get_read_db
 from app.api.dependencies import get_current_admin_user
 from app.models.assessment import Assessment
 from app.models.user_profile import UserProfile
@@ -22,7 +22,7 @@ async def get_audit_logs(
     user_email: Optional[str] = Query(None, description="Filter by user email"),
     date_from: Optional[datetime] = Query(None, description="Filter from date"),
     date_to: Optional[datetime] = Query(None, description="Filter to date"),
-    db: AsyncSession = Depends(async_get_db),
+    db: AsyncSession = Depends(async_get_read_db),
     admin_user: dict = Depends(get_current_admin_user)
 ):
     """Get audit logs with pagination and filtering (Admin only)"""
@@ -142,7 +142,7 @@ async def get_available_actions(
 @router.get("/summary")
 async def get_audit_summary(
     days: int = Query(7, ge=1, le=365, description="Number of days to summarize"),
-    db: AsyncSession = Depends(async_get_db),
+    db: AsyncSession = Depends(async_get_read_db),
     admin_user: dict = Depends(get_current_admin_user)
 ):
     """Get audit log summary for the specified period (Admin only)"""
@@ -36,7 +36,7 @@ async def admin_login(
         raise HTTPException(status_code=403, detail="Admin privileges required")
     
     # Verify password
-    if not verify_password(auth_data.password, user.password_hash):
+    if not await verify_password(auth_data.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Create access token
@@ -5,12 +5,11 @@ from typing import List, Dict, Any
 from datetime import datetime
 import uuid
 
+from app.assessment_engine import question_catalog, score_answers
 from app.core.db.database import async_get_db
 from app.models.user_profile import UserProfile
 from app.models.customer_info import CustomerInfo
 from app.models.assessment import Assessment
-from app.models.question import Question
-from app.models.question_option import QuestionOption
 from app.models.category import Category
 from app.models.user_answer import UserAnswer
 from app.models.category_score import CategoryScore
@@ -156,62 +155,34 @@ async def submit_anonymous_assessment(
         )
         db.add(assessment)
         
-        # Get all questions and options for scoring
-        questions_result = await db.execute(select(Question).where(Question.is_active == True))
-        questions = {q.id: q for q in questions_result.scalars().all()}
-        
-        options_result = await db.execute(select(QuestionOption))
-        options = {opt.id: opt for opt in options_result.scalars().all()}
-        
-        # Process answers and calculate scores
-        total_score = 0.0
-        max_possible_score = 0.0
-        category_scores = {}
-        
-        for answer in submission.answers:
-            question = questions.get(answer.question_id)
-            if not question:
-                raise HTTPException(status_code=400, detail=f"Question {answer.question_id} not found")
-            
-            # Calculate score for this question
-            question_score = 0.0
-            is_correct = False
-            
-            for option_id in answer.selected_options:
-                option = options.get(option_id)
-                if option and option.question_id == question.id:
-                    question_score += option.score_points
-                    if option.is_correct:
-                        is_correct = True
-            
+        # One answer per question: a repeated question_id keeps its last submitted answer, which is the one scored
+        answers = {answer.question_id: answer.selected_options for answer in submission.answers}
+
+        # Score all answers in memory against the catalog
+        catalog = await question_catalog.get(db)
+        scored = score_answers(catalog, answers, answered_only=True)
+        if scored.unknown_question_ids:
+            raise HTTPException(status_code=400, detail=f"Question {scored.unknown_question_ids[0]} not found")
+
+        for question_id, selected_options in answers.items():
+            question_score = scored.questions[question_id]
+
             # Store user answer
             user_answer = UserAnswer(
                 assessment_id=assessment_id,
-                question_id=question.id,
-                selected_options=answer.selected_options,
-                is_correct=is_correct,
-                points_earned=question_score,
+                question_id=question_id,
+                selected_options=selected_options,
+                is_correct=question_score.is_correct,
+                points_earned=question_score.score,
                 created_at=datetime.utcnow()
             )
             db.add(user_answer)
-            
-            # Add to category totals
-            if question.category_id not in category_scores:
-                category_scores[question.category_id] = {
-                    "score": 0.0,
-                    "max_score": 0.0,
-                    "questions": 0
-                }
-            
-            category_scores[question.category_id]["score"] += question_score
-            category_scores[question.category_id]["max_score"] += question.weight
-            category_scores[question.category_id]["questions"] += 1
-            
-            total_score += question_score
-            max_possible_score += question.weight
-        
+
+        total_score = scored.total_score
+        max_possible_score = scored.max_score
+
         # Calculate overall percentage
-        overall_percentage = (total_score / max_possible_score * 100) if max_possible_score > 0 else 0
+        overall_percentage = scored.percentage
         risk_level = calculate_risk_level(overall_percentage)
         
         # Update assessment with scores
@@ -221,35 +192,28 @@ async def submit_anonymous_assessment(
         
         # Store category scores
         category_scores_response = []
-        for category_id, score_data in category_scores.items():
-            percentage = (score_data["score"] / score_data["max_score"] * 100) if score_data["max_score"] > 0 else 0
-            
+        for breakdown in scored.categories:
             category_score = CategoryScore(
                 assessment_id=assessment_id,
-                category_id=category_id,
-                score=score_data["score"],
-                max_score=score_data["max_score"],
-                percentage=percentage,
+                category_id=breakdown.category_id,
+                score=breakdown.score,
+                max_score=breakdown.max_score,
+                percentage=breakdown.percentage,
                 created_at=datetime.utcnow()
             )
             db.add(category_score)
             
-            # Get category name for response
-            category_result = await db.execute(select(Category).where(Category.id == category_id))
-            category = category_result.scalar_one_or_none()
-            
             category_scores_response.append({
-                "category_id": category_id,
-                "category_name": category.title if category else "Unknown",
-                "score": score_data["score"],
-                "max_score": score_data["max_score"],
-                "percentage": round(percentage, 1)
+                "category_id": breakdown.category_id,
+                "category_name": breakdown.title,
+                "score": breakdown.score,
+                "max_score": breakdown.max_score,
+                "percentage": round(breakdown.percentage, 1)
             })
         
         # Generate recommendations
         recommendations = await generate_recommendations(db, assessment_id, {
-            cat_id: {"percentage": (data["score"] / data["max_score"] * 100) if data["max_score"] > 0 else 0}
-            for cat_id, data in category_scores.items()
+            breakdown.category_id: {"percentage": breakdown.percentage} for breakdown in scored.categories
         })
         
         # Update customer info if interested in contact
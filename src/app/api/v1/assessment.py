@@ -1,11 +1,10 @@
-from fastapi import APIRouter, Depends
+import hashlib
+
+from fastapi import APIRouter, Depends, Header, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from typing import List, Annotated
 
-from ...models.category import Category
-from ...models.question import Question
-from ...models.question_option import QuestionOption
+from ...assessment_engine import CatalogSnapshot, question_catalog
 # Import schemas for the full assessment data endpoint
 from pydantic import BaseModel
 from typing import List, Optional
@@ -60,90 +59,84 @@ class CategorySchema(BaseModel):
 class AssessmentFullSchema(BaseModel):
     categories: List[CategorySchema]
 
-from ...core.db.database import async_get_db
+from ...core.db.database import async_get_read_db
 
 router = APIRouter(prefix="/assessment/data", tags=["Assessment Data"])
 
 import logging
 logging.basicConfig(level=logging.INFO)
 
+# Encoded body and ETag of the last catalog snapshot rendered by `get_full_assessment`.
+_full_assessment: tuple[CatalogSnapshot, bytes, str] | None = None
+
+
+def _render_full_assessment(catalog: CatalogSnapshot) -> tuple[bytes, str]:
+    """Encode the full assessment for `catalog` once, with a strong ETag derived from its content."""
+    global _full_assessment
+    if _full_assessment is None or _full_assessment[0] is not catalog:
+        categories = [
+            CategorySchema(
+                id=category.id,
+                title=category.title,
+                description=category.description,
+                icon=category.icon,
+                display_order=category.display_order,
+                is_active=category.is_active,
+                questions=[
+                    QuestionSchema(
+                        id=question.id,
+                        category_id=question.category_id,
+                        question_text=question.text,
+                        question_type=question.question_type,
+                        is_required=question.is_required,
+                        is_active=question.is_active,
+                        weight=question.weight,
+                        display_order=question.display_order,
+                        options=[
+                            QuestionOptionSchema(
+                                id=option.id,
+                                option_text=option.text,
+                                option_value=option.value,
+                                score_points=option.score_points,
+                                is_correct=option.is_correct,
+                                display_order=option.display_order,
+                            )
+                            for option in sorted(
+                                catalog.options_by_question.get(question.id, ()), key=lambda option: option.display_order
+                            )
+                        ],
+                    )
+                    for question in sorted(
+                        catalog.questions_by_category.get(category.id, ()), key=lambda question: question.display_order
+                    )
+                ],
+            )
+            for category in catalog.categories.values()
+        ]
+        body = AssessmentFullSchema(categories=categories).model_dump_json().encode()
+        _full_assessment = (catalog, body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        logging.info(f"Rendered catalog version {catalog.version} with {len(categories)} categories for /full")
+    return _full_assessment[1], _full_assessment[2]
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
 @router.get("/full", response_model=AssessmentFullSchema)
-async def get_full_assessment(db: Annotated[AsyncSession, Depends(async_get_db)]):
-    # Fetch all categories
-    categories_result = await db.execute(select(Category).order_by(Category.display_order))
-    categories = categories_result.scalars().all()
-    logging.info(f"Fetched categories: {len(categories)}")
-    
-    # Fetch all questions
-    questions_result = await db.execute(select(Question).order_by(Question.display_order))
-    questions = questions_result.scalars().all()
-    logging.info(f"Fetched questions: {len(questions)}")
-    
-    # Fetch all options
-    options_result = await db.execute(select(QuestionOption).order_by(QuestionOption.display_order))
-    options = options_result.scalars().all()
-    logging.info(f"Fetched options: {len(options)}")
-
-    # Build response data structure manually to avoid SQLAlchemy lazy loading issues
-    options_by_qid = {}
-    for opt in options:
-        option_data = QuestionOptionSchema(
-            id=opt.id,
-            option_text=opt.option_text,
-            option_value=opt.option_value,
-            score_points=opt.score_points if opt.score_points is not None else 0.0,
-            is_correct=opt.is_correct,
-            display_order=opt.display_order
-        )
-        options_by_qid.setdefault(opt.question_id, []).append(option_data)
-
-    # Build questions with their options
-    questions_by_cat = {}
-    for q in questions:
-        # Handle None values before passing to schema
-        is_required_value = True if q.is_required is None else q.is_required
-        is_active_value = True if q.is_active is None else q.is_active
-        
-        question_data = QuestionSchema(
-            id=q.id,
-            category_id=q.category_id,
-            question_text=q.question_text,
-            question_type=q.question_type,
-            is_required=is_required_value,
-            is_active=is_active_value,
-            weight=q.weight if q.weight is not None else 1.0,
-            display_order=q.display_order,
-            options=options_by_qid.get(q.id, [])
-        )
-        questions_by_cat.setdefault(q.category_id, []).append(question_data)
-
-    # Build categories with their questions
-    category_data_list = []
-    for c in categories:
-        # Handle None values before passing to schema
-        is_active_value = True if c.is_active is None else c.is_active
-        
-        category_data = CategorySchema(
-            id=c.id,
-            title=c.title,
-            description=c.description,
-            icon=c.icon,
-            display_order=c.display_order,
-            is_active=is_active_value,
-            questions=questions_by_cat.get(c.id, [])
-        )
-        category_data_list.append(category_data)
-    
-    logging.info(f"Returning {len(category_data_list)} categories with nested questions and options")
-    
-    # Create the response using the schema to ensure proper serialization
-    response = AssessmentFullSchema(categories=category_data_list)
-    
-    # Log the first category's questions for debugging
-    if category_data_list:
-        first_cat = category_data_list[0]
-        logging.info(f"First category '{first_cat.id}' has {len(first_cat.questions)} questions")
-        if first_cat.questions:
-            logging.info(f"First question: {first_cat.questions[0].question_text[:50]}...")
-    
-    return response
+async def get_full_assessment(
+    db: Annotated[AsyncSession, Depends(async_get_read_db)],
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    """Return every category with its questions and options, ordered for display.
+
+    The body is rendered from the question catalog snapshot once per catalog version and served with an
+    ETag. Clients that send it back in `If-None-Match` get an empty 304 while the catalog is unchanged.
+    """
+    body, etag = _render_full_assessment(await question_catalog.get(db))
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
@@ -2,7 +2,7 @@
 import secrets
 import uuid
 from datetime import datetime
-from typing import Annotated, List
+from typing import Annotated, Any, List, cast
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -14,9 +14,12 @@ from app.api.dependencies import get_current_user
 from ...core.db.database import async_get_db
 from ...assessment_engine import (
     BlueprintLoadError,
+    CategoryBreakdown,
     generate_selection_preview,
     list_blueprint_ids,
     load_blueprint_document,
+    question_catalog,
+    score_answers,
 )
 from ...assessment_templates import (
     get_assessment_template,
@@ -24,8 +27,6 @@ from ...assessment_templates import (
 )
 from ...models.assessment import Assessment
 from ...models.category import Category
-from ...models.question import Question
-from ...models.question_option import QuestionOption
 from ...models.user_profile import UserProfile
 from ...schemas.assessment import (
     AssessmentResponse,
@@ -49,6 +50,14 @@ from ...schemas.assessment_blueprint import (
 router = APIRouter()
 
 
+def _risk_level(percentage: float) -> str:
+    if percentage >= 80:
+        return "low"
+    if percentage >= 60:
+        return "medium"
+    if percentage >= 40:
+        return "high"
+    return "critical"
 
 
 @router.get("/blueprint", response_model=list[BlueprintSummary])
@@ -130,13 +139,10 @@ async def get_assessment_info(db: AsyncSession = Depends(async_get_db)):
     This endpoint handles GET requests to /api/v1/assessment
     """
     try:
-        # Get total number of questions
-        questions_result = await db.execute(select(func.count(Question.id)))
-        total_questions = questions_result.scalar()
-
-        # Get categories count
-        categories_result = await db.execute(select(func.count(Category.id)))
-        total_categories = categories_result.scalar()
+        # Get question and category counts from the catalog snapshot
+        catalog = await question_catalog.get(db)
+        total_questions = len(catalog.questions)
+        total_categories = len(catalog.categories)
 
         # Get total assessments completed
         assessments_result = await db.execute(
@@ -162,68 +168,6 @@ async def get_assessment_info(db: AsyncSession = Depends(async_get_db)):
         raise HTTPException(status_code=500, detail=f"Error retrieving assessment info: {str(e)}")
 
 
-@router.get("/data/full")
-async def get_assessment_data_full(db: AsyncSession = Depends(async_get_db)):
-    """
-    Get full assessment data including all questions and categories.
-    This endpoint handles GET requests to /v1/assessment-data/full
-    """
-    try:
-        # Get all categories with questions
-        categories_result = await db.execute(
-            select(Category).order_by(Category.title)
-        )
-        categories = categories_result.scalars().all()
-
-        assessment_data = []
-        for category in categories:
-            # Get questions for this category
-            questions_result = await db.execute(
-                select(Question).where(Question.category_id == category.id).order_by(Question.id)
-            )
-            questions = questions_result.scalars().all()
-
-            category_questions = []
-            for question in questions:
-                # Get options for this question
-                options_result = await db.execute(
-                    select(QuestionOption).where(QuestionOption.question_id == question.id).order_by(QuestionOption.id)
-                )
-                options = options_result.scalars().all()
-
-                question_data = {
-                    "id": question.id,
-                    "text": question.question_text,
-                    "type": question.question_type,
-                    "weight": question.weight,
-                    "options": [
-                        {
-                            "id": opt.id,
-                            "value": opt.option_value,
-                            "label": opt.option_text
-                        } for opt in options
-                    ]
-                }
-                category_questions.append(question_data)
-
-            category_data = {
-                "id": category.id,
-                "name": category.title,
-                "description": category.description,
-                "questions": category_questions
-            }
-            assessment_data.append(category_data)
-
-        return {
-            "status": "success",
-            "total_categories": len(assessment_data),
-            "total_questions": sum(len(cat["questions"]) for cat in assessment_data),
-            "categories": assessment_data
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error retrieving full assessment data: {str(e)}")
-
-
 @router.post("/start", response_model=AssessmentStartResponse)
 async def start_assessment(
     data: AssessmentStartRequest,
@@ -269,12 +213,12 @@ async def start_assessment(
 
     if existing_assessment:
         # Return existing assessment
-        questions_count = await db.execute(select(func.count()).select_from(Question).where(Question.is_active == True))
+        questions_count = len((await question_catalog.get(db)).active_questions)
         return AssessmentStartResponse(
             assessment_id=existing_assessment.id,
             message="Continuing your existing assessment",
-            questions_count=questions_count.scalar_one(),
-            estimated_time_minutes=max(5, questions_count.scalar_one() * 2)  # 2 minutes per question, min 5
+            questions_count=questions_count,
+            estimated_time_minutes=max(5, questions_count * 2)  # 2 minutes per question, min 5
         )
 
     # Create new assessment
@@ -286,8 +230,7 @@ async def start_assessment(
     await db.refresh(assessment)
 
     # Get questions count for response
-    questions_count_result = await db.execute(select(func.count()).select_from(Question).where(Question.is_active == True))
-    questions_count = questions_count_result.scalar_one()
+    questions_count = len((await question_catalog.get(db)).active_questions)
 
     return AssessmentStartResponse(
         assessment_id=assessment.id,
@@ -323,84 +266,28 @@ async def submit_assessment(submission: AssessmentSubmission, db: Annotated[Asyn
     assessment.status = "completed"
     assessment.completed_at = datetime.utcnow()
 
-    # Calculate scores
-    total_score = 0.0
-    max_possible_score = 0.0
-    category_scores_data = {}
-
-    # Get all questions and their options
-    result = await db.execute(select(Question).where(Question.is_active == True))
-    questions = result.scalars().all()
-
-    for question in questions:
-        question_score = 0.0
-        max_question_score = question.weight
-
-        if str(question.id) in answers_data:
-            answer_data = answers_data[str(question.id)]
-            selected_option_ids = answer_data.get("selected_options", [])
-
-            # Calculate score based on selected options
-            for option_id in selected_option_ids:
-                option_result = await db.execute(select(QuestionOption).where(QuestionOption.id == option_id))
-                option = option_result.scalar_one_or_none()
-                if option:
-                    question_score += option.score_points
-
-        # Add to category scores
-        if question.category_id not in category_scores_data:
-            category_scores_data[question.category_id] = {
-                "score": 0.0,
-                "max_score": 0.0
-            }
-
-        category_scores_data[question.category_id]["score"] += question_score
-        category_scores_data[question.category_id]["max_score"] += max_question_score
-
-        total_score += question_score
-        max_possible_score += max_question_score
-
-    # Calculate percentage
-    percentage_score = (total_score / max_possible_score * 100) if max_possible_score > 0 else 0
-
-    # Determine risk level
-    if percentage_score >= 80:
-        risk_level = "low"
-    elif percentage_score >= 60:
-        risk_level = "medium"
-    elif percentage_score >= 40:
-        risk_level = "high"
-    else:
-        risk_level = "critical"
+    # Score all answers in memory against the catalog
+    catalog = await question_catalog.get(db)
+    scored = score_answers(catalog, {answer.question_id: answer.selected_options for answer in submission.answers})
+    total_score = scored.total_score
+    max_possible_score = scored.max_score
+    percentage_score = scored.percentage
+    risk_level = _risk_level(percentage_score)
 
     # Generate category scores for response
-    category_scores_list = []
-    categories_result = await db.execute(select(Category).where(Category.is_active == True))
-    categories = categories_result.scalars().all()
-
-    for category in categories:
-        if category.id in category_scores_data:
-            cat_data = category_scores_data[category.id]
-            cat_percentage = (cat_data["score"] / cat_data["max_score"] * 100) if cat_data["max_score"] > 0 else 0
-
-            # Determine category risk level
-            if cat_percentage >= 80:
-                cat_risk = "low"
-            elif cat_percentage >= 60:
-                cat_risk = "medium"
-            elif cat_percentage >= 40:
-                cat_risk = "high"
-            else:
-                cat_risk = "critical"
-
-            category_scores_list.append(CategoryScore(
-                category_id=category.id,
-                category_title=category.title,
-                score=cat_data["score"],
-                max_score=cat_data["max_score"],
-                percentage=cat_percentage,
-                risk_level=cat_risk
-            ))
+    active_category_ids = {category.id for category in catalog.categories.values() if category.is_active}
+    category_scores_list = [
+        CategoryScore(
+            category_id=breakdown.category_id,
+            category_title=breakdown.title,
+            score=breakdown.score,
+            max_score=breakdown.max_score,
+            percentage=breakdown.percentage,
+            risk_level=_risk_level(breakdown.percentage),
+        )
+        for breakdown in scored.categories
+        if breakdown.category_id in active_category_ids
+    ]
 
     # Generate basic recommendations
     recommendations = []
@@ -437,17 +324,17 @@ async def submit_assessment(submission: AssessmentSubmission, db: Annotated[Asyn
     assessment.max_possible_score = max_possible_score
     assessment.percentage_score = percentage_score
     assessment.risk_level = risk_level
-    assessment.category_scores = {
-        str(cat.id): {
-            "score": category_scores_data.get(cat.id, {}).get("score", 0),
-            "max_score": category_scores_data.get(cat.id, {}).get("max_score", 0),
-            "percentage": (
-                (category_scores_data.get(cat.id, {}).get("score", 0) / category_scores_data.get(cat.id, {}).get("max_score", 1) * 100)
-                if category_scores_data.get(cat.id, {}).get("max_score")
-                else 0
-            )
-        } for cat in categories
-    }
+    breakdowns = {breakdown.category_id: breakdown for breakdown in scored.categories}
+    stored_category_scores = {}
+    for category in catalog.categories.values():
+        if category.is_active:
+            breakdown = breakdowns.get(category.id) or CategoryBreakdown(category.id, category.title)
+            stored_category_scores[category.id] = {
+                "score": breakdown.score,
+                "max_score": breakdown.max_score,
+                "percentage": breakdown.percentage,
+            }
+    assessment.category_scores = cast(Any, stored_category_scores)
     assessment.recommendations = recommendations
     assessment.share_token = share_token
 
@@ -521,87 +408,38 @@ async def submit_shared_assessment(submission: SharedAssessmentSubmission, db: A
     new_assessment.status = "completed"
     new_assessment.completed_at = datetime.utcnow()
 
-    # Calculate scores (same logic as regular submission)
-    total_score = 0.0
-    max_possible_score = 0.0
-    category_scores_data = {}
-
-    # Get all questions and their options
-    questions_result = await db.execute(select(Question).where(Question.is_active == True))
-    questions = questions_result.scalars().all()
-
-    for question in questions:
-        question_score = 0.0
-        max_question_score = question.weight
-
-        if str(question.id) in answers_data:
-            answer_data = answers_data[str(question.id)]
-            selected_option_ids = answer_data.get("selected_options", [])
-
-            # Calculate score based on selected options
-            for option_id in selected_option_ids:
-                option_result = await db.execute(select(QuestionOption).where(QuestionOption.id == option_id))
-                option = option_result.scalar_one_or_none()
-                if option:
-                    question_score += option.score_points
-
-        # Add to category scores
-        if question.category_id not in category_scores_data:
-            category_scores_data[question.category_id] = {
-                "score": 0.0,
-                "max_score": 0.0
-            }
-
-        category_scores_data[question.category_id]["score"] += question_score
-        category_scores_data[question.category_id]["max_score"] += max_question_score
-
-        total_score += question_score
-        max_possible_score += max_question_score
-
-    # Calculate percentage and risk level
-    percentage_score = (total_score / max_possible_score * 100) if max_possible_score > 0 else 0
-
-    if percentage_score >= 80:
-        risk_level = "Low"
-    elif percentage_score >= 60:
-        risk_level = "Medium"
-    elif percentage_score >= 40:
-        risk_level = "High"
-    else:
-        risk_level = "Critical"
+    # Score all answers in memory against the catalog (same logic as regular submission)
+    catalog = await question_catalog.get(db)
+    scored = score_answers(catalog, {answer.question_id: answer.selected_options for answer in submission.answers})
+    total_score = scored.total_score
+    max_possible_score = scored.max_score
+    percentage_score = scored.percentage
+    risk_level = _risk_level(percentage_score).capitalize()
 
     new_assessment.total_score = total_score
     new_assessment.percentage_score = percentage_score
     new_assessment.risk_level = risk_level
-    new_assessment.category_scores = category_scores_data
+    new_assessment.category_scores = cast(
+        Any,
+        {
+            breakdown.category_id: {"score": breakdown.score, "max_score": breakdown.max_score}
+            for breakdown in scored.categories
+        },
+    )
 
     # Create category scores list for response
-    category_scores_list = []
-    categories_result = await db.execute(select(Category))
-    categories = categories_result.scalars().all()
-
-    for category in categories:
-        if category.id in category_scores_data:
-            score_data = category_scores_data[category.id]
-            category_percentage = (score_data["score"] / score_data["max_score"] * 100) if score_data["max_score"] > 0 else 0
-
-            if category_percentage >= 80:
-                cat_risk_level = "Low"
-            elif category_percentage >= 60:
-                cat_risk_level = "Medium"
-            elif category_percentage >= 40:
-                cat_risk_level = "High"
-            else:
-                cat_risk_level = "Critical"
-
-            category_scores_list.append(CategoryScore(
-                category_id=str(category.id),
-                category_title=category.title,
-                score=score_data["score"],
-                max_score=score_data["max_score"],
-                percentage=category_percentage,
-                risk_level=cat_risk_level
-            ))
+    category_scores_list = [
+        CategoryScore(
+            category_id=breakdown.category_id,
+            category_title=breakdown.title,
+            score=breakdown.score,
+            max_score=breakdown.max_score,
+            percentage=breakdown.percentage,
+            risk_level=_risk_level(breakdown.percentage).capitalize(),
+        )
+        for breakdown in scored.categories
+        if breakdown.category_id in catalog.categories
+    ]
 
     await db.commit()
 
@@ -3,7 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional, Annotated
 
-from ...core.db.database import async_get_db
+from ...assessment_engine import question_catalog
+from ...core.db.database import async_get_db, async_get_read_db
 from ...models.category import Category
 from ...schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse, CategoryList
 
@@ -14,7 +15,7 @@ router = APIRouter()
 async def list_categories(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    db: AsyncSession = Depends(async_get_db)
+    db: AsyncSession = Depends(async_get_read_db)
 ):
     """List all categories with pagination."""
     result = await db.execute(select(Category).offset(skip).limit(limit))
@@ -29,7 +30,7 @@ async def list_categories(
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
-async def get_category(category_id: str, db: AsyncSession = Depends(async_get_db)):
+async def get_category(category_id: str, db: AsyncSession = Depends(async_get_read_db)):
     """Get a specific category by ID."""
     result = await db.execute(select(Category).where(Category.id == category_id))
     category = result.scalar_one_or_none()
@@ -52,6 +53,7 @@ async def create_category(category_data: CategoryCreate, db: AsyncSession = Depe
     db.add(category)
     await db.commit()
     await db.refresh(category)
+    await question_catalog.refresh(db)
     
     return CategoryResponse.from_orm(category)
 
@@ -80,8 +82,9 @@ async def update_category(
     for field, value in update_data.items():
         setattr(category, field, value)
     
-    db.commit()
-    db.refresh(category)
+    await db.commit()
+    await db.refresh(category)
+    await question_catalog.refresh(db)
     
     return CategoryResponse.from_orm(category)
 
@@ -96,5 +99,6 @@ async def delete_category(category_id: str, db: AsyncSession = Depends(async_get
     
     await db.delete(category)
     await db.commit()
+    await question_catalog.refresh(db)
     
     return None
@@ -9,7 +9,7 @@ import string
 from ...core.db.database import async_get_db
 from ...models.user import User
 from ...schemas.lead_capture import LeadCaptureRequest, LeadCaptureResponse
-from ...core.security import get_password_hash
+from ...core.security import hash_password
 
 router = APIRouter()
 
@@ -46,7 +46,7 @@ async def capture_lead(
         
         # Generate temporary password
         temp_password = generate_temporary_password()
-        hashed_password = get_password_hash(temp_password)
+        hashed_password = await hash_password(temp_password)
         
         # Create new user with minimal required fields only
         new_user = User(
@@ -1,5 +1,5 @@
 from datetime import timedelta
-from typing import Annotated
+from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
@@ -17,6 +17,7 @@ from ...core.security import (
     create_refresh_token,
     verify_token,
 )
+from ...core.utils.signing_keys import signing_keys
 
 router = APIRouter(tags=["login"])
 
@@ -56,3 +57,9 @@ async def refresh_access_token(request: Request, db: AsyncSession = Depends(asyn
 
     new_access_token = await create_access_token(data={"sub": user_data['email']})
     return {"access_token": new_access_token, "token_type": "bearer"}
+
+
+@router.get("/.well-known/jwks.json")
+async def read_jwks() -> dict[str, list[dict[str, Any]]]:
+    """Public keys that verify this service's tokens, for services that check tokens without the signing key."""
+    return signing_keys.public_jwks()
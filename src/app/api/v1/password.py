@@ -6,7 +6,7 @@ from pydantic import BaseModel, Field
 
 from ...api.dependencies import get_current_user
 from ...core.db.database import async_get_db
-from ...core.security import get_password_hash, verify_password
+from ...core.security import hash_password, verify_password
 from ...crud.crud_users import crud_users
 
 router = APIRouter(tags=["password"])
@@ -36,11 +36,11 @@ async def change_password(
             raise HTTPException(status_code=404, detail="User not found")
         
         # Verify current password
-        if not verify_password(password_data.current_password, user.hashed_password):
+        if not await verify_password(password_data.current_password, user.hashed_password):
             raise HTTPException(status_code=400, detail="Current password is incorrect")
         
         # Hash new password
-        new_hashed_password = get_password_hash(password_data.new_password)
+        new_hashed_password = await hash_password(password_data.new_password)
         
         # Update password in database
         await crud_users.update(
@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ...api.dependencies import get_current_superuser, get_current_user
 from ...core.db.database import async_get_db
 from ...core.exceptions.http_exceptions import ForbiddenException, NotFoundException
-from ...core.utils.cache import cache
+from ...core.utils.cache import cache, invalidate
 from ...crud.crud_posts import crud_posts
 from ...crud.crud_users import crud_users
 from ...schemas.post import PostCreate, PostCreateInternal, PostRead, PostUpdate
@@ -37,6 +37,9 @@ async def write_post(
 
     post_internal = PostCreateInternal(**post_internal_dict)
     created_post = await crud_posts.create(db=db, object=post_internal)
+    await invalidate(
+        "{username}_post_cache", keys=[f"{username}_post_cache:{created_post.id}"], tags=[f"user:{username}:posts"]
+    )
 
     post_read = await crud_posts.get(db=db, id=created_post.id, schema_to_select=PostRead)
     if post_read is None:
@@ -50,6 +53,8 @@ async def write_post(
     key_prefix="{username}_posts:page_{page}:items_per_page:{items_per_page}",
     resource_id_name="username",
     expiration=60,
+    tags=["user:{username}:posts"],
+    compress_threshold=4096,
 )
 async def read_posts(
     request: Request,
@@ -76,7 +81,7 @@ async def read_posts(
 
 
 @router.get("/{username}/post/{id}", response_model=PostRead)
-@cache(key_prefix="{username}_post_cache", resource_id_name="id")
+@cache(key_prefix="{username}_post_cache", resource_id_name="id", negative_expiration=30)
 async def read_post(
     request: Request, username: str, id: int, db: Annotated[AsyncSession, Depends(async_get_db)]
 ) -> PostRead:
@@ -95,7 +100,7 @@ async def read_post(
 
 
 @router.patch("/{username}/post/{id}")
-@cache("{username}_post_cache", resource_id_name="id", pattern_to_invalidate_extra=["{username}_posts:*"])
+@cache("{username}_post_cache", resource_id_name="id", tags_to_invalidate=["user:{username}:posts"])
 async def patch_post(
     request: Request,
     username: str,
@@ -121,7 +126,7 @@ async def patch_post(
 
 
 @router.delete("/{username}/post/{id}")
-@cache("{username}_post_cache", resource_id_name="id", to_invalidate_extra={"{username}_posts": "{username}"})
+@cache("{username}_post_cache", resource_id_name="id", tags_to_invalidate=["user:{username}:posts"])
 async def erase_post(
     request: Request,
     username: str,
@@ -147,7 +152,7 @@ async def erase_post(
 
 
 @router.delete("/{username}/db_post/{id}", dependencies=[Depends(get_current_superuser)])
-@cache("{username}_post_cache", resource_id_name="id", to_invalidate_extra={"{username}_posts": "{username}"})
+@cache("{username}_post_cache", resource_id_name="id", tags_to_invalidate=["user:{username}:posts"])
 async def erase_db_post(
     request: Request, username: str, id: int, db: Annotated[AsyncSession, Depends(async_get_db)]
 ) -> dict[str, str]:
@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import List, Optional
 
+from ...assessment_engine import question_catalog
 from ...core.db.database import async_get_db
 from ...models.question_option import QuestionOption
 from ...schemas.question_option import QuestionOptionCreate, QuestionOptionUpdate, QuestionOptionResponse, QuestionOptionList
@@ -63,6 +64,7 @@ async def create_question_option(option_data: QuestionOptionCreate, db: AsyncSes
     db.add(option)
     await db.commit()
     await db.refresh(option)
+    await question_catalog.refresh(db)
     
     return QuestionOptionResponse.from_orm(option)
 
@@ -94,6 +96,7 @@ async def update_question_option(
     
     await db.commit()
     await db.refresh(option)
+    await question_catalog.refresh(db)
     
     return QuestionOptionResponse.from_orm(option)
 
@@ -108,5 +111,6 @@ async def delete_question_option(option_id: int, db: AsyncSession = Depends(asyn
     
     await db.delete(option)
     await db.commit()
+    await question_catalog.refresh(db)
     
     return None
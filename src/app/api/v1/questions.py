@@ -3,7 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import List, Optional
 
-from ...core.db.database import async_get_db
+from ...assessment_engine import question_catalog
+from ...core.db.database import async_get_db, async_get_read_db
 from ...models.question import Question
 from ...schemas.question import QuestionCreate, QuestionUpdate, QuestionResponse, QuestionList, QuestionWithOptions
 
@@ -16,7 +17,7 @@ async def list_questions(
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
     category_id: Optional[str] = Query(None, description="Filter by category ID"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
-    db: AsyncSession = Depends(async_get_db)
+    db: AsyncSession = Depends(async_get_read_db)
 ):
     """List all questions with pagination and filtering."""
     query = select(Question)
@@ -46,7 +47,7 @@ async def list_questions(
 
 
 @router.get("/{question_id}", response_model=QuestionWithOptions)
-async def get_question(question_id: int, db: AsyncSession = Depends(async_get_db)):
+async def get_question(question_id: int, db: AsyncSession = Depends(async_get_read_db)):
     """Get a specific question by ID with its options."""
     result = await db.execute(select(Question).where(Question.id == question_id))
     question = result.scalars().first()
@@ -71,6 +72,7 @@ async def create_question(question_data: QuestionCreate, db: AsyncSession = Depe
     db.add(question)
     await db.commit()
     await db.refresh(question)
+    await question_catalog.refresh(db)
     
     return QuestionResponse.from_orm(question)
 
@@ -102,6 +104,7 @@ async def update_question(
     
     await db.commit()
     await db.refresh(question)
+    await question_catalog.refresh(db)
     
     return QuestionResponse.from_orm(question)
 
@@ -116,5 +119,6 @@ async def delete_question(question_id: int, db: AsyncSession = Depends(async_get
     
     await db.delete(question)
     await db.commit()
+    await question_catalog.refresh(db)
     
     return None
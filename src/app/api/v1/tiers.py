@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ...api.dependencies import get_current_superuser
 from ...core.db.database import async_get_db
 from ...core.exceptions.http_exceptions import DuplicateValueException, NotFoundException
+from ...core.utils.rate_limit import rate_limiter
 from ...crud.crud_tier import crud_tiers
 from ...schemas.tier import TierCreate, TierCreateInternal, TierRead, TierUpdate
 
@@ -24,6 +25,7 @@ async def write_tier(
 
     tier_internal = TierCreateInternal(**tier_internal_dict)
     created_tier = await crud_tiers.create(db=db, object=tier_internal)
+    await rate_limiter.refresh_rules(db)
 
     tier_read = await crud_tiers.get(db=db, id=created_tier.id, schema_to_select=TierRead)
     if tier_read is None:
@@ -60,6 +62,7 @@ async def patch_tier(
         raise NotFoundException("Tier not found")
 
     await crud_tiers.update(db=db, object=values, name=name)
+    await rate_limiter.refresh_rules(db)
     return {"message": "Tier updated"}
 
 
@@ -70,4 +73,5 @@ async def erase_tier(request: Request, name: str, db: Annotated[AsyncSession, De
         raise NotFoundException("Tier not found")
 
     await crud_tiers.delete(db=db, name=name)
+    await rate_limiter.refresh_rules(db)
     return {"message": "Tier deleted"}
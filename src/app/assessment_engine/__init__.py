@@ -12,17 +12,38 @@ from .blueprint_engine import (
     score_responses,
     select_items,
 )
+from .catalog import (
+    CatalogCategory,
+    CatalogOption,
+    CatalogQuestion,
+    CatalogSnapshot,
+    QuestionCatalog,
+    load_catalog_snapshot,
+    question_catalog,
+)
+from .scoring import AssessmentScore, CategoryBreakdown, QuestionScore, score_answers
 
 __all__ = [
+    "AssessmentScore",
     "BlueprintItem",
     "BlueprintLoadError",
+    "CatalogCategory",
+    "CatalogOption",
+    "CatalogQuestion",
+    "CatalogSnapshot",
+    "CategoryBreakdown",
     "DimensionScore",
+    "QuestionCatalog",
+    "QuestionScore",
     "ScoreSummary",
     "generate_selection_preview",
     "list_blueprint_ids",
     "load_blueprint_document",
+    "load_catalog_snapshot",
     "pool_from_item_bank",
+    "question_catalog",
     "sample_pool_from_blueprint",
+    "score_answers",
     "score_responses",
     "select_items",
 ]
@@ -0,0 +1,308 @@
+"""Docs: ./docs/functions/assessment_catalog.md | SPOT: ./SPOT.md#function-catalog"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db.database import local_session
+from app.core.logger import logging
+from app.core.utils import cache
+from app.core.utils.metrics import Gauge
+from app.models.category import Category
+from app.models.question import Question
+from app.models.question_option import QuestionOption
+
+logger = logging.getLogger(__name__)
+
+catalog_version = Gauge("question_catalog_version", "Version of the question catalog snapshot this worker serves.")
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogCategory:
+    id: str
+    title: str
+    description: str | None
+    display_order: int
+    is_active: bool
+    icon: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogQuestion:
+    id: int
+    category_id: str
+    text: str
+    question_type: str
+    weight: float
+    display_order: int
+    is_active: bool
+    is_required: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogOption:
+    id: int
+    question_id: int
+    text: str
+    value: str
+    score_points: float
+    is_correct: bool
+    display_order: int
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogSnapshot:
+    """Immutable copy of the categories, questions and options, indexed for lookups without SQL.
+
+    `categories` follow their display order. Questions and options are ordered by id within
+    `questions_by_category` and `options_by_question`. `active_questions` holds the questions that are scored.
+    """
+
+    version: int
+    categories: Mapping[str, CatalogCategory]
+    questions: Mapping[int, CatalogQuestion]
+    active_questions: Mapping[int, CatalogQuestion]
+    options: Mapping[int, CatalogOption]
+    questions_by_category: Mapping[str, tuple[CatalogQuestion, ...]]
+    options_by_question: Mapping[int, tuple[CatalogOption, ...]]
+
+    @classmethod
+    def build(
+        cls,
+        version: int,
+        categories: Iterable[CatalogCategory],
+        questions: Iterable[CatalogQuestion],
+        options: Iterable[CatalogOption],
+    ) -> CatalogSnapshot:
+        ordered_categories = sorted(categories, key=lambda category: (category.display_order, category.id))
+        ordered_questions = sorted(questions, key=lambda question: question.id)
+        ordered_options = sorted(options, key=lambda option: option.id)
+
+        questions_by_category: defaultdict[str, list[CatalogQuestion]] = defaultdict(list)
+        for question in ordered_questions:
+            questions_by_category[question.category_id].append(question)
+        options_by_question: defaultdict[int, list[CatalogOption]] = defaultdict(list)
+        for option in ordered_options:
+            options_by_question[option.question_id].append(option)
+
+        return cls(
+            version=version,
+            categories=MappingProxyType({category.id: category for category in ordered_categories}),
+            questions=MappingProxyType({question.id: question for question in ordered_questions}),
+            active_questions=MappingProxyType(
+                {question.id: question for question in ordered_questions if question.is_active}
+            ),
+            options=MappingProxyType({option.id: option for option in ordered_options}),
+            questions_by_category=MappingProxyType({key: tuple(value) for key, value in questions_by_category.items()}),
+            options_by_question=MappingProxyType({key: tuple(value) for key, value in options_by_question.items()}),
+        )
+
+
+async def load_catalog_snapshot(db: AsyncSession, version: int = 0) -> CatalogSnapshot:
+    """Read every category, question and option in three queries and index them as `version`."""
+
+    categories = await db.execute(
+        select(
+            Category.id,
+            Category.title,
+            Category.description,
+            Category.display_order,
+            Category.is_active,
+            Category.icon,
+        )
+    )
+    questions = await db.execute(
+        select(
+            Question.id,
+            Question.category_id,
+            Question.question_text,
+            Question.question_type,
+            Question.weight,
+            Question.display_order,
+            Question.is_active,
+            Question.is_required,
+        )
+    )
+    options = await db.execute(
+        select(
+            QuestionOption.id,
+            QuestionOption.question_id,
+            QuestionOption.option_text,
+            QuestionOption.option_value,
+            QuestionOption.score_points,
+            QuestionOption.is_correct,
+            QuestionOption.display_order,
+        )
+    )
+    return CatalogSnapshot.build(
+        version,
+        (
+            CatalogCategory(
+                id=category.id,
+                title=category.title,
+                description=category.description,
+                display_order=category.display_order or 0,
+                is_active=category.is_active is not False,
+                icon=category.icon,
+            )
+            for category in categories
+        ),
+        (
+            CatalogQuestion(
+                id=question.id,
+                category_id=question.category_id,
+                text=question.question_text,
+                question_type=question.question_type or "multiple_choice",
+                weight=question.weight if question.weight is not None else 1.0,
+                display_order=question.display_order or 0,
+                is_active=question.is_active is not False,
+                is_required=question.is_required is not False,
+            )
+            for question in questions
+        ),
+        (
+            CatalogOption(
+                id=option.id,
+                question_id=option.question_id,
+                text=option.option_text,
+                value=option.option_value,
+                score_points=option.score_points or 0.0,
+                is_correct=bool(option.is_correct),
+                display_order=option.display_order or 0,
+            )
+            for option in options
+        ),
+    )
+
+
+class QuestionCatalog:
+    """Per-worker catalog snapshot that is replaced as a whole whenever any worker writes to the catalog.
+
+    The version is a counter in Redis, stored under the channel's name. `refresh` increments it after a write,
+    loads a new snapshot and publishes the version on the channel. `listen_for_changes` loads that version on
+    every other worker. Readers take `snapshot` once and keep using it, so a swap never exposes a half-built
+    catalog, and a snapshot is never replaced by an older version. Without Redis, versions are counted per
+    worker.
+
+    Parameters
+    ----------
+    channel: str
+        Redis channel that announces new versions, and the key of the version counter.
+    """
+
+    def __init__(self, channel: str = "catalog:version") -> None:
+        self.channel = channel
+        self.snapshot: CatalogSnapshot | None = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, db: AsyncSession) -> CatalogSnapshot:
+        """Return the current snapshot, loading it with `db` on first use."""
+        snapshot = self.snapshot
+        if snapshot is None:
+            async with self._lock:
+                snapshot = self.snapshot
+                if snapshot is None:
+                    snapshot = await self._load(db, await self._shared_version())
+        return snapshot
+
+    async def refresh(self, db: AsyncSession) -> CatalogSnapshot:
+        """Bump the version, reload this worker's snapshot and tell the other workers to reload theirs.
+
+        Call it after committing a change to a category, question or option.
+        """
+        async with self._lock:
+            version = await self._next_version()
+            snapshot = await self._load(db, version)
+
+        if cache.client is not None:
+            try:
+                await cache.client.publish(self.channel, str(version))
+            except Exception as e:
+                logger.warning(f"Could not announce question catalog version {version}: {e}")
+        return snapshot
+
+    async def reload(self, version: int | None = None) -> CatalogSnapshot:
+        """Load `version`, or the shared version, in a new session, unless this worker already serves a newer one."""
+        async with self._lock:
+            if version is None:
+                version = await self._shared_version()
+            current = self.snapshot
+            if current is not None and current.version > version:
+                return current
+            async with local_session() as db:
+                return await self._load(db, version)
+
+    async def listen_for_changes(self, retry_delay: float = 1.0) -> None:
+        """Load every version another worker announces, until cancelled.
+
+        Meant to run as a background task for the lifetime of the application. If the subscription drops, the
+        snapshot is reloaded after resubscribing, since announcements may have been missed.
+
+        Parameters
+        ----------
+        retry_delay: float
+            Seconds to wait before resubscribing after a connection error.
+        """
+        if cache.client is None:
+            raise cache.MissingClientError
+
+        missed_messages = False
+        while True:
+            pubsub = cache.client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                if missed_messages:
+                    await self.reload()
+                    missed_messages = False
+
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    version = int(message["data"])
+                    if self.snapshot is None or version > self.snapshot.version:
+                        await self.reload(version)
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                logger.warning(f"Question catalog subscription lost, retrying in {retry_delay}s: {e}")
+                missed_messages = True
+                await asyncio.sleep(retry_delay)
+
+            finally:
+                await pubsub.aclose()  # type: ignore
+
+    async def _load(self, db: AsyncSession, version: int) -> CatalogSnapshot:
+        snapshot = await load_catalog_snapshot(db, version)
+        current = self.snapshot
+        if current is None or snapshot.version >= current.version:
+            self.snapshot = snapshot
+        return snapshot
+
+    async def _shared_version(self) -> int:
+        if cache.client is not None:
+            try:
+                return int(await cache.client.get(self.channel) or 0)
+            except Exception as e:
+                logger.warning(f"Could not read the question catalog version: {e}")
+        return self.snapshot.version if self.snapshot is not None else 0
+
+    async def _next_version(self) -> int:
+        if cache.client is not None:
+            try:
+                return int(await cache.client.incr(self.channel))
+            except Exception as e:
+                logger.warning(f"Could not increment the question catalog version: {e}")
+        return (self.snapshot.version if self.snapshot is not None else 0) + 1
+
+
+question_catalog = QuestionCatalog()
+catalog_version.set_function(lambda: question_catalog.snapshot.version if question_catalog.snapshot is not None else -1)
@@ -0,0 +1,100 @@
+"""Docs: ./docs/functions/assessment_scoring.md | SPOT: ./SPOT.md#function-catalog"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+
+from .catalog import CatalogSnapshot
+
+
+@dataclass(slots=True)
+class QuestionScore:
+    question_id: int
+    category_id: str
+    score: float
+    max_score: float
+    is_correct: bool
+    answered: bool
+
+
+@dataclass(slots=True)
+class CategoryBreakdown:
+    category_id: str
+    title: str
+    score: float = 0.0
+    max_score: float = 0.0
+    questions: int = 0
+
+    @property
+    def percentage(self) -> float:
+        return self.score / self.max_score * 100 if self.max_score > 0 else 0.0
+
+
+@dataclass(slots=True)
+class AssessmentScore:
+    total_score: float
+    max_score: float
+    questions: dict[int, QuestionScore]
+    categories: list[CategoryBreakdown]
+    unknown_question_ids: list[int] = field(default_factory=list)
+
+    @property
+    def percentage(self) -> float:
+        return self.total_score / self.max_score * 100 if self.max_score > 0 else 0.0
+
+
+def score_answers(
+    catalog: CatalogSnapshot,
+    answers: Mapping[int, Iterable[int]],
+    *,
+    answered_only: bool = False,
+) -> AssessmentScore:
+    """Score selected option ids per question id against a catalog snapshot, without touching the database.
+
+    Every active question counts towards the maximum score unless `answered_only` is set, in which case
+    only the answered ones do. Options that do not belong to the question they were submitted for are
+    ignored. Answers to unknown or inactive questions are listed in `unknown_question_ids`. Category
+    breakdowns follow the categories' display order.
+    """
+
+    question_scores: dict[int, QuestionScore] = {}
+    breakdowns: dict[str, CategoryBreakdown] = {}
+    total_score = 0.0
+    max_score = 0.0
+
+    for question in catalog.active_questions.values():
+        answered = question.id in answers
+        if answered_only and not answered:
+            continue
+
+        score = 0.0
+        is_correct = False
+        for option_id in answers.get(question.id, ()):
+            option = catalog.options.get(option_id)
+            if option is not None and option.question_id == question.id:
+                score += option.score_points
+                is_correct = is_correct or option.is_correct
+
+        question_scores[question.id] = QuestionScore(
+            question.id, question.category_id, score, question.weight, is_correct, answered
+        )
+        breakdown = breakdowns.get(question.category_id)
+        if breakdown is None:
+            category = catalog.categories.get(question.category_id)
+            title = category.title if category is not None else "Unknown"
+            breakdown = breakdowns[question.category_id] = CategoryBreakdown(question.category_id, title)
+        breakdown.score += score
+        breakdown.max_score += question.weight
+        breakdown.questions += 1
+        total_score += score
+        max_score += question.weight
+
+    order = {category_id: index for index, category_id in enumerate(catalog.categories)}
+    return AssessmentScore(
+        total_score=total_score,
+        max_score=max_score,
+        questions=question_scores,
+        categories=sorted(breakdowns.values(), key=lambda breakdown: order.get(breakdown.category_id, len(order))),
+        unknown_question_ids=[question_id for question_id in answers if question_id not in catalog.active_questions],
+    )
@@ -22,12 +22,31 @@ class AppSettings(BaseSettings):
 class CryptSettings(BaseSettings):
     SECRET_KEY: SecretStr = config("SECRET_KEY", cast=SecretStr)
     ALGORITHM: str = config("ALGORITHM", default="HS256")
+    JWT_KEYS_FILE: str | None = config("JWT_KEYS_FILE", default=None)
+    JWT_ACTIVE_KID: str | None = config("JWT_ACTIVE_KID", default=None)
+    JWT_KEYS_RELOAD_SECONDS: float = config("JWT_KEYS_RELOAD_SECONDS", default=60)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = config("ACCESS_TOKEN_EXPIRE_MINUTES", default=30)
     REFRESH_TOKEN_EXPIRE_DAYS: int = config("REFRESH_TOKEN_EXPIRE_DAYS", default=7)
+    TOKEN_CACHE_MAX_SIZE: int = config("TOKEN_CACHE_MAX_SIZE", default=10000)
+    TOKEN_REVOCATION_CHANNEL: str = config("TOKEN_REVOCATION_CHANNEL", default="auth:revoked")
+    TOKEN_BLACKLIST_BLOOM_CAPACITY: int = config("TOKEN_BLACKLIST_BLOOM_CAPACITY", default=100000)
+    TOKEN_BLACKLIST_BLOOM_ERROR_RATE: float = config("TOKEN_BLACKLIST_BLOOM_ERROR_RATE", default=0.01)
+    PRINCIPAL_CACHE_TTL: float = config("PRINCIPAL_CACHE_TTL", default=30)
+    PRINCIPAL_CACHE_MAX_SIZE: int = config("PRINCIPAL_CACHE_MAX_SIZE", default=10000)
+    PASSWORD_HASH_ROUNDS: int = config("PASSWORD_HASH_ROUNDS", default=12)
+    PASSWORD_HASH_WORKERS: int = config("PASSWORD_HASH_WORKERS", default=2)
+    PASSWORD_HASH_MAX_PENDING: int = config("PASSWORD_HASH_MAX_PENDING", default=32)
 
 
 class DatabaseSettings(BaseSettings):
-    pass
+    DB_POOL_SIZE: int = config("DB_POOL_SIZE", default=5)
+    DB_MAX_OVERFLOW: int = config("DB_MAX_OVERFLOW", default=10)
+    DB_POOL_TIMEOUT: float = config("DB_POOL_TIMEOUT", default=30)
+    DB_POOL_RECYCLE: int = config("DB_POOL_RECYCLE", default=1800)
+    DB_POOL_PRE_PING: bool = config("DB_POOL_PRE_PING", default=False)
+    DB_QUERY_CACHE_SIZE: int = config("DB_QUERY_CACHE_SIZE", default=500)
+    DB_STATEMENT_CACHE_SIZE: int = config("DB_STATEMENT_CACHE_SIZE", default=100)
+    DB_REPLICA_EJECT_SECONDS: float = config("DB_REPLICA_EJECT_SECONDS", default=30)
 
 
 class SQLiteSettings(DatabaseSettings):
@@ -58,6 +77,7 @@ class PostgresSettings(DatabaseSettings):
     POSTGRES_ASYNC_PREFIX: str = config("POSTGRES_ASYNC_PREFIX", default="postgresql+asyncpg://")
     POSTGRES_URI: str = f"{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
     POSTGRES_URL: str | None = config("POSTGRES_URL", default=None)
+    POSTGRES_REPLICA_URIS: str = config("POSTGRES_REPLICA_URIS", default="")
 
 
 class FirstUserSettings(BaseSettings):
@@ -74,6 +94,11 @@ class RedisCacheSettings(BaseSettings):
     REDIS_CACHE_HOST: str = config("REDIS_CACHE_HOST", default="localhost")
     REDIS_CACHE_PORT: int = config("REDIS_CACHE_PORT", default=6379)
     REDIS_CACHE_URL: str = f"redis://{REDIS_CACHE_HOST}:{REDIS_CACHE_PORT}"
+    REDIS_CACHE_LOCAL_ENABLED: bool = config("REDIS_CACHE_LOCAL_ENABLED", default=False)
+    REDIS_CACHE_LOCAL_MAX_SIZE: int = config("REDIS_CACHE_LOCAL_MAX_SIZE", default=1024)
+    REDIS_CACHE_LOCAL_TTL: float = config("REDIS_CACHE_LOCAL_TTL", default=5)
+    REDIS_CACHE_INVALIDATION_CHANNEL: str = config("REDIS_CACHE_INVALIDATION_CHANNEL", default="cache:invalidate")
+    REDIS_CATALOG_CHANNEL: str = config("REDIS_CATALOG_CHANNEL", default="catalog:version")
 
 
 class ClientSideCacheSettings(BaseSettings):
@@ -89,11 +114,16 @@ class RedisRateLimiterSettings(BaseSettings):
     REDIS_RATE_LIMIT_HOST: str = config("REDIS_RATE_LIMIT_HOST", default="localhost")
     REDIS_RATE_LIMIT_PORT: int = config("REDIS_RATE_LIMIT_PORT", default=6379)
     REDIS_RATE_LIMIT_URL: str = f"redis://{REDIS_RATE_LIMIT_HOST}:{REDIS_RATE_LIMIT_PORT}"
+    REDIS_RATE_LIMIT_RULES_CHANNEL: str = config("REDIS_RATE_LIMIT_RULES_CHANNEL", default="ratelimit:rules")
+    REDIS_RATE_LIMIT_LOCAL_COUNTERS_ENABLED: bool = config("REDIS_RATE_LIMIT_LOCAL_COUNTERS_ENABLED", default=False)
+    REDIS_RATE_LIMIT_SYNC_INTERVAL_MS: int = config("REDIS_RATE_LIMIT_SYNC_INTERVAL_MS", default=100)
+    REDIS_RATE_LIMIT_SYNC_HITS: int = config("REDIS_RATE_LIMIT_SYNC_HITS", default=20)
 
 
 class DefaultRateLimitSettings(BaseSettings):
     DEFAULT_RATE_LIMIT_LIMIT: int = config("DEFAULT_RATE_LIMIT_LIMIT", default=10)
     DEFAULT_RATE_LIMIT_PERIOD: int = config("DEFAULT_RATE_LIMIT_PERIOD", default=3600)
+    DEFAULT_RATE_LIMIT_ALGORITHM: str = config("DEFAULT_RATE_LIMIT_ALGORITHM", default="fixed_window")
 
 
 class CRUDAdminSettings(BaseSettings):
@@ -117,6 +147,12 @@ class CRUDAdminSettings(BaseSettings):
     CRUD_ADMIN_REDIS_SSL: bool = config("CRUD_ADMIN_REDIS_SSL", default=False)
 
 
+class MetricsSettings(BaseSettings):
+    METRICS_ENABLED: bool = config("METRICS_ENABLED", default=False)
+    METRICS_PATH: str = config("METRICS_PATH", default="/metrics")
+    METRICS_TOKEN: SecretStr | None = config("METRICS_TOKEN", cast=SecretStr, default=None)
+
+
 class EnvironmentOption(Enum):
     LOCAL = "local"
     STAGING = "staging"
@@ -139,6 +175,7 @@ class Settings(
     RedisRateLimiterSettings,
     DefaultRateLimitSettings,
     CRUDAdminSettings,
+    MetricsSettings,
     EnvironmentSettings,
 ):
     pass
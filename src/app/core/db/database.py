@@ -1,10 +1,14 @@
 from collections.abc import AsyncGenerator
+from typing import Annotated
 
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import DeclarativeBase, MappedAsDataclass
 
 from ..config import settings
+from .pool import InstrumentedPool, instrument_pool
+from .replicas import ReplicaSet
 
 
 class Base(DeclarativeBase, MappedAsDataclass):
@@ -14,12 +18,72 @@ class Base(DeclarativeBase, MappedAsDataclass):
 DATABASE_URI = settings.POSTGRES_URI
 DATABASE_PREFIX = settings.POSTGRES_ASYNC_PREFIX
 DATABASE_URL = f"{DATABASE_PREFIX}{DATABASE_URI}"
+REPLICA_URIS = [uri.strip() for uri in settings.POSTGRES_REPLICA_URIS.split(",") if uri.strip()]
+# asyncpg prepares every statement; this bounds its per-connection cache of prepared statements.
+CONNECT_ARGS = (
+    {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE} if "asyncpg" in DATABASE_PREFIX else {}
+)
 
-async_engine = create_async_engine(DATABASE_URL, echo=False, future=True)
+
+def _create_engine(url: str, name: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        echo=False,
+        future=True,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_logging_name=name,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        connect_args=CONNECT_ARGS,
+    )
+    instrument_pool(engine)
+    return engine
+
+
+async_engine = _create_engine(DATABASE_URL, "primary")
 
 local_session = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
 
+read_replicas = ReplicaSet(
+    [_create_engine(f"{DATABASE_PREFIX}{uri}", f"replica_{index}") for index, uri in enumerate(REPLICA_URIS)],
+    eject_seconds=settings.DB_REPLICA_EJECT_SECONDS,
+)
+
 
 async def async_get_db() -> AsyncGenerator[AsyncSession, None]:
+    """Yield the request's database session.
+
+    FastAPI resolves a dependency once per request, so the endpoint and every dependency that declares
+    `Depends(async_get_db)`, such as `get_current_user` and `rate_limiter_dependency`, share this one session.
+    The session checks out a pooled connection only when it runs its first statement. Requests answered
+    from a cache, or authenticated from the token and principal caches, therefore never touch the pool.
+    """
     async with local_session() as db:
         yield db
+
+
+async def async_get_read_db(
+    primary: Annotated[AsyncSession, Depends(async_get_db)],
+) -> AsyncGenerator[AsyncSession, None]:
+    """Yield a session on a read replica, for endpoints that only read and can tolerate replication lag.
+
+    Replicas are used round-robin. A replica that fails with a connection error is ejected from the
+    rotation for `DB_REPLICA_EJECT_SECONDS`. With no replica configured, or every replica ejected, this
+    yields the request's primary session from `async_get_db`, so the request still uses a single session.
+    """
+    index = read_replicas.choose()
+    if index is None:
+        yield primary
+        return
+
+    async with read_replicas.sessionmakers[index]() as db:
+        try:
+            yield db
+        except Exception as e:
+            if ReplicaSet.is_connection_error(e):
+                read_replicas.eject(index)
+            raise
@@ -0,0 +1,69 @@
+import time
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+
+from ..utils.metrics import Counter, Gauge, Histogram
+
+checkouts = Counter("db_pool_checkouts_total", "Connections checked out of the pool.", ("pool",))
+checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to get a connection from the pool, including opening a new one.",
+    labelnames=("pool",),
+)
+checkout_timeouts = Counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT seconds.", ("pool",)
+)
+checked_out = Gauge("db_pool_checked_out", "Connections currently checked out.", ("pool",))
+overflow = Gauge("db_pool_overflow", "Connections open beyond DB_POOL_SIZE.", ("pool",))
+invalidations = Counter("db_pool_invalidations_total", "Connections invalidated, e.g. after a disconnect.", ("pool",))
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """`AsyncAdaptedQueuePool` that records how long each checkout waits for a connection.
+
+    Pool events fire only once a connection has been handed out, so the wait is timed around `_do_get`.
+    Metrics are labelled with the engine's `pool_logging_name`, which survives `engine.dispose()`.
+    """
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        name = self.logging_name or "primary"
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            checkout_timeouts.inc(pool=name)
+            raise
+        finally:
+            checkout_wait.observe(time.perf_counter() - start, pool=name)
+
+
+def instrument_pool(engine: AsyncEngine) -> None:
+    """Export checkout, overflow and invalidation metrics for `engine`'s pool.
+
+    Listeners are registered on the engine, and the gauges read `engine.pool` when rendered, so both follow
+    the pool when `engine.dispose()` replaces it.
+    """
+    sync_engine = engine.sync_engine
+    name = sync_engine.pool.logging_name or "primary"
+
+    def pool_usage(read: Callable[[QueuePool], int]) -> Callable[[], float]:
+        def sample() -> float:
+            pool = sync_engine.pool
+            return max(read(pool), 0) if isinstance(pool, QueuePool) else 0
+
+        return sample
+
+    checked_out.set_function(pool_usage(QueuePool.checkedout), pool=name)
+    overflow.set_function(pool_usage(QueuePool.overflow), pool=name)
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(dbapi_connection: Any, connection_record: ConnectionPoolEntry, connection_proxy: Any) -> None:
+        checkouts.inc(pool=name)
+
+    @event.listens_for(sync_engine, "invalidate")
+    def on_invalidate(dbapi_connection: Any, connection_record: ConnectionPoolEntry, exception: Any) -> None:
+        invalidations.inc(pool=name)
@@ -0,0 +1,62 @@
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from ..logger import logging
+from ..utils.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+ejections = Counter(
+    "db_replica_ejections_total", "Times a read replica was taken out of rotation after a connection error.", ("pool",)
+)
+
+
+class ReplicaSet:
+    """Read replica engines used round-robin, skipping replicas that recently failed.
+
+    Health is tracked passively: a replica that raises a connection error (see `is_connection_error`) is
+    ejected for `eject_seconds` and then tried again. Each worker process tracks health on its own.
+
+    Parameters
+    ----------
+    engines: list[AsyncEngine]
+        One engine per replica.
+    eject_seconds: float
+        How long a failed replica is left out of rotation.
+    """
+
+    def __init__(self, engines: list[AsyncEngine], eject_seconds: float = 30) -> None:
+        self.engines = engines
+        self.eject_seconds = eject_seconds
+        self.sessionmakers = [
+            async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False) for engine in engines
+        ]
+        self._ejected_until = [0.0] * len(engines)
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def choose(self) -> int | None:
+        """Index of the next healthy replica, or None if there are no replicas or all of them are ejected."""
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            index = self._next
+            self._next = (index + 1) % len(self.engines)
+            if self._ejected_until[index] <= now:
+                return index
+        return None
+
+    def eject(self, index: int) -> None:
+        name = self.engines[index].sync_engine.pool.logging_name or f"replica_{index}"
+        self._ejected_until[index] = time.monotonic() + self.eject_seconds
+        ejections.inc(pool=name)
+        logger.warning(f"Read replica {name} ejected for {self.eject_seconds}s after a connection error.")
+
+    @staticmethod
+    def is_connection_error(error: BaseException) -> bool:
+        if isinstance(error, exc.DBAPIError) and error.connection_invalidated:
+            return True
+        return isinstance(error, OSError | exc.InterfaceError | exc.OperationalError)
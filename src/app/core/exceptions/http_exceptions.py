@@ -7,5 +7,21 @@ from fastcrud.exceptions.http_exceptions import (
     UnauthorizedException,
     UnprocessableEntityException,
     DuplicateValueException,
-    RateLimitException,
+    RateLimitException as _RateLimitException,
 )
+
+
+class RateLimitException(_RateLimitException):
+    """429 error that can carry `Retry-After` and `RateLimit-*` headers."""
+
+    def __init__(self, detail: str | None = None, headers: dict[str, str] | None = None):
+        super().__init__(detail)
+        self.headers = headers
+
+
+class ServiceUnavailableException(CustomException):
+    """503 error for load shedding, with an optional `Retry-After` header."""
+
+    def __init__(self, detail: str | None = None, headers: dict[str, str] | None = None):
+        super().__init__(status_code=503, detail=detail)
+        self.headers = headers
@@ -1,24 +1,55 @@
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
 from enum import Enum
-from typing import Any, Literal, cast
+from typing import Any, Literal, TypeVar, cast
 
 import bcrypt
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from pydantic import SecretStr
+from jose import JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..crud.crud_users import crud_users
 from .config import settings
 from .db.crud_token_blacklist import crud_token_blacklist
+from .exceptions.cache_exceptions import MissingClientError
+from .exceptions.http_exceptions import ServiceUnavailableException
+from .logger import logging
 from .schemas import TokenBlacklistCreate, TokenData
+from .utils import cache
+from .utils.metrics import Counter, Gauge, Histogram
+from .utils.signing_keys import signing_keys
+from .utils.token_blacklist import token_blacklist
+
+logger = logging.getLogger(__name__)
 
-SECRET_KEY: SecretStr = settings.SECRET_KEY
-ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
+PASSWORD_HASH_ROUNDS = settings.PASSWORD_HASH_ROUNDS
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/login")
+token_revocation_channel = settings.TOKEN_REVOCATION_CHANNEL
+
+_T = TypeVar("_T")
+
+password_hash_queue_depth = Gauge(
+    "password_hash_queue_depth", "Password hash and verify calls queued or running in the worker pool."
+)
+password_hash_latency = Histogram(
+    "password_hash_seconds",
+    "Time to hash or verify a password, including time queued for a pool thread.",
+    labelnames=("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+password_hash_rejections = Counter(
+    "password_hash_rejected_total", "Password hash and verify calls refused because the pool was full.", ("operation",)
+)
 
 
 class TokenType(str, Enum):
@@ -26,16 +57,245 @@ class TokenType(str, Enum):
     REFRESH = "refresh"
 
 
-async def verify_password(plain_password: str, hashed_password: str) -> bool:
+class VerifiedTokenCache:
+    """Bounded LRU of decoded tokens that passed signature and blacklist checks, keyed by the token's SHA-256.
+
+    Entries expire at the token's own `exp`, so a cached token is never accepted for longer than
+    `signing_keys.decode` would accept it. Blacklisting a token must evict it here too (see
+    `revoke_cached_tokens`), since a cache hit skips the blacklist query.
+
+    Parameters
+    ----------
+    maxsize: int
+        Maximum number of tokens kept before the least recently used one is evicted. 0 disables the cache.
+    """
+
+    def __init__(self, maxsize: int = 10_000) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        key = self.digest(token)
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return payload
+
+    def set(self, token: str, payload: dict[str, Any]) -> None:
+        expires_at = payload.get("exp")
+        if self.maxsize <= 0 or not isinstance(expires_at, int | float):
+            return
+
+        key = self.digest(token)
+        self._data[key] = (expires_at, payload)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def discard(self, *digests: str) -> None:
+        for key in digests:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+verified_tokens = VerifiedTokenCache(maxsize=settings.TOKEN_CACHE_MAX_SIZE)
+
+# Users resolved by `get_current_user`, keyed by the token's subject claim and tagged with `principal_tag`.
+# Entries hold only the `UserPrincipal` fields, never the password hash or profile fields.
+principals: cache.LocalCache[dict[str, Any]] = cache.LocalCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL
+)
+
+
+def principal_tag(username: str) -> str:
+    return f"user:{username}"
+
+
+async def revoke_cached_tokens(*tokens: str, jtis: tuple[str, ...] = ()) -> None:
+    """Evict `tokens` from every worker's `verified_tokens`, so blacklisting takes effect immediately.
+
+    Evicts locally, then announces the token digests on `token_revocation_channel` when the cache
+    Redis client is available (see `listen_for_token_revocations`), together with `jtis`, the token IDs
+    just added to `token_blacklist`, for the other workers' Bloom filters.
+    """
+    digests = [VerifiedTokenCache.digest(token) for token in tokens]
+    verified_tokens.discard(*digests)
+    if cache.client is not None:
+        try:
+            await cache.client.publish(token_revocation_channel, json.dumps({"digests": digests, "jtis": list(jtis)}))
+        except Exception as e:
+            logger.warning(f"Could not announce revoked tokens to the other workers: {e}")
+
+
+async def invalidate_principals(*usernames: str) -> None:
+    """Evict the cached users of `usernames` from every worker's `principals`.
+
+    Call it after changing or deleting a user, with the username the user had before the change. Like
+    `revoke_cached_tokens`, it evicts locally and then announces the usernames on `token_revocation_channel`.
+    """
+    principals.delete_tags(*(principal_tag(username) for username in usernames))
+    if cache.client is not None:
+        try:
+            await cache.client.publish(token_revocation_channel, json.dumps({"usernames": list(usernames)}))
+        except Exception as e:
+            logger.warning(f"Could not announce changed users to the other workers: {e}")
+
+
+async def listen_for_token_revocations(retry_delay: float = 1.0) -> None:
+    """Apply revocations announced on the revocation channel until cancelled.
+
+    Announced tokens are evicted from `verified_tokens` and their IDs added to the `token_blacklist` Bloom
+    filter, which is rebuilt from Redis every time the subscription is (re)established. IDs this worker revoked
+    while Redis was unreachable are written by that rebuild and announced then. Announced usernames
+    are evicted from `principals`. Meant to run as a background task for the lifetime of the application.
+    If the subscription drops, the token and principal caches are cleared (revocations may have been missed)
+    and the subscription is retried.
+
+    Parameters
+    ----------
+    retry_delay: float
+        Seconds to wait before resubscribing after a connection error.
+    """
+    if cache.client is None:
+        raise MissingClientError
+
+    while True:
+        pubsub = cache.client.pubsub()
+        try:
+            await pubsub.subscribe(token_revocation_channel)
+            saved = await token_blacklist.rebuild()
+            if saved:
+                await cache.client.publish(token_revocation_channel, json.dumps({"jtis": saved}))
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+
+                payload = json.loads(message["data"])
+                verified_tokens.discard(*payload.get("digests", ()))
+                for jti in payload.get("jtis", ()):
+                    token_blacklist.remember(jti)
+                principals.delete_tags(*(principal_tag(username) for username in payload.get("usernames", ())))
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            logger.warning(f"Token revocation subscription lost, retrying in {retry_delay}s: {e}")
+            verified_tokens.clear()
+            principals.clear()
+            token_blacklist.ready = False
+            await asyncio.sleep(retry_delay)
+
+        finally:
+            await pubsub.aclose()  # type: ignore
+
+
+class PasswordHashPool:
+    """Bounded thread pool that runs bcrypt off the event loop.
+
+    bcrypt releases the GIL while it works, so threads run hashes in parallel without the pickling cost of a
+    process pool. At most `max_workers` calls run at once and the rest wait in the pool's queue. Once
+    `max_pending` calls are queued or running, new ones fail fast with a 503 and `Retry-After` instead of
+    piling up behind a login burst.
+
+    Parameters
+    ----------
+    max_workers: int
+        Number of threads hashing at the same time. More than the number of CPU cores buys nothing.
+    max_pending: int
+        Maximum number of calls queued or running before new calls are refused.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 32) -> None:
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor: ThreadPoolExecutor | None = None
+
+    async def run(self, operation: str, func: Callable[..., _T], *args: Any) -> _T:
+        if self.pending >= self.max_pending:
+            password_hash_rejections.inc(operation=operation)
+            raise ServiceUnavailableException("Too many password checks in progress.", headers={"Retry-After": "1"})
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hash")
+
+        self.pending += 1
+        password_hash_queue_depth.set(self.pending)
+        try:
+            with password_hash_latency.time(operation=operation):
+                return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+            password_hash_queue_depth.set(self.pending)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hash_pool = PasswordHashPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS, max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
+
+
+def _check_password(plain_password: str, hashed_password: str) -> bool:
     correct_password: bool = bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
     return correct_password
 
 
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hash_pool.run("verify", _check_password, plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
-    hashed_password: str = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    """Hash `password` on the calling thread, for synchronous callers such as the admin panel and scripts.
+
+    Request handlers should await `hash_password` instead, which runs the same hash in `password_hash_pool`.
+    """
+    hashed_password: str = bcrypt.hashpw(password.encode(), bcrypt.gensalt(PASSWORD_HASH_ROUNDS)).decode()
     return hashed_password
 
 
+async def hash_password(password: str) -> str:
+    return await password_hash_pool.run("hash", get_password_hash, password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether `hashed_password` was made with another algorithm or cost than `get_password_hash` uses now."""
+    _, ident, rounds, *_ = [*hashed_password.split("$", 3), "", "", ""]
+    return ident != "2b" or not rounds.isdigit() or int(rounds) != PASSWORD_HASH_ROUNDS
+
+
+async def _upgrade_password_hash(db_user: dict[str, Any], password: str, db: AsyncSession) -> None:
+    try:
+        hashed_password = await hash_password(password)
+        await crud_users.update(db=db, object={"hashed_password": hashed_password}, id=db_user["id"])
+    except Exception as e:
+        logger.warning(f"Could not upgrade the password hash of user {db_user['id']}: {e}")
+        return
+
+    db_user["hashed_password"] = hashed_password
+    await invalidate_principals(db_user["username"])
+
+
 async def authenticate_user(username_or_email: str, password: str, db: AsyncSession) -> dict[str, Any] | Literal[False]:
     if "@" in username_or_email:
         db_user = await crud_users.get(db=db, email=username_or_email, is_deleted=False)
@@ -49,6 +309,9 @@ async def authenticate_user(username_or_email: str, password: str, db: AsyncSess
     if not await verify_password(password, db_user["hashed_password"]):
         return False
 
+    if password_needs_rehash(db_user["hashed_password"]):
+        await _upgrade_password_hash(db_user, password, db)
+
     return db_user
 
 
@@ -58,9 +321,8 @@ async def create_access_token(data: dict[str, Any], expires_delta: timedelta | N
         expire = datetime.now(UTC).replace(tzinfo=None) + expires_delta
     else:
         expire = datetime.now(UTC).replace(tzinfo=None) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire, "token_type": TokenType.ACCESS})
-    encoded_jwt: str = jwt.encode(to_encode, SECRET_KEY.get_secret_value(), algorithm=ALGORITHM)
-    return encoded_jwt
+    to_encode.update({"exp": expire, "token_type": TokenType.ACCESS, "jti": uuid.uuid4().hex})
+    return signing_keys.sign(to_encode)
 
 
 async def create_refresh_token(data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
@@ -69,9 +331,8 @@ async def create_refresh_token(data: dict[str, Any], expires_delta: timedelta |
         expire = datetime.now(UTC).replace(tzinfo=None) + expires_delta
     else:
         expire = datetime.now(UTC).replace(tzinfo=None) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "token_type": TokenType.REFRESH})
-    encoded_jwt: str = jwt.encode(to_encode, SECRET_KEY.get_secret_value(), algorithm=ALGORITHM)
-    return encoded_jwt
+    to_encode.update({"exp": expire, "token_type": TokenType.REFRESH, "jti": uuid.uuid4().hex})
+    return signing_keys.sign(to_encode)
 
 
 async def verify_token(token: str, expected_token_type: TokenType, db: AsyncSession) -> TokenData | None:
@@ -90,24 +351,65 @@ async def verify_token(token: str, expected_token_type: TokenType, db: AsyncSess
     -------
     TokenData | None
         TokenData instance if the token is valid, None otherwise.
+
+    Notes
+    -----
+    Tokens that pass are kept in `verified_tokens` until they expire, so repeated requests with the same
+    token skip both the blacklist check and signature verification.
     """
-    is_blacklisted = await crud_token_blacklist.exists(db, token=token)
-    if is_blacklisted:
+    payload = verified_tokens.get(token)
+    if payload is None:
+        try:
+            payload = signing_keys.decode(token)
+        except JWTError:
+            return None
+
+        if await is_token_revoked(token, payload, db):
+            return None
+
+        verified_tokens.set(token, payload)
+
+    username_or_email: str | None = payload.get("sub")
+    token_type: str | None = payload.get("token_type")
+
+    if username_or_email is None or token_type != expected_token_type:
         return None
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY.get_secret_value(), algorithms=[ALGORITHM])
-        username_or_email: str | None = payload.get("sub")
-        token_type: str | None = payload.get("token_type")
+    return TokenData(username_or_email=username_or_email)
 
-        if username_or_email is None or token_type != expected_token_type:
-            return None
 
-        return TokenData(username_or_email=username_or_email)
+async def is_token_revoked(token: str, payload: dict[str, Any], db: AsyncSession) -> bool:
+    """Check the blacklist for a decoded token.
 
-    except JWTError:
+    Tokens with a `jti` claim are checked in `token_blacklist`, usually without a network call. Tokens
+    issued without one, or any token when Redis is unavailable, fall back to a `token_blacklist` table query.
+    """
+    jti = payload.get("jti")
+    if jti is not None and cache.client is not None:
+        try:
+            return await token_blacklist.is_revoked(jti)
+        except Exception as e:
+            logger.warning(f"Could not check the token blacklist in Redis, querying the table instead: {e}")
+
+    return await crud_token_blacklist.exists(db, token=token)
+
+
+async def _blacklist(token: str, db: AsyncSession) -> str | None:
+    payload = signing_keys.decode(token)
+    exp_timestamp = payload.get("exp")
+    if exp_timestamp is None:
         return None
 
+    expires_at = datetime.fromtimestamp(exp_timestamp)
+    await crud_token_blacklist.create(db, object=TokenBlacklistCreate(token=token, expires_at=expires_at))
+
+    jti: str | None = payload.get("jti")
+    if jti is None or cache.client is None:
+        return None
+
+    await token_blacklist.add(jti, exp_timestamp)
+    return jti
+
 
 async def blacklist_tokens(access_token: str, refresh_token: str, db: AsyncSession) -> None:
     """Blacklist both access and refresh tokens.
@@ -121,17 +423,10 @@ async def blacklist_tokens(access_token: str, refresh_token: str, db: AsyncSessi
     db: AsyncSession
         Database session for performing database operations.
     """
-    for token in [access_token, refresh_token]:
-        payload = jwt.decode(token, SECRET_KEY.get_secret_value(), algorithms=[ALGORITHM])
-        exp_timestamp = payload.get("exp")
-        if exp_timestamp is not None:
-            expires_at = datetime.fromtimestamp(exp_timestamp)
-            await crud_token_blacklist.create(db, object=TokenBlacklistCreate(token=token, expires_at=expires_at))
+    jtis = [await _blacklist(token, db) for token in [access_token, refresh_token]]
+    await revoke_cached_tokens(access_token, refresh_token, jtis=tuple(jti for jti in jtis if jti is not None))
 
 
 async def blacklist_token(token: str, db: AsyncSession) -> None:
-    payload = jwt.decode(token, SECRET_KEY.get_secret_value(), algorithms=[ALGORITHM])
-    exp_timestamp = payload.get("exp")
-    if exp_timestamp is not None:
-        expires_at = datetime.fromtimestamp(exp_timestamp)
-        await crud_token_blacklist.create(db, object=TokenBlacklistCreate(token=token, expires_at=expires_at))
+    jti = await _blacklist(token, db)
+    await revoke_cached_tokens(token, jtis=(jti,) if jti is not None else ())
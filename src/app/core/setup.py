@@ -1,20 +1,24 @@
 # Docs: ./docs/functions/core_setup.md | SPOT: ./SPOT.md#function-catalog
+import asyncio
+import os
+import secrets
 from collections.abc import AsyncGenerator, Callable
 from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
-from typing import Any
+from typing import Annotated, Any
 
 import anyio
 import fastapi
-import os
 import redis.asyncio as redis
 from arq import create_pool
 from arq.connections import RedisSettings
-from fastapi import APIRouter, Depends, FastAPI
+from fastapi import APIRouter, Depends, FastAPI, Header
 from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
+from fastapi.responses import PlainTextResponse
 
 from ..api.dependencies import get_current_superuser
-from ..core.utils.rate_limit import rate_limiter
+from ..assessment_engine import question_catalog
+from ..core.utils.rate_limit import LocalRateLimitCounters, rate_limiter
 from ..middleware.client_cache_middleware import ClientCacheMiddleware
 from ..models import *  # noqa: F403
 from .config import (
@@ -23,18 +27,27 @@ from .config import (
     DatabaseSettings,
     EnvironmentOption,
     EnvironmentSettings,
+    MetricsSettings,
     RedisCacheSettings,
     RedisQueueSettings,
     RedisRateLimiterSettings,
     settings,
 )
-from .db.database import Base
+from .db.database import Base, local_session
 from .db.database import async_engine as engine
+from .exceptions.http_exceptions import UnauthorizedException
+from .logger import logging
+from .security import listen_for_token_revocations, password_hash_pool
 from .utils import cache, queue
+from .utils.metrics import registry as metrics_registry
 
+logger = logging.getLogger(__name__)
 
 REDIS_DISABLED = os.getenv("DISABLE_REDIS_FOR_TESTS", "").lower() in {"1", "true", "yes"}
 
+cache_invalidation_tasks: set[asyncio.Task] = set()
+rate_limit_tasks: set[asyncio.Task] = set()
+
 
 # -------------- database --------------
 async def create_tables() -> None:
@@ -49,10 +62,28 @@ async def create_redis_cache_pool() -> None:
     cache.pool = redis.ConnectionPool.from_url(settings.REDIS_CACHE_URL)
     cache.client = redis.Redis.from_pool(cache.pool)  # type: ignore
 
+    if settings.REDIS_CACHE_LOCAL_ENABLED:
+        cache.local_cache = cache.LocalCache(
+            maxsize=settings.REDIS_CACHE_LOCAL_MAX_SIZE, ttl=settings.REDIS_CACHE_LOCAL_TTL
+        )
+        cache.invalidation_channel = settings.REDIS_CACHE_INVALIDATION_CHANNEL
+        cache_invalidation_tasks.add(asyncio.create_task(cache.listen_for_invalidations()))
+
+    cache_invalidation_tasks.add(asyncio.create_task(listen_for_token_revocations()))
+
+    question_catalog.channel = settings.REDIS_CATALOG_CHANNEL
+    cache_invalidation_tasks.add(asyncio.create_task(question_catalog.listen_for_changes()))
+
 
 async def close_redis_cache_pool() -> None:
     if REDIS_DISABLED:
         return
+    for task in cache_invalidation_tasks:
+        task.cancel()
+    await asyncio.gather(*cache_invalidation_tasks, return_exceptions=True)
+    cache_invalidation_tasks.clear()
+    cache.local_cache = None
+
     if cache.client is not None:
         await cache.client.aclose()  # type: ignore
 
@@ -76,11 +107,49 @@ async def create_redis_rate_limit_pool() -> None:
     if REDIS_DISABLED:
         return
     rate_limiter.initialize(settings.REDIS_RATE_LIMIT_URL)  # type: ignore
+    rate_limiter.rules_channel = settings.REDIS_RATE_LIMIT_RULES_CHANNEL  # type: ignore
+    rate_limit_tasks.add(asyncio.create_task(rate_limiter.listen_for_rule_changes()))
+
+    if settings.REDIS_RATE_LIMIT_LOCAL_COUNTERS_ENABLED:
+        rate_limiter.local_counters = LocalRateLimitCounters(
+            rate_limiter.get_client(),
+            sync_interval=settings.REDIS_RATE_LIMIT_SYNC_INTERVAL_MS / 1000,
+            sync_hits=settings.REDIS_RATE_LIMIT_SYNC_HITS,
+        )
+        rate_limit_tasks.add(asyncio.create_task(rate_limiter.local_counters.run()))
+
+
+async def load_rate_limit_rules() -> None:
+    try:
+        async with local_session() as db:
+            await rate_limiter.rules.load(db)
+    except Exception as e:
+        logger.warning(f"Could not load rate limit rules at startup, they will be loaded on first use: {e}")
+
+
+# -------------- question catalog --------------
+async def load_question_catalog() -> None:
+    try:
+        await question_catalog.reload()
+    except Exception as e:
+        logger.warning(f"Could not load the question catalog at startup, it will be loaded on first use: {e}")
 
 
 async def close_redis_rate_limit_pool() -> None:
     if REDIS_DISABLED:
         return
+    for task in rate_limit_tasks:
+        task.cancel()
+    await asyncio.gather(*rate_limit_tasks, return_exceptions=True)
+    rate_limit_tasks.clear()
+
+    if rate_limiter.local_counters is not None:
+        try:
+            await rate_limiter.local_counters.sync()
+        except Exception as e:
+            logger.warning(f"Could not sync local rate limit counters on shutdown: {e}")
+        rate_limiter.local_counters = None
+
     if rate_limiter.client is not None:
         await rate_limiter.client.aclose()  # type: ignore
 
@@ -99,6 +168,7 @@ def lifespan_factory(
         | ClientSideCacheSettings
         | RedisQueueSettings
         | RedisRateLimiterSettings
+        | MetricsSettings
         | EnvironmentSettings
     ),
     create_tables_on_start: bool = True,
@@ -124,10 +194,16 @@ def lifespan_factory(
             if isinstance(settings, RedisRateLimiterSettings):
                 await create_redis_rate_limit_pool()
 
-            skip_tables = os.getenv("DISABLE_DB_FOR_TESTS", "").lower() in {"1", "true", "yes"}
-            if create_tables_on_start and not skip_tables:
+            db_disabled = os.getenv("DISABLE_DB_FOR_TESTS", "").lower() in {"1", "true", "yes"}
+            if create_tables_on_start and not db_disabled:
                 await create_tables()
 
+            if isinstance(settings, RedisRateLimiterSettings) and not db_disabled:
+                await load_rate_limit_rules()
+
+            if isinstance(settings, DatabaseSettings) and not db_disabled:
+                await load_question_catalog()
+
             initialization_complete.set()
 
             yield
@@ -142,6 +218,8 @@ def lifespan_factory(
             if isinstance(settings, RedisRateLimiterSettings):
                 await close_redis_rate_limit_pool()
 
+            password_hash_pool.shutdown()
+
     return lifespan
 
 
@@ -155,6 +233,7 @@ def create_application(
         | ClientSideCacheSettings
         | RedisQueueSettings
         | RedisRateLimiterSettings
+        | MetricsSettings
         | EnvironmentSettings
     ),
     create_tables_on_start: bool = True,
@@ -181,6 +260,8 @@ def create_application(
         - ClientSideCacheSettings: Integrates middleware for client-side caching.
         - RedisQueueSettings: Sets up event handlers for creating and closing a Redis queue pool.
         - RedisRateLimiterSettings: Sets up event handlers for creating and closing a Redis rate limiter pool.
+        - MetricsSettings: Exposes the in-process metrics registry in the Prometheus text format at `METRICS_PATH`
+          when `METRICS_ENABLED` is set, behind a bearer token when `METRICS_TOKEN` is set.
         - EnvironmentSettings: Conditionally sets documentation URLs and integrates custom routes for API documentation
           based on the environment type.
 
@@ -224,6 +305,17 @@ def create_application(
     if isinstance(settings, ClientSideCacheSettings):
         application.add_middleware(ClientCacheMiddleware, max_age=settings.CLIENT_CACHE_MAX_AGE)
 
+    if isinstance(settings, MetricsSettings) and settings.METRICS_ENABLED:
+        metrics_token = settings.METRICS_TOKEN.get_secret_value() if settings.METRICS_TOKEN is not None else None
+
+        @application.get(settings.METRICS_PATH, include_in_schema=False)
+        async def metrics(authorization: Annotated[str | None, Header()] = None) -> PlainTextResponse:
+            if metrics_token is not None and not secrets.compare_digest(
+                (authorization or "").encode(), f"Bearer {metrics_token}".encode()
+            ):
+                raise UnauthorizedException("Invalid metrics token.")
+            return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
     if isinstance(settings, EnvironmentSettings):
         if settings.ENVIRONMENT != EnvironmentOption.PRODUCTION:
             docs_router = APIRouter()
@@ -1,17 +1,254 @@
+import asyncio
+import fnmatch
 import functools
 import json
-import re
-from collections.abc import Callable
-from typing import Any
-
-from fastapi import Request
+import operator
+import string
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Collection, Iterable
+from contextlib import AsyncExitStack
+from typing import Any, Generic, TypeVar, cast
+
+import orjson
+from fastapi import HTTPException, Request, Response
 from fastapi.encoders import jsonable_encoder
 from redis.asyncio import ConnectionPool, Redis
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..db.database import local_session
 from ..exceptions.cache_exceptions import CacheIdentificationInferenceError, InvalidRequestError, MissingClientError
+from ..logger import logging
+from .metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
 
 pool: ConnectionPool | None = None
 client: Redis | None = None
+local_cache: "LocalCache[bytes] | None" = None
+invalidation_channel: str = "cache:invalidate"
+
+
+_V = TypeVar("_V")
+
+
+def _dumps(data: Any) -> bytes:
+    return orjson.dumps(jsonable_encoder(data))
+
+
+def _loads(data: bytes) -> Any:
+    return orjson.loads(data)
+
+
+# Plain entries are stored as JSON, which never starts with a control byte; other entry kinds carry a header byte.
+_NEGATIVE_ENTRY = b"\x01"
+_COMPRESSED_ENTRY = b"\x02"
+_COMPRESSION_LEVEL = 1
+
+hits = Counter(
+    "cache_hits_total",
+    "Cache lookups answered from the local tier or from Redis.",
+    labelnames=("key_prefix", "tier"),
+)
+stale_hits = Counter(
+    "cache_stale_hits_total",
+    "Expired entries served while a background refresh runs.",
+    labelnames=("key_prefix",),
+)
+misses = Counter(
+    "cache_misses_total",
+    "Cache lookups that ran the decorated function.",
+    labelnames=("key_prefix",),
+)
+sets = Counter(
+    "cache_sets_total",
+    "Entries written to the cache, including negative entries.",
+    labelnames=("key_prefix",),
+)
+invalidations = Counter(
+    "cache_invalidations_total",
+    "Non-GET calls that invalidated cache entries.",
+    labelnames=("key_prefix",),
+)
+pattern_deleted_keys = Counter(
+    "cache_pattern_deleted_keys_total",
+    "Keys deleted by pattern (SCAN) invalidation.",
+    labelnames=("key_prefix",),
+)
+redis_latency = Histogram(
+    "cache_redis_latency_seconds",
+    "Duration of the cache decorator's Redis round-trips.",
+    labelnames=("key_prefix", "operation"),
+)
+compressed_writes = Counter(
+    "cache_compressed_writes_total",
+    "Cache entries stored compressed.",
+    labelnames=("key_prefix",),
+)
+compression_input_bytes = Counter(
+    "cache_compression_input_bytes_total",
+    "Size of cache entries before compression.",
+    labelnames=("key_prefix",),
+)
+compression_bytes_saved = Counter(
+    "cache_compression_bytes_saved_total",
+    "Bytes saved in Redis by compressing cache entries.",
+    labelnames=("key_prefix",),
+)
+
+
+def _compress(data: bytes, key_prefix: str) -> bytes:
+    """Compress an entry with zlib behind a header byte, recording how many bytes it saved."""
+    compressed_data = _COMPRESSED_ENTRY + zlib.compress(data, _COMPRESSION_LEVEL)
+    compressed_writes.inc(key_prefix=key_prefix)
+    compression_input_bytes.inc(len(data), key_prefix=key_prefix)
+    compression_bytes_saved.inc(len(data) - len(compressed_data), key_prefix=key_prefix)
+    return compressed_data
+
+
+def _decompress(data: bytes) -> bytes:
+    if data[:1] == _COMPRESSED_ENTRY:
+        return zlib.decompress(data[len(_COMPRESSED_ENTRY) :])
+    return data
+
+
+def _encode_negative(exc: HTTPException) -> bytes:
+    return _NEGATIVE_ENTRY + _dumps({"status_code": exc.status_code, "detail": exc.detail, "headers": exc.headers})
+
+
+def _decode_negative(data: bytes) -> HTTPException:
+    return HTTPException(**_loads(data[len(_NEGATIVE_ENTRY) :]))
+
+
+class LocalCache(Generic[_V]):
+    """Bounded in-process LRU map with per-entry expiry, used as an L1 tier in front of Redis.
+
+    Entries hold the serialized bytes as stored in Redis, but decompressed, so a local hit is only decoded.
+    The class is generic over the value type so other per-worker caches, such as the principal cache in
+    `app.core.security`, can reuse its expiry, eviction and tag bookkeeping.
+    Each worker process owns its own instance; copies on other workers are evicted through the Redis
+    invalidation channel (see `listen_for_invalidations`).
+
+    Parameters
+    ----------
+    maxsize: int
+        Maximum number of entries kept before the least recently used one is evicted.
+    ttl: float
+        Default lifetime of an entry in seconds. Keep it short: it bounds how stale a copy can get
+        if an invalidation message is missed.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 5) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, _V, tuple[str, ...]]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> _V | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: _V, ttl: float | None = None, tags: Iterable[str] = ()) -> None:
+        self._remove(key)
+        lifetime = self.ttl if ttl is None else min(ttl, self.ttl)
+        tags = tuple(tags)
+        self._data[key] = (time.monotonic() + lifetime, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while len(self._data) > self.maxsize:
+            self._remove(next(iter(self._data)))
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._remove(key)
+
+    def delete_pattern(self, pattern: str) -> None:
+        for key in [key for key in self._data if fnmatch.fnmatchcase(key, pattern)]:
+            self._remove(key)
+
+    def delete_tags(self, *tags: str) -> None:
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._tags.clear()
+
+    def _remove(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return
+
+        for tag in entry[2]:
+            members = self._tags.get(tag)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._tags[tag]
+
+
+def _evict_local(keys: Iterable[str] = (), patterns: Iterable[str] = (), tags: Iterable[str] = ()) -> None:
+    if local_cache is None:
+        return
+
+    local_cache.delete(*keys)
+    local_cache.delete_tags(*tags)
+    for pattern in patterns:
+        local_cache.delete_pattern(pattern)
+
+
+async def listen_for_invalidations(retry_delay: float = 1.0) -> None:
+    """Evict local cache entries announced on the invalidation channel until cancelled.
+
+    Meant to run as a background task for the lifetime of the application. If the subscription drops,
+    the whole local cache is cleared (messages may have been missed) and the subscription is retried.
+
+    Parameters
+    ----------
+    retry_delay: float
+        Seconds to wait before resubscribing after a connection error.
+    """
+    if client is None:
+        raise MissingClientError
+
+    while True:
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(invalidation_channel)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+
+                payload = json.loads(message["data"])
+                _evict_local(payload.get("keys", ()), payload.get("patterns", ()), payload.get("tags", ()))
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            logger.warning(f"Cache invalidation subscription lost, retrying in {retry_delay}s: {e}")
+            if local_cache is not None:
+                local_cache.clear()
+            await asyncio.sleep(retry_delay)
+
+        finally:
+            await pubsub.aclose()  # type: ignore
 
 
 def _infer_resource_id(kwargs: dict[str, Any], resource_id_type: type | tuple[type, ...]) -> int | str:
@@ -52,97 +289,76 @@ def _infer_resource_id(kwargs: dict[str, Any], resource_id_type: type | tuple[ty
     return resource_id
 
 
-def _extract_data_inside_brackets(input_string: str) -> list[str]:
-    """Extract data inside curly brackets from a given string using regular expressions.
+class _KeyTemplate:
+    """A cache key template parsed once, when the decorator is applied.
+
+    The template is rewritten with positional fields ('{username}_posts:page_{page}' becomes
+    '{0}_posts:page_{1}') and paired with an `itemgetter` over the field names, so rendering a key
+    for a request is a tuple lookup plus one `str.format` call, with no regular expression involved.
 
     Parameters
     ----------
-    input_string: str
-        The input string in which to find data enclosed within curly brackets.
-
-    Returns
-    -------
-    List[str]
-        A list of strings containing the data found inside the curly brackets within the input string.
+    template: str
+        A key template whose fields name keyword arguments of the decorated function.
 
     Example
     -------
-    >>> _extract_data_inside_brackets("The {quick} brown {fox} jumps over the {lazy} dog.")
-    ['quick', 'fox', 'lazy']
+    >>> _KeyTemplate("{username}_posts:page_{page}").render({"username": "john", "page": 2, "db": None})
+    'john_posts:page_2'
     """
-    data_inside_brackets = re.findall(r"{(.*?)}", input_string)
-    return data_inside_brackets
 
+    __slots__ = ("template", "fields", "_format", "_getter")
 
-def _construct_data_dict(data_inside_brackets: list[str], kwargs: dict[str, Any]) -> dict[str, Any]:
-    """Construct a dictionary based on data inside brackets and keyword arguments.
+    def __init__(self, template: str) -> None:
+        self.template = template
+        positional = []
+        fields: list[str] = []
+        for literal, field, spec, conversion in string.Formatter().parse(template):
+            positional.append(literal.replace("{", "{{").replace("}", "}}"))
+            if field is None:
+                continue
+            if field not in fields:
+                fields.append(field)
+            conversion = f"!{conversion}" if conversion else ""
+            spec = f":{spec}" if spec else ""
+            positional.append(f"{{{fields.index(field)}{conversion}{spec}}}")
 
-    Parameters
-    ----------
-    data_inside_brackets: List[str]
-        A list of keys inside brackets.
-    kwargs: Dict[str, Any]
-        A dictionary of keyword arguments.
+        self.fields = tuple(fields)
+        self._format = "".join(positional).format
+        self._getter = operator.itemgetter(*fields) if len(fields) > 1 else None
 
-    Returns
-    -------
-    Dict[str, Any]: A dictionary with keys from data_inside_brackets and corresponding values from kwargs.
-    """
-    data_dict = {}
-    for key in data_inside_brackets:
-        data_dict[key] = kwargs[key]
-    return data_dict
+    def render(self, kwargs: dict[str, Any]) -> str:
+        if self._getter is not None:
+            return self._format(*self._getter(kwargs))
+        if self.fields:
+            return self._format(kwargs[self.fields[0]])
+        return self.template
 
 
-def _format_prefix(prefix: str, kwargs: dict[str, Any]) -> str:
-    """Format a prefix using keyword arguments.
+def _compile_extra_keys(to_invalidate_extra: dict[str, str]) -> list[_KeyTemplate]:
+    """Compile `to_invalidate_extra` entries into full key templates.
 
-    Parameters
-    ----------
-    prefix: str
-        The prefix template to be formatted.
-    kwargs: Dict[str, Any]
-        A dictionary of keyword arguments.
-
-    Returns
-    -------
-    str: The formatted prefix.
-    """
-    data_inside_brackets = _extract_data_inside_brackets(prefix)
-    data_dict = _construct_data_dict(data_inside_brackets, kwargs)
-    formatted_prefix = prefix.format(**data_dict)
-    return formatted_prefix
-
-
-def _format_extra_data(to_invalidate_extra: dict[str, str], kwargs: dict[str, Any]) -> dict[str, Any]:
-    """Format extra data based on provided templates and keyword arguments.
-
-    This function takes a dictionary of templates and their associated values and a dictionary of keyword arguments.
-    It formats the templates with the corresponding values from the keyword arguments and returns a dictionary
-    where keys are the formatted templates and values are the associated keyword argument values.
+    Each `{prefix_template: id_template}` entry invalidates the key '{prefix}:{id}', where `id` is the
+    first field of the id template.
 
     Parameters
     ----------
     to_invalidate_extra: Dict[str, str]
-        A dictionary where keys are templates and values are the associated values.
-    kwargs: Dict[str, Any]
-        A dictionary of keyword arguments.
+        A dictionary where keys are prefix templates and values are templates naming the resource id.
 
     Returns
     -------
-        Dict[str, Any]: A dictionary where keys are formatted templates and values
-        are associated keyword argument values.
+    List[_KeyTemplate]
+        One compiled template per extra key.
     """
-    formatted_extra = {}
+    compiled = []
     for prefix, id_template in to_invalidate_extra.items():
-        formatted_prefix = _format_prefix(prefix, kwargs)
-        id = _extract_data_inside_brackets(id_template)[0]
-        formatted_extra[formatted_prefix] = kwargs[id]
+        id_field = _KeyTemplate(id_template).fields[0]
+        compiled.append(_KeyTemplate(f"{prefix}:{{{id_field}}}"))
+    return compiled
 
-    return formatted_extra
 
-
-async def _delete_keys_by_pattern(pattern: str) -> None:
+async def _delete_keys_by_pattern(pattern: str) -> int:
     """Delete keys from Redis that match a given pattern using the SCAN command.
 
     This function iteratively scans the Redis key space for keys that match a specific pattern
@@ -159,12 +375,17 @@ async def _delete_keys_by_pattern(pattern: str) -> None:
         The pattern to match keys against. The pattern can include wildcards,
         such as '*' for matching any character sequence. Example: 'user:*'
 
+    Returns
+    -------
+    int
+        The number of keys deleted.
+
     Notes
     -----
     - The SCAN command is used with a count of 100 to retrieve keys in batches.
       This count can be adjusted based on the size of your dataset and Redis performance.
 
-    - The function uses the delete command to remove keys in bulk. If the dataset
+    - The function uses the UNLINK command to remove keys in bulk. If the dataset
       is extremely large, consider implementing additional logic to handle bulk deletion
       more efficiently.
 
@@ -174,11 +395,277 @@ async def _delete_keys_by_pattern(pattern: str) -> None:
     if client is None:
         raise MissingClientError
 
+    deleted = 0
     cursor = -1
     while cursor != 0:
         cursor, keys = await client.scan(cursor, match=pattern, count=100)
         if keys:
-            await client.delete(*keys)
+            deleted += await client.unlink(*keys)
+
+    return deleted
+
+
+def _tag_key(tag: str) -> str:
+    return f"tag:{tag}"
+
+
+# Extends each tag set's TTL to ARGV[1] seconds unless it already lives longer. A set without a TTL (TTL -1)
+# has just been created by SADD. Equivalent to `EXPIRE NX` followed by `EXPIRE GT`, which need Redis 7.
+_EXTEND_TAG_TTL_SCRIPT = """
+local expiration = tonumber(ARGV[1])
+for _, tag_key in ipairs(KEYS) do
+    if redis.call("TTL", tag_key) < expiration then
+        redis.call("EXPIRE", tag_key, expiration)
+    end
+end
+return 0
+"""
+
+
+async def _store(cache_key: str, serialized_data: bytes, expiration: int, tags: list[str]) -> None:
+    """Write a cache entry with `SET ... EX` and register it under its tags in one MULTI/EXEC round-trip.
+
+    Tag sets are kept alive at least as long as their longest-lived member: their TTL is only ever extended,
+    by a script that runs on any Redis version with scripting.
+    """
+    if client is None:
+        raise MissingClientError
+
+    async with client.pipeline(transaction=True) as pipe:
+        pipe.set(cache_key, serialized_data, ex=expiration)
+        if tags:
+            tag_keys = [_tag_key(tag) for tag in tags]
+            for tag_key in tag_keys:
+                pipe.sadd(tag_key, cache_key)
+            pipe.eval(_EXTEND_TAG_TTL_SCRIPT, len(tag_keys), *tag_keys, expiration)
+        await pipe.execute()
+
+
+async def _invalidate(keys: list[str], patterns: list[str], tags: list[str]) -> int:
+    """Delete cached entries by key, pattern and tag, then evict them from every worker's local cache.
+
+    Tag members are read with one pipelined `SMEMBERS` per tag. The keys and members are then removed with a
+    multi-key `UNLINK`, the members are `SREM`ed from their tags, and the invalidation is published to other
+    workers, all in a single MULTI/EXEC round-trip. Entries tagged between the two round-trips stay registered
+    and are removed by the next invalidation.
+    Tag invalidation costs time in proportion to the affected keys, not to the size of the keyspace.
+    Patterns still need one `SCAN` pass each (see `_delete_keys_by_pattern`).
+
+    Parameters
+    ----------
+    keys: List[str]
+        Full cache keys to delete.
+    patterns: List[str]
+        Redis glob patterns of keys to delete.
+    tags: List[str]
+        Formatted tags whose registered keys are deleted, e.g. 'user:johndoe:posts'.
+
+    Returns
+    -------
+    int
+        The number of keys deleted by pattern scans.
+    """
+    if client is None:
+        raise MissingClientError
+
+    pattern_deleted = 0
+    for pattern in patterns:
+        pattern_deleted += await _delete_keys_by_pattern(pattern)
+
+    tag_members: dict[str, list[Any]] = {}
+    if tags:
+        tag_keys = [_tag_key(tag) for tag in tags]
+        async with client.pipeline(transaction=False) as pipe:
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            tag_members = {tag_key: list(members) for tag_key, members in zip(tag_keys, await pipe.execute())}
+
+    tagged_keys = [member for members in tag_members.values() for member in members]
+    async with client.pipeline(transaction=True) as pipe:
+        if keys or tagged_keys:
+            pipe.unlink(*keys, *tagged_keys)
+        for tag_key, members in tag_members.items():
+            if members:
+                pipe.srem(tag_key, *members)
+        if local_cache is not None:
+            pipe.publish(invalidation_channel, json.dumps({"keys": keys, "patterns": patterns, "tags": tags}))
+        await pipe.execute()
+
+    _evict_local(keys, patterns, tags)
+    return pattern_deleted
+
+
+async def invalidate(key_prefix: str, keys: Iterable[str] = (), tags: Iterable[str] = ()) -> None:
+    """Invalidate cache entries from inside an endpoint, for keys the `cache` decorator cannot render.
+
+    Use it when a key depends on the endpoint's own result, such as the id of a newly created resource.
+    The invalidation is recorded in the metrics under `key_prefix`, like the decorator's own.
+
+    Parameters
+    ----------
+    key_prefix: str
+        The key prefix template of the invalidated entries, used as the metrics label.
+    keys: Iterable[str]
+        Full cache keys to delete.
+    tags: Iterable[str]
+        Formatted tags whose registered keys are deleted, e.g. 'user:johndoe:posts'.
+    """
+    with redis_latency.time(key_prefix=key_prefix, operation="invalidate"):
+        await _invalidate(keys=list(keys), patterns=[], tags=list(tags))
+    invalidations.inc(key_prefix=key_prefix)
+
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+_NOT_COMPUTED: Any = object()
+_Loaded = tuple[Any, bytes]
+
+_inflight: dict[str, asyncio.Future[_Loaded]] = {}
+_refreshing: set[str] = set()
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def _get_with_ttl(cache_key: str) -> tuple[bytes | None, int]:
+    """Fetch a cached value and its remaining time to live in milliseconds in one round-trip."""
+    if client is None:
+        raise MissingClientError
+
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.get(cache_key)
+        pipe.pttl(cache_key)
+        cached_data, ttl_ms = await pipe.execute()
+
+    return cached_data, ttl_ms
+
+
+async def _acquire_lock(cache_key: str, lock_timeout: float) -> str | None:
+    """Try to take the cross-worker lock guarding the computation of `cache_key`.
+
+    Returns
+    -------
+    str | None
+        The lock token to pass to `_release_lock`, or None if another worker holds the lock.
+    """
+    if client is None:
+        raise MissingClientError
+
+    token = uuid.uuid4().hex
+    acquired = await client.set(f"lock:{cache_key}", token, nx=True, px=int(lock_timeout * 1000))
+    return token if acquired else None
+
+
+async def _release_lock(cache_key: str, token: str) -> None:
+    if client is None:
+        raise MissingClientError
+
+    release = client.register_script(_RELEASE_LOCK_SCRIPT)
+    await release(keys=[f"lock:{cache_key}"], args=[token])
+
+
+async def _load_with_lock(
+    cache_key: str, load: Callable[[], Awaitable[_Loaded]], lock_timeout: float, poll_interval: float = 0.05
+) -> _Loaded:
+    """Compute a missing entry while holding the Redis lock, or wait for the worker that holds it.
+
+    Entries computed by another worker are returned as `(_NOT_COMPUTED, serialized_data)`. If the lock is
+    released without an entry being written, e.g. because the holder failed or its result is not cached,
+    waiters stop polling and race for the lock again.
+    """
+    if client is None:
+        raise MissingClientError
+
+    deadline = time.monotonic() + lock_timeout
+    while True:
+        token = await _acquire_lock(cache_key, lock_timeout)
+        if token is not None:
+            try:
+                return await load()
+            finally:
+                await _release_lock(cache_key, token)
+
+        while time.monotonic() < deadline:
+            await asyncio.sleep(poll_interval)
+            # The holder writes the entry before releasing the lock, so a released lock seen before a
+            # missing entry means that no entry was written.
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.exists(f"lock:{cache_key}")
+                pipe.get(cache_key)
+                locked, cached_data = await pipe.execute()
+            if cached_data:
+                return _NOT_COMPUTED, cast(bytes, cached_data)
+            if not locked:
+                break
+        else:
+            return await load()
+
+
+async def _single_flight(cache_key: str, load: Callable[[], Awaitable[_Loaded]], lock_timeout: float) -> _Loaded:
+    """Run `load` at most once at a time per key: locally through a shared future, globally through a lock."""
+    inflight = _inflight.get(cache_key)
+    if inflight is not None:
+        try:
+            return await asyncio.shield(inflight)
+        except asyncio.CancelledError:
+            if not inflight.cancelled():
+                raise
+            return await load()
+
+    future: asyncio.Future[_Loaded] = asyncio.get_running_loop().create_future()
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    _inflight[cache_key] = future
+    try:
+        loaded = await _load_with_lock(cache_key, load, lock_timeout)
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    except BaseException:
+        future.cancel()
+        raise
+    else:
+        future.set_result(loaded)
+        return loaded
+    finally:
+        del _inflight[cache_key]
+
+
+async def _refresh(cache_key: str, load: functools.partial, lock_timeout: float) -> None:
+    try:
+        token = await _acquire_lock(cache_key, lock_timeout)
+        if token is None:
+            return
+
+        try:
+            # The request's session is closed once the response is sent, so refresh with a session of our own.
+            async with AsyncExitStack() as stack:
+                kwargs = {
+                    name: await stack.enter_async_context(local_session()) if isinstance(value, AsyncSession) else value
+                    for name, value in load.keywords.items()
+                }
+                await load.func(*load.args, **kwargs)
+        finally:
+            await _release_lock(cache_key, token)
+
+    except Exception as e:
+        logger.warning(f"Background refresh of cache key {cache_key} failed: {e}")
+
+    finally:
+        _refreshing.discard(cache_key)
+
+
+def _schedule_refresh(cache_key: str, load: functools.partial, lock_timeout: float) -> None:
+    """Refresh a stale entry in the background unless this worker is already refreshing it."""
+    if cache_key in _refreshing:
+        return
+
+    _refreshing.add(cache_key)
+    task = asyncio.create_task(_refresh(cache_key, load, lock_timeout))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
 
 
 def cache(
@@ -188,6 +675,16 @@ def cache(
     resource_id_type: type | tuple[type, ...] = int,
     to_invalidate_extra: dict[str, Any] | None = None,
     pattern_to_invalidate_extra: list[str] | None = None,
+    local_expiration: float | None = None,
+    single_flight: bool = False,
+    lock_timeout: float = 10,
+    stale_while_revalidate: int = 0,
+    tags: list[str] | None = None,
+    tags_to_invalidate: list[str] | None = None,
+    raw_response: bool = False,
+    negative_expiration: int | None = None,
+    negative_status_codes: Collection[int] = (404,),
+    compress_threshold: int | None = None,
 ) -> Callable:
     """Cache decorator for FastAPI endpoints.
 
@@ -213,6 +710,38 @@ def cache(
     pattern_to_invalidate_extra: List[str] | None, optional
         A list of string patterns for cache keys that should be invalidated when the decorated function is called.
         This allows for bulk invalidation of cache keys based on a matching pattern.
+    local_expiration: float | None, optional
+        Lifetime in seconds of the in-process copy kept when the local (L1) cache is enabled. Defaults to the
+        local cache's own TTL and never exceeds `expiration`. Has no effect if the local cache is disabled.
+    single_flight: bool, default False
+        If True, concurrent misses for the same key run the decorated function only once. Requests on the same
+        worker wait for the in-flight call, and workers coordinate through a short-lived Redis lock.
+    lock_timeout: float, default 10
+        Seconds the Redis lock is held at most, which is also how long other workers wait for the lock holder's
+        value before computing it themselves. Used by `single_flight` and `stale_while_revalidate`.
+    stale_while_revalidate: int, default 0
+        Seconds after `expiration` during which an expired entry is still served while one background task
+        refreshes it. 0 disables the behaviour.
+    tags: List[str] | None, optional
+        Templates of tags the cached entry is registered under on GET requests, e.g. 'user:{username}:posts'.
+    tags_to_invalidate: List[str] | None, optional
+        Templates of tags whose entries are invalidated when the decorated function is called with a method other
+        than GET. Unlike `pattern_to_invalidate_extra`, this does not scan the keyspace.
+    raw_response: bool, default False
+        If True, cache hits return a `Response` wrapping the stored JSON bytes, skipping deserialization and
+        FastAPI's response model validation and serialization. Only use it when the endpoint's return value
+        already has the shape of its response model, since the stored bytes are not filtered by it.
+    negative_expiration: int | None, optional
+        If set, an `HTTPException` raised on a GET request whose status code is in `negative_status_codes` is
+        cached for this many seconds, and re-raised on hits without calling the decorated function. Negative
+        entries live under the same key, so the usual invalidation paths clear them too. Disabled by default.
+    negative_status_codes: Collection[int], default (404,)
+        Status codes of the HTTP exceptions eligible for negative caching.
+    compress_threshold: int | None, optional
+        Serialized size in bytes above which entries are stored zlib-compressed in Redis, and transparently
+        decompressed on hits. The local cache keeps them decompressed. Savings are counted in
+        `cache_compression_bytes_saved_total`.
+        Disabled by default.
 
     Returns
     -------
@@ -279,11 +808,52 @@ def cache(
     ----
     - resource_id_type is used only if resource_id is not passed.
     - `to_invalidate_extra` and `pattern_to_invalidate_extra` are used for cache invalidation on methods other than GET.
-    - Using `pattern_to_invalidate_extra` can be resource-intensive on large datasets. Use it judiciously and
-      consider the potential impact on Redis performance.
+    - Using `pattern_to_invalidate_extra` can be resource-intensive on large datasets, since every call scans the
+      whole keyspace. Prefer registering entries with `tags` and invalidating them with `tags_to_invalidate`.
+    - When the local cache is enabled (`REDIS_CACHE_LOCAL_ENABLED`), GET requests are served from an in-process
+      copy first. Invalidations on other methods evict that copy on every worker through Redis pub/sub.
+    - Hits (per tier), misses, sets, invalidations, keys deleted by patterns and Redis latency are recorded per
+      `key_prefix` template in `app.core.utils.metrics` and exported on `/metrics`.
+    - Background refreshes triggered by `stale_while_revalidate` run after the response was sent, so any
+      `AsyncSession` argument is replaced with a new session for the duration of the refresh.
     """
+    local_ttl = expiration if local_expiration is None else min(local_expiration, expiration)
+    prefix_template = _KeyTemplate(key_prefix)
+    tag_templates = [_KeyTemplate(tag) for tag in tags or ()]
+    extra_key_templates = _compile_extra_keys(to_invalidate_extra or {})
+    pattern_templates = [_KeyTemplate(pattern + "*") for pattern in pattern_to_invalidate_extra or ()]
+    invalidated_tag_templates = [_KeyTemplate(tag) for tag in tags_to_invalidate or ()]
 
     def wrapper(func: Callable) -> Callable:
+        def from_cache(cached_data: bytes) -> Any:
+            if cached_data[:1] == _NEGATIVE_ENTRY:
+                raise _decode_negative(cached_data)
+            if raw_response:
+                return Response(content=cached_data, media_type="application/json")
+            return _loads(cached_data)
+
+        async def save(cache_key: str, data: bytes, ttl: int, kwargs: dict[str, Any], compress: bool = False) -> None:
+            formatted_tags = [template.render(kwargs) for template in tag_templates]
+            stored_data = _compress(data, key_prefix) if compress else data
+            with redis_latency.time(key_prefix=key_prefix, operation="set"):
+                await _store(cache_key, stored_data, ttl + stale_while_revalidate, formatted_tags)
+            sets.inc(key_prefix=key_prefix)
+            if local_cache is not None:
+                local_cache.set(cache_key, data, min(local_ttl, ttl), formatted_tags)
+
+        async def load(cache_key: str, request: Request, *args: Any, **kwargs: Any) -> _Loaded:
+            try:
+                result = await func(request, *args, **kwargs)
+            except HTTPException as e:
+                if negative_expiration is not None and e.status_code in negative_status_codes:
+                    await save(cache_key, _encode_negative(e), negative_expiration, kwargs)
+                raise
+
+            serialized_data = _dumps(result)
+            compress = compress_threshold is not None and len(serialized_data) > compress_threshold
+            await save(cache_key, serialized_data, expiration, kwargs, compress)
+            return result, serialized_data
+
         @functools.wraps(func)
         async def inner(request: Request, *args: Any, **kwargs: Any) -> Any:
             if client is None:
@@ -294,39 +864,63 @@ def cache(
             else:
                 resource_id = _infer_resource_id(kwargs=kwargs, resource_id_type=resource_id_type)
 
-            formatted_key_prefix = _format_prefix(key_prefix, kwargs)
-            cache_key = f"{formatted_key_prefix}:{resource_id}"
+            cache_key = f"{prefix_template.render(kwargs)}:{resource_id}"
             if request.method == "GET":
-                if to_invalidate_extra is not None or pattern_to_invalidate_extra is not None:
+                if (
+                    to_invalidate_extra is not None
+                    or pattern_to_invalidate_extra is not None
+                    or tags_to_invalidate is not None
+                ):
                     raise InvalidRequestError
 
-                cached_data = await client.get(cache_key)
-                if cached_data:
-                    return json.loads(cached_data.decode())
-
-            result = await func(request, *args, **kwargs)
+                if local_cache is not None:
+                    cached_data = local_cache.get(cache_key)
+                    if cached_data:
+                        hits.inc(key_prefix=key_prefix, tier="local")
+                        return from_cache(cached_data)
 
-            if request.method == "GET":
-                serializable_data = jsonable_encoder(result)
-                serialized_data = json.dumps(serializable_data)
+                with redis_latency.time(key_prefix=key_prefix, operation="get"):
+                    if stale_while_revalidate:
+                        cached_data, ttl_ms = await _get_with_ttl(cache_key)
+                    else:
+                        cached_data, ttl_ms = await client.get(cache_key), -1
 
-                await client.set(cache_key, serialized_data)
-                await client.expire(cache_key, expiration)
+                if cached_data:
+                    hits.inc(key_prefix=key_prefix, tier="redis")
+                    cached_data = _decompress(cached_data)
+                    fresh_ms = ttl_ms - stale_while_revalidate * 1000
+                    if ttl_ms >= 0 and fresh_ms <= 0:
+                        stale_hits.inc(key_prefix=key_prefix)
+                        refresh = functools.partial(load, cache_key, request, *args, **kwargs)
+                        _schedule_refresh(cache_key, refresh, lock_timeout)
+                    elif local_cache is not None:
+                        fresh_ttl = local_ttl if ttl_ms < 0 else min(local_ttl, fresh_ms / 1000)
+                        formatted_tags = [template.render(kwargs) for template in tag_templates]
+                        local_cache.set(cache_key, cached_data, fresh_ttl, formatted_tags)
+                    return from_cache(cached_data)
+
+                misses.inc(key_prefix=key_prefix)
+                if single_flight:
+                    result, serialized_data = await _single_flight(
+                        cache_key, functools.partial(load, cache_key, request, *args, **kwargs), lock_timeout
+                    )
+                    if result is _NOT_COMPUTED:
+                        return from_cache(_decompress(serialized_data))
+                    return result
+
+                result, _ = await load(cache_key, request, *args, **kwargs)
+                return result
 
-                return json.loads(serialized_data)
+            result = await func(request, *args, **kwargs)
 
-            else:
-                await client.delete(cache_key)
-                if to_invalidate_extra is not None:
-                    formatted_extra = _format_extra_data(to_invalidate_extra, kwargs)
-                    for prefix, id in formatted_extra.items():
-                        extra_cache_key = f"{prefix}:{id}"
-                        await client.delete(extra_cache_key)
-
-                if pattern_to_invalidate_extra is not None:
-                    for pattern in pattern_to_invalidate_extra:
-                        formatted_pattern = _format_prefix(pattern, kwargs)
-                        await _delete_keys_by_pattern(formatted_pattern + "*")
+            with redis_latency.time(key_prefix=key_prefix, operation="invalidate"):
+                pattern_deleted = await _invalidate(
+                    keys=[cache_key, *(template.render(kwargs) for template in extra_key_templates)],
+                    patterns=[template.render(kwargs) for template in pattern_templates],
+                    tags=[template.render(kwargs) for template in invalidated_tag_templates],
+                )
+            invalidations.inc(key_prefix=key_prefix)
+            pattern_deleted_keys.inc(pattern_deleted, key_prefix=key_prefix)
 
             return result
 
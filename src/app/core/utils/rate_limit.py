@@ -1,19 +1,337 @@
-from datetime import UTC, datetime
-from typing import Optional
+import asyncio
+import math
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Optional, cast
 
 from redis.asyncio import ConnectionPool, Redis
+from redis.commands.core import AsyncScript
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...core.logger import logging
-from ...schemas.rate_limit import sanitize_path
+from ...crud.crud_rate_limit import crud_rate_limits
+from ...crud.crud_tier import crud_tiers
+from ...schemas.rate_limit import RateLimitAlgorithm, RateLimitRead, sanitize_path
+from ...schemas.tier import TierRead
+from ..db.database import local_session
 
 logger = logging.getLogger(__name__)
 
+# Identifies this worker's own rule change announcements, which it has already applied.
+_WORKER_ID = uuid.uuid4().hex
+
+# Every script reads the clock from the Redis server, so all workers share one time source, and returns
+# {limited, remaining, reset_ms}: whether the request is rejected, how many more requests fit right now, and
+# how many milliseconds until the limiting state changes (a rejected request may retry after `reset_ms`).
+
+_NOW_MS = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2]) * 1000
+"""
+
+# Counts requests in windows aligned to multiples of `period`. Up to 2x `limit` can pass around a window edge.
+_FIXED_WINDOW_SCRIPT = (
+    _NOW_MS
+    + """
+local reset = period - now % period
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('PEXPIRE', KEYS[1], reset)
+end
+if count > limit then
+    return {1, 0, reset}
+end
+return {0, limit - count, reset}
+"""
+)
+
+# Keeps one sorted-set member per accepted request in the trailing `period`. Exact, at O(limit) memory per key.
+_SLIDING_WINDOW_LOG_SCRIPT = (
+    _NOW_MS
+    + """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - period)
+local count = redis.call('ZCARD', KEYS[1])
+local limited = 1
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], period)
+    count = count + 1
+    limited = 0
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {limited, limit - count, tonumber(oldest[2]) + period - now}
+"""
+)
+
+# Weights the previous fixed window's count by how much of it still overlaps the trailing `period`.
+# Approximate, at O(1) memory per key.
+_SLIDING_WINDOW_COUNTER_SCRIPT = (
+    _NOW_MS
+    + """
+local window = math.floor(now / period)
+local elapsed = now % period
+local state = redis.call('HMGET', KEYS[1], 'window', 'current', 'previous')
+local current = tonumber(state[2]) or 0
+local previous = tonumber(state[3]) or 0
+if tonumber(state[1]) ~= window then
+    if tonumber(state[1]) == window - 1 then
+        previous = current
+    else
+        previous = 0
+    end
+    current = 0
+end
+local estimate = previous * (period - elapsed) / period + current
+if estimate + 1 > limit then
+    local retry
+    if current < limit and previous > 0 then
+        retry = math.ceil(period - period * (limit - 1 - current) / previous) - elapsed
+    else
+        retry = period - elapsed + math.max(0, math.ceil(period - period * (limit - 1) / math.max(current, 1)))
+    end
+    return {1, 0, math.max(retry, 1)}
+end
+current = current + 1
+redis.call('HSET', KEYS[1], 'window', window, 'current', current, 'previous', previous)
+redis.call('PEXPIRE', KEYS[1], 2 * period)
+return {0, math.floor(limit - estimate - 1), period - elapsed}
+"""
+)
+
+# Generic cell rate algorithm: a token bucket of `limit` tokens refilled at `limit / period`, stored as a single
+# theoretical arrival time. Allows bursts of up to `limit`, then smooths requests to the refill rate.
+_TOKEN_BUCKET_SCRIPT = (
+    _NOW_MS
+    + """
+local interval = period / limit
+local tat = math.max(tonumber(redis.call('GET', KEYS[1])) or now, now)
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if allow_at > now then
+    return {1, 0, math.ceil(allow_at - now)}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {0, math.floor((now - allow_at) / interval), math.ceil(new_tat - now)}
+"""
+)
+
+_SCRIPTS = {
+    RateLimitAlgorithm.FIXED_WINDOW: _FIXED_WINDOW_SCRIPT,
+    RateLimitAlgorithm.SLIDING_WINDOW_LOG: _SLIDING_WINDOW_LOG_SCRIPT,
+    RateLimitAlgorithm.SLIDING_WINDOW_COUNTER: _SLIDING_WINDOW_COUNTER_SCRIPT,
+    RateLimitAlgorithm.TOKEN_BUCKET: _TOKEN_BUCKET_SCRIPT,
+}
+
+# Adds each key's locally counted hits to its fixed window counter, using the same keys and window alignment
+# as `_FIXED_WINDOW_SCRIPT`. ARGV holds one (delta, period) pair per key; returns one {count, reset_ms} per key.
+_FLUSH_COUNTERS_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local result = {}
+for i, key in ipairs(KEYS) do
+    local delta = tonumber(ARGV[2 * i - 1])
+    local period = tonumber(ARGV[2 * i]) * 1000
+    local reset = period - now % period
+    local count = redis.call('INCRBY', key, delta)
+    if count == delta then
+        redis.call('PEXPIRE', key, reset)
+    end
+    result[i] = {count, reset}
+end
+return result
+"""
+
+
+@dataclass(slots=True)
+class _LocalCounter:
+    period: int
+    pending: int = 0
+    count: int = 0
+    window_ends_at: float = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitResult:
+    """Outcome of a rate limit check.
+
+    `remaining` is how many more requests fit right now and `reset_after` is how many seconds until the
+    limiting state changes. A rejected request may be retried after `reset_after` seconds.
+    """
+
+    limited: bool
+    limit: int
+    remaining: int
+    reset_after: float
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """`RateLimit-*` response headers for this result, plus `Retry-After` if the request was rejected."""
+        reset = str(math.ceil(self.reset_after))
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": reset,
+        }
+        if self.limited:
+            headers["Retry-After"] = reset
+        return headers
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitRule:
+    limit: int
+    period: int
+    algorithm: RateLimitAlgorithm | None = None
+
+
+class RateLimitRules:
+    """In-process copy of the tier and rate limit tables, so rate limit checks run no SQL queries.
+
+    The table is loaded at startup and reloaded whenever a tier or rate limit is written. Each write is
+    announced to the other workers through `RateLimiter.refresh_rules`.
+    """
+
+    def __init__(self) -> None:
+        self.loaded = False
+        self.tiers: dict[int, str] = {}
+        self.rules: dict[tuple[int, str], RateLimitRule] = {}
+
+    async def load(self, db: AsyncSession) -> None:
+        tiers = await crud_tiers.get_multi(db=db, limit=None, schema_to_select=TierRead, return_total_count=False)
+        rate_limits = await crud_rate_limits.get_multi(
+            db=db, limit=None, schema_to_select=RateLimitRead, return_total_count=False
+        )
+
+        self.tiers = {tier["id"]: tier["name"] for tier in cast(list[dict[str, Any]], tiers["data"])}
+        self.rules = {
+            (rate_limit["tier_id"], rate_limit["path"]): RateLimitRule(
+                limit=rate_limit["limit"],
+                period=rate_limit["period"],
+                algorithm=RateLimitAlgorithm(rate_limit["algorithm"]) if rate_limit["algorithm"] else None,
+            )
+            for rate_limit in cast(list[dict[str, Any]], rate_limits["data"])
+        }
+        self.loaded = True
+
+    def get(self, tier_id: int, path: str) -> RateLimitRule | None:
+        return self.rules.get((tier_id, path))
+
+
+class LocalRateLimitCounters:
+    """Approximate fixed window counters kept in process and synced to Redis in batches.
+
+    Hits are counted locally and added to the shared Redis counters every `sync_interval` seconds, or
+    sooner once a key has `sync_hits` unsynced hits. Between syncs a worker only knows the global count
+    as of the last sync, so each worker can let through up to `sync_hits` requests per key, or the
+    traffic of one `sync_interval`, more than the limit. Once the known global count reaches the limit,
+    requests are rejected without contacting Redis until the window ends.
+
+    Parameters
+    ----------
+    client: Redis
+        The rate limiter's Redis client.
+    sync_interval: float
+        Maximum number of seconds between syncs.
+    sync_hits: int
+        Number of unsynced hits on a single key that triggers an early sync.
+    """
+
+    def __init__(self, client: Redis, sync_interval: float = 0.1, sync_hits: int = 20) -> None:
+        self.client = client
+        self.sync_interval = sync_interval
+        self.sync_hits = sync_hits
+        self.running = False
+        self._counters: dict[str, _LocalCounter] = {}
+        self._sync_requested = asyncio.Event()
+        self._script: AsyncScript | None = None
+
+    def hit(self, key: str, limit: int, period: int) -> RateLimitResult:
+        """Count a hit on `key` and report whether it must be rejected, without any I/O."""
+        now = time.monotonic()
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = _LocalCounter(period=period)
+        elif counter.window_ends_at and counter.window_ends_at <= now:
+            counter.count, counter.window_ends_at = 0, 0.0
+
+        reset_after = counter.window_ends_at - now if counter.window_ends_at else period - time.time() % period
+        used = counter.count + counter.pending
+        if used >= limit:
+            return RateLimitResult(limited=True, limit=limit, remaining=0, reset_after=reset_after)
+
+        counter.pending += 1
+        if counter.pending >= self.sync_hits:
+            self._sync_requested.set()
+        return RateLimitResult(limited=False, limit=limit, remaining=limit - used - 1, reset_after=reset_after)
+
+    async def sync(self) -> None:
+        """Send every key's unsynced hits to Redis in one round-trip and record the global counts."""
+        batch = [(key, counter, counter.pending) for key, counter in self._counters.items() if counter.pending]
+        if not batch:
+            self._evict_expired()
+            return
+
+        args: list[int] = []
+        for _, counter, delta in batch:
+            counter.pending -= delta
+            args.extend((delta, counter.period))
+
+        if self._script is None:
+            self._script = self.client.register_script(_FLUSH_COUNTERS_SCRIPT)
+        try:
+            results = await self._script(keys=[key for key, _, _ in batch], args=args)
+        except Exception:
+            for _, counter, delta in batch:
+                counter.pending += delta
+            raise
+
+        now = time.monotonic()
+        for (_, counter, _), (count, reset_ms) in zip(batch, results):
+            counter.count = count
+            counter.window_ends_at = now + reset_ms / 1000
+        self._evict_expired()
+
+    async def run(self) -> None:
+        """Sync counters until cancelled. Meant to run as a background task for the lifetime of the application."""
+        self.running = True
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._sync_requested.wait(), timeout=self.sync_interval)
+                except TimeoutError:
+                    pass
+                self._sync_requested.clear()
+
+                try:
+                    await self.sync()
+                except Exception as e:
+                    logger.warning(f"Could not sync local rate limit counters, retrying: {e}")
+                    await asyncio.sleep(self.sync_interval)
+        finally:
+            self.running = False
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired = [
+            key
+            for key, counter in self._counters.items()
+            if not counter.pending and counter.window_ends_at and counter.window_ends_at <= now
+        ]
+        for key in expired:
+            del self._counters[key]
+
 
 class RateLimiter:
     _instance: Optional["RateLimiter"] = None
     pool: Optional[ConnectionPool] = None
     client: Optional[Redis] = None
+    scripts: dict[RateLimitAlgorithm, AsyncScript] = {}
+    rules: RateLimitRules = RateLimitRules()
+    rules_channel: str = "ratelimit:rules"
+    local_counters: LocalRateLimitCounters | None = None
 
     def __new__(cls) -> "RateLimiter":
         if cls._instance is None:
@@ -26,6 +344,7 @@ class RateLimiter:
         if instance.pool is None:
             instance.pool = ConnectionPool.from_url(redis_url)
             instance.client = Redis(connection_pool=instance.pool)
+            instance.scripts = {}
 
     @classmethod
     def get_client(cls) -> Redis:
@@ -35,27 +354,120 @@ class RateLimiter:
             raise Exception("Redis client is not initialized.")
         return instance.client
 
-    async def is_rate_limited(self, db: AsyncSession, user_id: int, path: str, limit: int, period: int) -> bool:
+    async def refresh_rules(self, db: AsyncSession) -> None:
+        """Reload this worker's rule table and tell the other workers to reload theirs.
+
+        Call it after committing a change to a tier or rate limit.
+        """
+        await self.rules.load(db)
+        if self.client is not None:
+            await self.client.publish(self.rules_channel, _WORKER_ID)
+
+    async def listen_for_rule_changes(self, retry_delay: float = 1.0) -> None:
+        """Reload the rule table whenever another worker announces a change, until cancelled.
+
+        Meant to run as a background task for the lifetime of the application. If the subscription drops,
+        the table is reloaded after resubscribing, since announcements may have been missed.
+
+        Parameters
+        ----------
+        retry_delay: float
+            Seconds to wait before resubscribing after a connection error.
+        """
         client = self.get_client()
-        current_timestamp = int(datetime.now(UTC).timestamp())
-        window_start = current_timestamp - (current_timestamp % period)
+        missed_messages = False
+        while True:
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self.rules_channel)
+                if missed_messages:
+                    await self._reload_rules()
+                    missed_messages = False
 
-        sanitized_path = sanitize_path(path)
-        key = f"ratelimit:{user_id}:{sanitized_path}:{window_start}"
+                async for message in pubsub.listen():
+                    if message["type"] == "message" and message["data"].decode() != _WORKER_ID:
+                        await self._reload_rules()
 
-        try:
-            current_count = await client.incr(key)
-            if current_count == 1:
-                await client.expire(key, period)
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                logger.warning(f"Rate limit rule subscription lost, retrying in {retry_delay}s: {e}")
+                missed_messages = True
+                await asyncio.sleep(retry_delay)
+
+            finally:
+                await pubsub.aclose()  # type: ignore
+
+    async def _reload_rules(self) -> None:
+        async with local_session() as db:
+            await self.rules.load(db)
+
+    def get_script(self, algorithm: RateLimitAlgorithm) -> AsyncScript:
+        if algorithm not in self.scripts:
+            self.scripts[algorithm] = self.get_client().register_script(_SCRIPTS[algorithm])
+        return self.scripts[algorithm]
 
-            if current_count > limit:
-                return True
+    async def is_rate_limited(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        path: str,
+        limit: int,
+        period: int,
+        algorithm: RateLimitAlgorithm = RateLimitAlgorithm.FIXED_WINDOW,
+        approximate: bool = False,
+    ) -> bool:
+        """Count a request against `limit` requests per `period` seconds and report whether it must be rejected.
 
+        See `check`, which also reports the remaining quota and when it resets.
+        """
+        result = await self.check(
+            user_id=user_id, path=path, limit=limit, period=period, algorithm=algorithm, approximate=approximate
+        )
+        return result.limited
+
+    async def check(
+        self,
+        user_id: int | str,
+        path: str,
+        limit: int,
+        period: int,
+        algorithm: RateLimitAlgorithm = RateLimitAlgorithm.FIXED_WINDOW,
+        approximate: bool = False,
+    ) -> RateLimitResult:
+        """Count a request against `limit` requests per `period` seconds.
+
+        The check runs as a single Lua script, so it is atomic and costs one Redis round-trip
+        whichever algorithm is used.
+
+        Parameters
+        ----------
+        algorithm: RateLimitAlgorithm
+            How requests are counted. Each algorithm keeps its own key, so changing a rule's
+            algorithm starts it from an empty state.
+        approximate: bool
+            Count the request in this worker's `local_counters` instead, with no Redis round-trip, if they
+            are running. Approximate counting always uses a fixed window and may overshoot `limit`.
+        """
+        algorithm = RateLimitAlgorithm(algorithm)
+        sanitized_path = sanitize_path(path)
+        if approximate and self.local_counters is not None and self.local_counters.running:
+            key = f"ratelimit:{user_id}:{sanitized_path}:{RateLimitAlgorithm.FIXED_WINDOW.value}"
+            return self.local_counters.hit(key, limit, period)
+
+        key = f"ratelimit:{user_id}:{sanitized_path}:{algorithm.value}"
+        args: list[int | str] = [limit, period]
+        if algorithm is RateLimitAlgorithm.SLIDING_WINDOW_LOG:
+            args.append(uuid.uuid4().hex)
+
+        try:
+            limited, remaining, reset_ms = await self.get_script(algorithm)(keys=[key], args=args)
         except Exception as e:
             logger.exception(f"Error checking rate limit for user {user_id} on path {path}: {e}")
             raise e
 
-        return False
+        return RateLimitResult(limited=bool(limited), limit=limit, remaining=remaining, reset_after=reset_ms / 1000)
 
 
 rate_limiter = RateLimiter()
@@ -0,0 +1,161 @@
+import json
+import math
+import os
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+
+from ..config import settings
+from ..logger import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class SigningKey:
+    """One key of a `KeySet`, with its `jose` key objects constructed once when the set is loaded."""
+
+    kid: str | None
+    algorithm: str
+    verifier: Key
+    signer: Key | None
+    public: bool
+
+
+class KeySet:
+    """JWKS-style set of JWT keys, indexed by the `kid` header.
+
+    Without `path`, the set holds the symmetric `secret` alone and tokens are signed without a `kid`, exactly
+    as before key sets existed. With `path`, keys come from a JWKS file (`{"keys": [...]}`). RSA and EC keys
+    with their private parts can sign, public ones only verify, so services that only verify tokens need
+    just the public keys. The file is checked for changes at most every `reload_interval` seconds, so keys
+    can be rotated without a restart: add the new key, point `active_kid` at it once every verifier has it,
+    and drop the old key after the longest token lifetime.
+
+    Parameters
+    ----------
+    algorithm: str
+        Algorithm of `secret`, and of file keys that have no `alg` member.
+    secret: str
+        Symmetric key used when `path` is not set.
+    path: str | None
+        Path of the JWKS file. Every key in it needs a `kid`.
+    active_kid: str | None
+        `kid` of the key that signs new tokens. Defaults to the first key in the file that can sign.
+    reload_interval: float
+        Minimum number of seconds between checks of the file's modification time.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret: str,
+        path: str | None = None,
+        active_kid: str | None = None,
+        reload_interval: float = 60,
+    ) -> None:
+        self.algorithm = algorithm
+        self.secret = secret
+        self.path = path
+        self.active_kid = active_kid
+        self.reload_interval = reload_interval
+        self.keys: dict[str | None, SigningKey] = {}
+        self.active: SigningKey | None = None
+        self._mtime: int | None = None
+        self._checked_at = -math.inf
+        self.load()
+
+    def load(self) -> None:
+        """(Re)build every key, replacing the current set only if all of them are valid."""
+        if self.path is None:
+            key = jwk.construct(self.secret, self.algorithm)
+            self.active = SigningKey(kid=None, algorithm=self.algorithm, verifier=key, signer=key, public=False)
+            self.keys = {None: self.active}
+            return
+
+        self._checked_at = time.monotonic()
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path) as f:
+            jwks = json.load(f)
+
+        keys: dict[str | None, SigningKey] = {}
+        for data in jwks["keys"]:
+            algorithm = data.get("alg", self.algorithm)
+            key = jwk.construct(data, algorithm)
+            if data["kty"] == "oct":
+                signing_key = SigningKey(data["kid"], algorithm, verifier=key, signer=key, public=False)
+            elif "d" in data:
+                signing_key = SigningKey(data["kid"], algorithm, verifier=key.public_key(), signer=key, public=True)
+            else:
+                signing_key = SigningKey(data["kid"], algorithm, verifier=key, signer=None, public=True)
+            keys[signing_key.kid] = signing_key
+
+        if self.active_kid is not None:
+            active = keys.get(self.active_kid)
+            if active is None or active.signer is None:
+                raise ValueError(f"JWT key '{self.active_kid}' is not in {self.path} or has no private part.")
+        else:
+            active = next((key for key in keys.values() if key.signer is not None), None)
+
+        self.keys, self.active, self._mtime = keys, active, mtime
+
+    def refresh(self) -> None:
+        """Reload the file if it changed, at most once every `reload_interval` seconds.
+
+        A file that cannot be read or parsed is logged and the current keys are kept.
+        """
+        if self.path is None or time.monotonic() - self._checked_at < self.reload_interval:
+            return
+
+        self._checked_at = time.monotonic()
+        try:
+            if os.stat(self.path).st_mtime_ns != self._mtime:
+                self.load()
+                logger.info(f"Reloaded JWT keys from {self.path}, active key: {self.active and self.active.kid}")
+        except Exception as e:
+            logger.warning(f"Could not reload JWT keys from {self.path}, keeping the current keys: {e}")
+
+    def sign(self, claims: dict[str, Any]) -> str:
+        self.refresh()
+        if self.active is None or self.active.signer is None:
+            raise RuntimeError("No JWT signing key is configured, this service can only verify tokens.")
+
+        headers = {"kid": self.active.kid} if self.active.kid is not None else None
+        encoded_jwt: str = jwt.encode(claims, self.active.signer, algorithm=self.active.algorithm, headers=headers)
+        return encoded_jwt
+
+    def decode(self, token: str) -> dict[str, Any]:
+        """Verify `token` with the key named by its `kid` header and return its claims.
+
+        Each key only accepts its own algorithm. Raises `JWTError` for unknown keys and invalid tokens.
+        """
+        self.refresh()
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.keys.get(kid)
+        if key is None:
+            raise JWTError(f"Unknown JWT key id: {kid}")
+
+        claims: dict[str, Any] = jwt.decode(token, key.verifier, algorithms=[key.algorithm])
+        return claims
+
+    def public_jwks(self) -> dict[str, list[dict[str, Any]]]:
+        """The public keys of the set as a JWKS document. Symmetric keys are never included."""
+        return {
+            "keys": [
+                {**key.verifier.to_dict(), "kid": key.kid, "alg": key.algorithm, "use": "sig"}
+                for key in self.keys.values()
+                if key.public
+            ]
+        }
+
+
+signing_keys = KeySet(
+    algorithm=settings.ALGORITHM,
+    secret=settings.SECRET_KEY.get_secret_value(),
+    path=settings.JWT_KEYS_FILE,
+    active_kid=settings.JWT_ACTIVE_KID,
+    reload_interval=settings.JWT_KEYS_RELOAD_SECONDS,
+)
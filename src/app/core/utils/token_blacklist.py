@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import math
+import time
+from collections.abc import Iterator
+
+from redis.asyncio import Redis
+
+from ..config import settings
+from ..logger import logging
+from . import cache
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size set of strings that answers membership with no false negatives.
+
+    `item in bloom` is always True for added items, and True for other items with a probability of
+    about `error_rate` once `capacity` items have been added. Items cannot be removed.
+
+    Parameters
+    ----------
+    capacity: int
+        Number of items the filter is sized for.
+    error_rate: float
+        Target false positive rate at `capacity` items.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RedisTokenBlacklist:
+    """Revoked token IDs (`jti` claims) stored in the cache Redis, with an in-process Bloom filter in front.
+
+    Each revoked ID is kept in Redis until the token would have expired anyway. Every worker mirrors
+    the IDs in a Bloom filter, so checking a token that was never revoked, the common case, needs no
+    network call. Only filter hits, revoked tokens and rare false positives, are confirmed in Redis.
+
+    The filter must hear about revocations made by other workers (see `remember`), and it is rebuilt from
+    Redis with `rebuild`. Until the first rebuild completes, every check goes to Redis. IDs that could not be
+    written to Redis are kept by the worker that revoked them and written by its next `rebuild`.
+
+    Parameters
+    ----------
+    capacity: int
+        Number of revoked IDs the Bloom filter is sized for. It is rebuilt from Redis, dropping IDs that
+        have expired, whenever more IDs than this have been added.
+    error_rate: float
+        Target false positive rate of the Bloom filter, i.e. the share of valid tokens checked in Redis.
+    """
+
+    prefix = "blacklist:jti:"
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.01) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.ready = False
+        self._rebuilding: list[str] | None = None
+        self._rebuild_tasks: set[asyncio.Task] = set()
+        self._unsaved: dict[str, float] = {}
+
+    async def add(self, jti: str, expires_at: float) -> None:
+        """Revoke `jti` until `expires_at`, a Unix timestamp.
+
+        If Redis cannot be reached, `jti` is only added to this worker's Bloom filter, and written to Redis by
+        the next `rebuild`.
+        """
+        if cache.client is None:
+            raise cache.MissingClientError
+
+        ttl = math.ceil(expires_at - time.time())
+        if ttl <= 0:
+            return
+
+        try:
+            await cache.client.set(f"{self.prefix}{jti}", 1, ex=ttl)
+        except Exception as e:
+            logger.warning(f"Could not store revoked token ID {jti} in Redis, retrying on the next rebuild: {e}")
+            self._unsaved[jti] = expires_at
+        self.remember(jti)
+
+    def remember(self, jti: str) -> None:
+        """Add an ID revoked by this or another worker to the Bloom filter."""
+        self.bloom.add(jti)
+        if self._rebuilding is not None:
+            self._rebuilding.append(jti)
+        elif self.bloom.count > self.capacity:
+            task = asyncio.create_task(self.rebuild())
+            self._rebuild_tasks.add(task)
+            task.add_done_callback(self._rebuild_tasks.discard)
+
+    async def is_revoked(self, jti: str) -> bool:
+        if self.ready and jti not in self.bloom:
+            return False
+
+        if cache.client is None:
+            raise cache.MissingClientError
+
+        return bool(await cache.client.exists(f"{self.prefix}{jti}"))
+
+    async def rebuild(self) -> list[str]:
+        """Replace the Bloom filter with one holding exactly the IDs currently revoked in Redis.
+
+        IDs that `add` could not write to Redis are written first. They are returned, so the other workers
+        can be told about them.
+        """
+        if cache.client is None:
+            raise cache.MissingClientError
+        if self._rebuilding is not None:
+            return []
+
+        self._rebuilding = []
+        try:
+            saved = await self._save_unsaved(cache.client)
+            bloom = BloomFilter(self.capacity, self.error_rate)
+            async for key in cache.client.scan_iter(match=f"{self.prefix}*", count=1000):
+                bloom.add(key.decode()[len(self.prefix) :])
+            for jti in [*saved, *self._rebuilding]:
+                bloom.add(jti)
+        finally:
+            self._rebuilding = None
+
+        self.bloom = bloom
+        self.ready = True
+        logger.info(f"Rebuilt the token blacklist filter with {bloom.count} revoked token IDs")
+        return saved
+
+    async def _save_unsaved(self, client: Redis) -> list[str]:
+        saved = []
+        for jti, expires_at in list(self._unsaved.items()):
+            ttl = math.ceil(expires_at - time.time())
+            if ttl > 0:
+                await client.set(f"{self.prefix}{jti}", 1, ex=ttl)
+                saved.append(jti)
+            del self._unsaved[jti]
+        return saved
+
+
+token_blacklist = RedisTokenBlacklist(
+    capacity=settings.TOKEN_BLACKLIST_BLOOM_CAPACITY, error_rate=settings.TOKEN_BLACKLIST_BLOOM_ERROR_RATE
+)
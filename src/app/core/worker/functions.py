@@ -1,8 +1,13 @@
 import asyncio
 import logging
+from datetime import datetime
 
 import uvloop
 from arq.worker import Worker
+from sqlalchemy import delete
+
+from ..db.database import local_session
+from ..db.token_blacklist import TokenBlacklist
 
 asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
@@ -15,6 +20,18 @@ async def sample_background_task(ctx: Worker, name: str) -> str:
     return f"Task {name} is complete!"
 
 
+async def purge_expired_tokens(ctx: Worker) -> int:
+    """Delete `token_blacklist` rows whose token has expired, since an expired token is rejected anyway."""
+    async with local_session() as db:
+        # expires_at is stored as naive local time (see `blacklist_token`)
+        result = await db.execute(delete(TokenBlacklist).where(TokenBlacklist.expires_at < datetime.now()))
+        await db.commit()
+
+    purged: int = result.rowcount
+    logging.info(f"Purged {purged} expired blacklisted tokens")
+    return purged
+
+
 # -------- base functions --------
 async def startup(ctx: Worker) -> None:
     logging.info("Worker Started")
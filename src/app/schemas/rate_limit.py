@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import Enum
 from typing import Annotated
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
@@ -10,10 +11,18 @@ def sanitize_path(path: str) -> str:
     return path.strip("/").replace("/", "_")
 
 
+class RateLimitAlgorithm(str, Enum):
+    FIXED_WINDOW = "fixed_window"
+    SLIDING_WINDOW_LOG = "sliding_window_log"
+    SLIDING_WINDOW_COUNTER = "sliding_window_counter"
+    TOKEN_BUCKET = "token_bucket"
+
+
 class RateLimitBase(BaseModel):
     path: Annotated[str, Field(examples=["users"])]
     limit: Annotated[int, Field(examples=[5])]
     period: Annotated[int, Field(examples=[60])]
+    algorithm: Annotated[RateLimitAlgorithm | None, Field(default=None, examples=["sliding_window_counter"])]
 
     @field_validator("path")
     def validate_and_sanitize_path(cls, v: str) -> str:
@@ -45,6 +54,7 @@ class RateLimitUpdate(BaseModel):
     path: str | None = Field(default=None)
     limit: int | None = None
     period: int | None = None
+    algorithm: RateLimitAlgorithm | None = None
     name: str | None = None
 
     @field_validator("path")
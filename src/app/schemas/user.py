@@ -29,6 +29,14 @@ class UserRead(BaseModel):
     tier_id: int | None
 
 
+class UserPrincipal(BaseModel):
+    id: int
+    username: str
+    email: str
+    tier_id: int | None
+    is_superuser: bool
+
+
 class UserCreate(UserBase):
     model_config = ConfigDict(extra="forbid")
 
@@ -0,0 +1,108 @@
+"""Microbenchmarks for the `cache` decorator's per-request overhead.
+
+Run with `python -m src.scripts.benchmark_cache [--items 10] [--iterations 2000]`.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute, serialize_response
+from fastcrud.paginated import PaginatedListResponse
+
+from ..app.core.utils.cache import _dumps, _KeyTemplate
+from ..app.schemas.post import PostRead
+
+KEY_PREFIX = "{username}_posts:page_{page}:items_per_page:{items_per_page}"
+TAG = "user:{username}:posts"
+
+
+def _format_prefix(prefix: str, kwargs: dict[str, Any]) -> str:
+    """Per-call key formatting as the decorator did it before templates were precompiled."""
+    data_inside_brackets = re.findall(r"{(.*?)}", prefix)
+    data_dict = {key: kwargs[key] for key in data_inside_brackets}
+    return prefix.format(**data_dict)
+
+
+def _payload(items: int) -> dict[str, Any]:
+    posts = [
+        PostRead(
+            id=i,
+            title=f"Post number {i}",
+            text="Lorem ipsum dolor sit amet. " * 20,
+            media_url=f"https://www.postimageurl.com/{i}.png",
+            created_by_user_id=1,
+            created_at=datetime.now(UTC),
+        )
+        for i in range(items)
+    ]
+    return {"data": posts, "total_count": items, "has_more": False, "page": 1, "items_per_page": items}
+
+
+async def _measure(operation: Callable[[], Awaitable[Any]], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await operation()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+async def run(items: int, iterations: int) -> None:
+    route = APIRoute("/posts", lambda: None, response_model=PaginatedListResponse[PostRead])
+    result = _payload(items)
+    stored = _dumps(result)
+
+    async def render(content: Any) -> bytes | memoryview:
+        return JSONResponse(await serialize_response(field=route.response_field, response_content=content)).body
+
+    async def hit_before() -> bytes | memoryview:
+        return await render(json.loads(stored.decode()))
+
+    async def hit_after() -> bytes | memoryview:
+        return Response(content=stored, media_type="application/json").body
+
+    async def miss_before() -> bytes | memoryview:
+        serialized_data = json.dumps(jsonable_encoder(result))
+        return await render(json.loads(serialized_data))
+
+    async def miss_after() -> bytes | memoryview:
+        _dumps(result)
+        return await render(result)
+
+    kwargs = {"request": None, "username": "johndoe", "page": 3, "items_per_page": 10, "db": None}
+    prefix_template, tag_template = _KeyTemplate(KEY_PREFIX), _KeyTemplate(TAG)
+
+    async def keys_before() -> tuple[str, str]:
+        return f"{_format_prefix(KEY_PREFIX, kwargs)}:{kwargs['username']}", _format_prefix(TAG, kwargs)
+
+    async def keys_after() -> tuple[str, str]:
+        return f"{prefix_template.render(kwargs)}:{kwargs['username']}", tag_template.render(kwargs)
+
+    print(f"Payload: {items} posts, {len(stored)} bytes, {iterations} iterations")
+    print(f"{'path':<10}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")
+    for name, before, after in (
+        ("hit", hit_before, hit_after),
+        ("miss", miss_before, miss_after),
+        ("keys", keys_before, keys_after),
+    ):
+        before_us = await _measure(before, iterations)
+        after_us = await _measure(after, iterations)
+        print(f"{name:<10}{before_us:>14.1f}{after_us:>14.1f}{before_us / after_us:>9.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=10, help="Posts per cached page.")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
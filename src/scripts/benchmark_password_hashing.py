@@ -0,0 +1,90 @@
+"""Measure password verification time on this host and recommend a `PASSWORD_HASH_ROUNDS` value.
+
+Run with `python -m src.scripts.benchmark_password_hashing [--target-ms 250] [--min-rounds 10] [--max-rounds 14]`.
+Pass `--argon2` to also time argon2id, if `argon2-cffi` is installed.
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+
+import bcrypt
+
+try:
+    import argon2
+except ImportError:  # pragma: no cover - optional comparison
+    argon2 = None  # type: ignore[assignment]
+
+PASSWORD = "correct horse battery staple"
+
+
+def _median_ms(operation: Callable[[], object], iterations: int) -> float:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def bench_bcrypt(min_rounds: int, max_rounds: int, iterations: int) -> dict[int, float]:
+    results = {}
+    for rounds in range(min_rounds, max_rounds + 1):
+        hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds))
+        results[rounds] = _median_ms(lambda: bcrypt.checkpw(PASSWORD.encode(), hashed), iterations)
+    return results
+
+
+def bench_argon2(iterations: int) -> dict[int, float]:
+    results = {}
+    for time_cost in range(1, 5):
+        hasher = argon2.PasswordHasher(time_cost=time_cost)
+        hashed = hasher.hash(PASSWORD)
+        results[time_cost] = _median_ms(lambda: hasher.verify(hashed, PASSWORD), iterations)
+    return results
+
+
+def recommend(results: dict[int, float], target_ms: float) -> int | None:
+    """Highest cost whose median verification time stays within `target_ms`."""
+    within_target = [cost for cost, median_ms in results.items() if median_ms <= target_ms]
+    return max(within_target, default=None)
+
+
+def run(target_ms: float, min_rounds: int, max_rounds: int, iterations: int, workers: int, with_argon2: bool) -> None:
+    print(f"Target: {target_ms:.0f} ms per verification, {iterations} iterations per cost")
+    print(f"{'bcrypt rounds':<16}{'median (ms)':>12}{'logins/s':>12}")
+    results = bench_bcrypt(min_rounds, max_rounds, iterations)
+    for rounds, median_ms in results.items():
+        print(f"{rounds:<16}{median_ms:>12.1f}{workers * 1000 / median_ms:>12.1f}")
+
+    if with_argon2:
+        if argon2 is None:
+            print("\nargon2-cffi is not installed, skipping argon2id.")
+        else:
+            print(f"\n{'argon2 time_cost':<16}{'median (ms)':>12}{'logins/s':>12}")
+            for time_cost, median_ms in bench_argon2(iterations).items():
+                print(f"{time_cost:<16}{median_ms:>12.1f}{workers * 1000 / median_ms:>12.1f}")
+
+    print(f"\nlogins/s assumes PASSWORD_HASH_WORKERS={workers} threads per worker process.")
+    recommended = recommend(results, target_ms)
+    if recommended is None:
+        print(f"No bcrypt cost from {min_rounds} meets the target; lower --min-rounds or raise --target-ms.")
+    else:
+        print(f"Recommended: PASSWORD_HASH_ROUNDS={recommended}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target-ms", type=float, default=250, help="Acceptable median verification time.")
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=14)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2, help="PASSWORD_HASH_WORKERS, for the throughput column.")
+    parser.add_argument("--argon2", action="store_true", help="Also time argon2id (requires argon2-cffi).")
+    args = parser.parse_args()
+    run(args.target_ms, args.min_rounds, args.max_rounds, args.iterations, args.workers, args.argon2)
+
+
+if __name__ == "__main__":
+    main()
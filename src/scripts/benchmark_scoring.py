@@ -0,0 +1,124 @@
+"""Compare queries and latency per assessment submit for per-option lookups, set-based scoring and snapshots.
+
+Run from `src/` with `python -m scripts.benchmark_scoring [--questions 60] [--options 4] [--iterations 50]`,
+since the assessment engine imports the `app` package by its absolute name.
+Uses an in-memory SQLite database, so `aiosqlite` must be installed. Round-trips to Postgres cost far more
+than these local queries, so the query count is the number to compare. `set-based` loads the catalog on every
+submit, and `snapshot` scores against a warm `QuestionCatalog` as the endpoints do.
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, cast
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from app.assessment_engine import QuestionCatalog, load_catalog_snapshot, score_answers
+from app.core.db.database import Base
+from app.models.category import Category
+from app.models.question import Question
+from app.models.question_option import QuestionOption
+
+CATEGORIES = 6
+
+
+async def _seed(engine: AsyncEngine, questions: int, options: int) -> None:
+    async with engine.begin() as connection:
+        tables = [Base.metadata.tables[model.__tablename__] for model in (Category, Question, QuestionOption)]
+        await connection.run_sync(lambda sync: Base.metadata.create_all(sync, tables=tables))
+        await connection.execute(
+            insert(Category), [{"id": f"c{c}", "title": f"Category {c}", "display_order": c} for c in range(CATEGORIES)]
+        )
+        await connection.execute(
+            insert(Question),
+            [{"id": q, "category_id": f"c{q % CATEGORIES}", "question_text": "?"} for q in range(1, questions + 1)],
+        )
+        await connection.execute(
+            insert(QuestionOption),
+            [
+                {"id": q * options + o, "question_id": q, "option_text": "!", "option_value": str(o), "score_points": o}
+                for q in range(1, questions + 1)
+                for o in range(options)
+            ],
+        )
+
+
+async def score_per_option(db: AsyncSession, answers: dict[int, list[int]]) -> float:
+    """The scoring loop the submit endpoints used before `score_answers`: one query per selected option."""
+    total_score = 0.0
+    result = await db.execute(select(Question).where(Question.is_active == True))  # noqa: E712
+    for question in result.scalars().all():
+        for option_id in answers.get(cast(int, question.id), []):
+            option_result = await db.execute(select(QuestionOption).where(QuestionOption.id == option_id))
+            option = option_result.scalar_one_or_none()
+            if option:
+                total_score += cast(float, option.score_points)
+    await db.execute(select(Category).where(Category.is_active == True))  # noqa: E712
+    return total_score
+
+
+async def score_set_based(db: AsyncSession, answers: dict[int, list[int]]) -> float:
+    return score_answers(await load_catalog_snapshot(db), answers).total_score
+
+
+async def _measure(
+    engine: AsyncEngine,
+    operation: Callable[[AsyncSession, dict[int, list[int]]], Awaitable[Any]],
+    answers: dict[int, list[int]],
+    iterations: int,
+) -> tuple[int, float]:
+    statements = 0
+
+    def count(*args: Any) -> None:
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        async with AsyncSession(engine) as db:
+            await operation(db, answers)
+    elapsed = time.perf_counter() - start
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+    return statements // iterations, elapsed / iterations * 1000
+
+
+async def run(questions: int, options: int, selected: int, iterations: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    await _seed(engine, questions, options)
+    answers = {q: [q * options + o for o in range(selected)] for q in range(1, questions + 1)}
+
+    print(f"Catalog: {questions} questions x {options} options, {selected} selected each, {iterations} iterations")
+    print(f"{'path':<12}{'queries':>10}{'ms/submit':>12}")
+    catalog = QuestionCatalog()
+    async with AsyncSession(engine) as db:
+        await catalog.get(db)
+
+    async def score_snapshot(db: AsyncSession, answers: dict[int, list[int]]) -> float:
+        return score_answers(await catalog.get(db), answers).total_score
+
+    for name, operation in (
+        ("per-option", score_per_option),
+        ("set-based", score_set_based),
+        ("snapshot", score_snapshot),
+    ):
+        queries, ms = await _measure(engine, operation, answers, iterations)
+        print(f"{name:<12}{queries:>10}{ms:>12.2f}")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, default=60)
+    parser.add_argument("--options", type=int, default=4, help="Options per question.")
+    parser.add_argument("--selected", type=int, default=2, help="Options selected per answer.")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.questions, args.options, args.selected, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Tests for the versioned question catalog snapshot."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.assessment_engine import CatalogSnapshot, QuestionCatalog, load_catalog_snapshot
+from app.assessment_engine import catalog as catalog_module
+from app.core.db.database import Base
+from app.models.category import Category
+from app.models.question import Question
+from app.models.question_option import QuestionOption
+
+
+async def _seeded_engine() -> tuple[AsyncEngine, list[str]]:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    tables = [Category.__table__, Question.__table__, QuestionOption.__table__]
+    async with engine.begin() as connection:
+        await connection.run_sync(lambda sync: Base.metadata.create_all(sync, tables=tables))
+        # NULL `is_active` counts as active; c1 and question 1 store it explicitly.
+        await connection.execute(
+            insert(Category),
+            [
+                {"id": f"c{c}", "title": f"Category {c}", "display_order": 2 - c, "is_active": None if c == 1 else True}
+                for c in range(3)
+            ],
+        )
+        question_active = {0: False, 1: None}
+        await connection.execute(
+            insert(Question),
+            [
+                {"id": q, "category_id": f"c{q % 3}", "question_text": "?", "is_active": question_active.get(q, True)}
+                for q in range(30)
+            ],
+        )
+        await connection.execute(
+            insert(QuestionOption),
+            [
+                {"id": q * 10 + o, "question_id": q, "option_text": "!", "option_value": str(o), "score_points": o}
+                for q in range(30)
+                for o in range(2)
+            ],
+        )
+
+    statements: list[str] = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return engine, statements
+
+
+@pytest.mark.asyncio
+async def test_snapshot_loads_in_three_queries_and_indexes_the_catalog():
+    engine, statements = await _seeded_engine()
+    try:
+        async with AsyncSession(engine) as db:
+            snapshot = await load_catalog_snapshot(db, version=4)
+    finally:
+        await engine.dispose()
+
+    assert len(statements) == 3
+    assert snapshot.version == 4
+    assert list(snapshot.categories) == ["c2", "c1", "c0"]
+    assert (len(snapshot.questions), len(snapshot.active_questions), len(snapshot.options)) == (30, 29, 60)
+    assert snapshot.categories["c1"].is_active and snapshot.questions[1].is_active
+    assert [question.id for question in snapshot.questions_by_category["c1"]][:3] == [1, 4, 7]
+    assert [option.value for option in snapshot.options_by_question[5]] == ["0", "1"]
+    with pytest.raises(TypeError):
+        snapshot.questions[99] = snapshot.questions[1]  # type: ignore[index]
+
+
+@pytest.mark.asyncio
+async def test_get_loads_once_and_refresh_swaps_in_a_new_version():
+    engine, statements = await _seeded_engine()
+    catalog = QuestionCatalog()
+    try:
+        async with AsyncSession(engine) as db:
+            first = await catalog.get(db)
+            assert await catalog.get(db) is first
+            assert len(statements) == 3
+
+            await db.execute(insert(Category).values(id="c9", title="Category 9"))
+            await db.commit()
+            refreshed = await catalog.refresh(db)
+    finally:
+        await engine.dispose()
+
+    assert (first.version, refreshed.version) == (0, 1)
+    assert catalog.snapshot is refreshed
+    assert "c9" in refreshed.categories and "c9" not in first.categories
+
+
+@pytest.mark.asyncio
+async def test_refresh_bumps_the_shared_version_and_announces_it():
+    engine, _ = await _seeded_engine()
+    catalog = QuestionCatalog(channel="test:catalog")
+    client = Mock(incr=AsyncMock(return_value=7), publish=AsyncMock())
+    try:
+        with patch.object(catalog_module.cache, "client", client):
+            async with AsyncSession(engine) as db:
+                snapshot = await catalog.refresh(db)
+    finally:
+        await engine.dispose()
+
+    assert snapshot.version == 7
+    client.incr.assert_awaited_once_with("test:catalog")
+    client.publish.assert_awaited_once_with("test:catalog", "7")
+
+
+@pytest.mark.asyncio
+async def test_reload_never_replaces_a_newer_snapshot():
+    engine, statements = await _seeded_engine()
+    catalog = QuestionCatalog()
+    catalog.snapshot = CatalogSnapshot.build(5, [], [], [])
+    try:
+        with patch.object(catalog_module, "local_session", async_sessionmaker(bind=engine)):
+            assert await catalog.reload(3) is catalog.snapshot
+            assert statements == []
+
+            reloaded = await catalog.reload(6)
+    finally:
+        await engine.dispose()
+
+    assert catalog.snapshot is reloaded
+    assert (reloaded.version, len(reloaded.questions)) == (6, 30)
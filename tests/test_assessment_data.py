@@ -0,0 +1,113 @@
+"""Tests for the cached `/assessment/data/full` endpoint."""
+
+from unittest.mock import Mock, patch
+
+from fastapi.testclient import TestClient
+
+from app.assessment_engine import CatalogCategory, CatalogOption, CatalogQuestion, CatalogSnapshot, question_catalog
+from app.core.db.database import async_get_read_db
+from app.main import app
+
+URL = "/api/v1/assessment/data/full"
+
+
+def _snapshot(version: int, title: str) -> CatalogSnapshot:
+    return CatalogSnapshot.build(
+        version,
+        [
+            CatalogCategory("network", "Network", None, 1, True),
+            CatalogCategory("passwords", title, "Hygiene", 0, True, icon="key"),
+        ],
+        [
+            CatalogQuestion(2, "passwords", "Do you use a manager?", "single_choice", 2.0, 0, True),
+            CatalogQuestion(1, "passwords", "Do you use MFA?", "single_choice", 1.0, 1, False, is_required=False),
+        ],
+        [CatalogOption(21, 2, "No", "no", 0.0, False, 0), CatalogOption(20, 2, "Yes", "yes", 2.0, True, 1)],
+    )
+
+
+def test_full_data_is_the_only_route_for_its_path():
+    assert [route.path for route in app.routes].count(URL) == 1
+
+
+def test_full_data_is_served_from_the_snapshot_with_an_etag(client: TestClient):
+    db = Mock()
+    with (
+        patch.dict(app.dependency_overrides, {async_get_read_db: lambda: db}),
+        patch.object(question_catalog, "snapshot", _snapshot(1, "Passwords")),
+    ):
+        response = client.get(URL)
+        etag = response.headers["etag"]
+        repeated = client.get(URL, headers={"If-None-Match": f'W/{etag}, "other"'})
+
+        question_catalog.snapshot = _snapshot(2, "Credentials")
+        changed = client.get(URL, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "categories": [
+            {
+                "id": "passwords",
+                "title": "Passwords",
+                "description": "Hygiene",
+                "icon": "key",
+                "display_order": 0,
+                "is_active": True,
+                "questions": [
+                    {
+                        "id": 2,
+                        "category_id": "passwords",
+                        "question_text": "Do you use a manager?",
+                        "question_type": "single_choice",
+                        "is_required": True,
+                        "display_order": 0,
+                        "weight": 2.0,
+                        "is_active": True,
+                        "options": [
+                            {
+                                "id": 21,
+                                "option_text": "No",
+                                "option_value": "no",
+                                "score_points": 0.0,
+                                "is_correct": False,
+                                "display_order": 0,
+                            },
+                            {
+                                "id": 20,
+                                "option_text": "Yes",
+                                "option_value": "yes",
+                                "score_points": 2.0,
+                                "is_correct": True,
+                                "display_order": 1,
+                            },
+                        ],
+                    },
+                    {
+                        "id": 1,
+                        "category_id": "passwords",
+                        "question_text": "Do you use MFA?",
+                        "question_type": "single_choice",
+                        "is_required": False,
+                        "display_order": 1,
+                        "weight": 1.0,
+                        "is_active": False,
+                        "options": [],
+                    },
+                ],
+            },
+            {
+                "id": "network",
+                "title": "Network",
+                "description": None,
+                "icon": None,
+                "display_order": 1,
+                "is_active": True,
+                "questions": [],
+            },
+        ]
+    }
+    assert (repeated.status_code, repeated.content, repeated.headers["etag"]) == (304, b"", etag)
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["categories"][0]["title"] == "Credentials"
+    assert db.mock_calls == []
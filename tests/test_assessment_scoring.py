@@ -0,0 +1,87 @@
+"""Tests for the set-based assessment scoring service."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from app.api.v1 import anonymous_assessment
+from app.assessment_engine import CatalogCategory, CatalogOption, CatalogQuestion, CatalogSnapshot, score_answers
+
+
+@pytest.fixture
+def catalog() -> CatalogSnapshot:
+    return CatalogSnapshot.build(
+        1,
+        [
+            CatalogCategory("passwords", "Passwords", None, 1, True),
+            CatalogCategory("network", "Network", None, 0, True),
+        ],
+        [
+            CatalogQuestion(1, "passwords", "?", "single_choice", 2.0, 0, True),
+            CatalogQuestion(2, "network", "?", "single_choice", 1.0, 0, True),
+            CatalogQuestion(3, "network", "?", "single_choice", 1.0, 1, True),
+            CatalogQuestion(4, "network", "?", "single_choice", 5.0, 2, False),
+        ],
+        [
+            CatalogOption(10, 1, "Yes", "yes", 2.0, True, 0),
+            CatalogOption(11, 1, "No", "no", 0.0, False, 1),
+            CatalogOption(20, 2, "Yes", "yes", 1.0, True, 0),
+            CatalogOption(30, 3, "Some", "some", 0.5, False, 0),
+            CatalogOption(40, 4, "Yes", "yes", 5.0, True, 0),
+        ],
+    )
+
+
+def test_every_active_question_counts_towards_the_maximum(catalog):
+    scored = score_answers(catalog, {1: [10], 2: [20]})
+
+    assert (scored.total_score, scored.max_score) == (3.0, 4.0)
+    assert scored.percentage == 75.0
+    assert [(c.category_id, c.score, c.max_score, c.questions) for c in scored.categories] == [
+        ("network", 1.0, 2.0, 2),
+        ("passwords", 2.0, 2.0, 1),
+    ]
+    assert scored.questions[3].answered is False
+    assert scored.questions[1].is_correct is True
+
+
+def test_answered_only_scores_just_the_answered_questions(catalog):
+    scored = score_answers(catalog, {2: [20]}, answered_only=True)
+
+    assert (scored.total_score, scored.max_score) == (1.0, 1.0)
+    assert [c.category_id for c in scored.categories] == ["network"]
+    assert list(scored.questions) == [2]
+
+
+def test_options_of_other_questions_and_unknown_questions_are_ignored(catalog):
+    scored = score_answers(catalog, {1: [20, 404], 4: [40], 99: [10]})
+
+    assert scored.questions[1].score == 0.0
+    assert scored.total_score == 0.0
+    assert scored.unknown_question_ids == [4, 99]
+
+
+@pytest.mark.asyncio
+async def test_anonymous_submit_stores_one_answer_per_question(catalog):
+    submission = anonymous_assessment.AnonymousAssessmentSubmission(
+        email="john@example.com",
+        answers=[
+            {"question_id": 1, "selected_options": [11]},
+            {"question_id": 2, "selected_options": [20]},
+            {"question_id": 1, "selected_options": [10]},
+        ],
+    )
+    db = Mock(commit=AsyncMock(), rollback=AsyncMock())
+    with (
+        patch.object(anonymous_assessment, "get_or_create_user", AsyncMock(return_value=Mock(user_id="u1"))),
+        patch.object(anonymous_assessment, "generate_recommendations", AsyncMock(return_value=[])),
+        patch.object(anonymous_assessment.question_catalog, "get", AsyncMock(return_value=catalog)),
+        patch.object(anonymous_assessment, "Assessment"),
+        patch.object(anonymous_assessment, "CategoryScore"),
+        patch.object(anonymous_assessment, "UserAnswer") as user_answer,
+    ):
+        response = await anonymous_assessment.submit_anonymous_assessment(submission, db)
+
+    stored = [(call.kwargs["question_id"], call.kwargs["selected_options"]) for call in user_answer.call_args_list]
+    assert stored == [(1, [10]), (2, [20])]
+    assert response.total_score == 3.0
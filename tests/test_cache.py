@@ -0,0 +1,353 @@
+"""Unit tests for the Redis cache decorator and its local tier."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from fastapi import HTTPException, Response
+
+from app.api.v1.posts import read_post, write_post
+from app.core.exceptions.http_exceptions import NotFoundException
+from app.core.utils import cache as cache_module
+from app.core.utils.cache import LocalCache, _compile_extra_keys, _invalidate, _KeyTemplate, _store, cache
+from app.schemas.post import PostCreate
+
+
+class FakePipeline:
+    """Records queued commands; each `execute` call is one round-trip."""
+
+    def __init__(self) -> None:
+        self.commands: list[tuple[str, tuple, dict]] = []
+        self.execute = AsyncMock(return_value=[])
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    def __getattr__(self, name: str):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def called(self, name: str) -> list[tuple[tuple, dict]]:
+        return [(args, kwargs) for command, args, kwargs in self.commands if command == name]
+
+
+@pytest.fixture
+def redis_client(mock_redis):
+    mock_redis.pipe = FakePipeline()
+    mock_redis.pipeline = Mock(return_value=mock_redis.pipe)
+    mock_redis.register_script = Mock(return_value=AsyncMock(return_value=1))
+    with patch.object(cache_module, "client", mock_redis):
+        yield mock_redis
+
+
+@pytest.fixture
+def local_cache():
+    local = LocalCache(maxsize=2, ttl=60)
+    with patch.object(cache_module, "local_cache", local):
+        yield local
+
+
+def _request(method: str = "GET") -> Mock:
+    return Mock(method=method)
+
+
+class TestLocalCache:
+    """Test the in-process LRU tier."""
+
+    def test_evicts_least_recently_used(self):
+        local = LocalCache(maxsize=2, ttl=60)
+        local.set("a", b"1")
+        local.set("b", b"2")
+        local.get("a")
+        local.set("c", b"3")
+
+        assert local.get("a") == b"1"
+        assert local.get("b") is None
+        assert local.get("c") == b"3"
+
+    def test_expired_entries_are_dropped(self):
+        local = LocalCache(maxsize=2, ttl=60)
+        with patch("app.core.utils.cache.time.monotonic", return_value=100.0):
+            local.set("a", b"1", ttl=1)
+        with patch("app.core.utils.cache.time.monotonic", return_value=102.0):
+            assert local.get("a") is None
+        assert len(local) == 0
+
+    def test_delete_pattern(self):
+        local = LocalCache(maxsize=4, ttl=60)
+        local.set("john_posts:page_1:john", b"1")
+        local.set("john_post_cache:1", b"2")
+        local.delete_pattern("john_posts:*")
+
+        assert local.get("john_posts:page_1:john") is None
+        assert local.get("john_post_cache:1") == b"2"
+
+    def test_delete_tags(self):
+        local = LocalCache(maxsize=4, ttl=60)
+        local.set("john_posts:page_1:john", b"1", tags=["user:john:posts"])
+        local.set("john_posts:page_2:john", b"2", tags=["user:john:posts"])
+        local.set("jane_posts:page_1:jane", b"3", tags=["user:jane:posts"])
+        local.delete_tags("user:john:posts")
+
+        assert len(local) == 1
+        assert local.get("jane_posts:page_1:jane") == b"3"
+
+
+class TestKeyTemplate:
+    """Test precompiled cache key templates."""
+
+    @pytest.mark.parametrize(
+        "template",
+        [
+            "post_cache",
+            "{username}_post_cache",
+            "{username}_posts:page_{page}:items_per_page:{items_per_page}",
+            "{page}-{page}",
+            "{{literal}}_{username}",
+            "{page:03d}",
+        ],
+    )
+    def test_render_matches_str_format(self, template):
+        kwargs = {"username": "john", "page": 2, "items_per_page": 10, "db": object()}
+        assert _KeyTemplate(template).render(kwargs) == template.format(**kwargs)
+
+    def test_extra_keys(self):
+        [template] = _compile_extra_keys({"{username}_posts": "{username}"})
+        assert template.render({"username": "john", "id": 1}) == "john_posts:john"
+
+
+class TestCacheDecorator:
+    """Test the cache decorator against a mocked Redis client."""
+
+    @pytest.mark.asyncio
+    async def test_local_hit_skips_redis(self, redis_client, local_cache):
+        func = AsyncMock(return_value={"id": 1})
+        endpoint = cache(key_prefix="post_cache", resource_id_name="id")(func)
+
+        assert await endpoint(_request(), id=1) == {"id": 1}
+        assert await endpoint(_request(), id=1) == {"id": 1}
+
+        func.assert_awaited_once()
+        redis_client.get.assert_awaited_once_with("post_cache:1")
+
+    @pytest.mark.asyncio
+    async def test_invalidation_evicts_local_copy_and_publishes(self, redis_client, local_cache):
+        local_cache.set("post_cache:1", b'{"id": 1}')
+        endpoint = cache(key_prefix="post_cache", resource_id_name="id")(AsyncMock(return_value={}))
+
+        await endpoint(_request("DELETE"), id=1)
+
+        assert local_cache.get("post_cache:1") is None
+        [((channel, message), _)] = redis_client.pipe.called("publish")
+        assert channel == cache_module.invalidation_channel
+        assert json.loads(message) == {"keys": ["post_cache:1"], "patterns": [], "tags": []}
+        assert redis_client.pipe.called("unlink") == [(("post_cache:1",), {})]
+        redis_client.pipe.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_single_flight_coalesces_concurrent_misses(self, redis_client):
+        async def slow_read(request, id):
+            await asyncio.sleep(0.01)
+            return {"id": id}
+
+        func = AsyncMock(side_effect=slow_read)
+        endpoint = cache(key_prefix="post_cache", resource_id_name="id", single_flight=True)(func)
+
+        results = await asyncio.gather(*(endpoint(_request(), id=1) for _ in range(3)))
+
+        assert results == [{"id": 1}] * 3
+        func.assert_awaited_once()
+        redis_client.register_script.return_value.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_waiter_takes_over_when_the_lock_is_released_without_an_entry(self, redis_client):
+        redis_client.set = AsyncMock(side_effect=[None, True])
+        redis_client.pipe.execute = AsyncMock(return_value=[0, None])
+        load = AsyncMock(return_value=({"id": 1}, b'{"id": 1}'))
+
+        started = asyncio.get_running_loop().time()
+        assert await cache_module._load_with_lock("post_cache:1", load, lock_timeout=2) == ({"id": 1}, b'{"id": 1}')
+
+        assert asyncio.get_running_loop().time() - started < 0.5
+        assert redis_client.pipe.called("exists") == [(("lock:post_cache:1",), {})]
+        load.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_is_served_while_refreshing(self, redis_client):
+        func = AsyncMock(return_value={"id": 1, "title": "new"})
+        endpoint = cache(key_prefix="post_cache", resource_id_name="id", expiration=60, stale_while_revalidate=30)(
+            func
+        )
+
+        with patch.object(cache_module, "_get_with_ttl", AsyncMock(return_value=(b'{"id": 1, "title": "old"}', 5000))):
+            result = await endpoint(_request(), id=1)
+            await asyncio.gather(*cache_module._background_tasks)
+
+        assert result == {"id": 1, "title": "old"}
+        func.assert_awaited_once()
+        [((key, _), kwargs)] = redis_client.pipe.called("set")
+        assert (key, kwargs) == ("post_cache:1", {"ex": 90})
+
+    @pytest.mark.asyncio
+    async def test_tags_are_registered_and_invalidated(self, redis_client, local_cache):
+        read = cache(key_prefix="{username}_posts", resource_id_name="username", tags=["user:{username}:posts"])
+        patch_ = cache(
+            key_prefix="{username}_post_cache", resource_id_name="id", tags_to_invalidate=["user:{username}:posts"]
+        )
+
+        await read(AsyncMock(return_value={"data": []}))(_request(), username="john")
+        assert redis_client.pipe.called("sadd") == [(("tag:user:john:posts", "john_posts:john"), {})]
+        [((_, numkeys, tag_key, expiration), _)] = redis_client.pipe.called("eval")
+        assert (numkeys, tag_key, expiration) == (1, "tag:user:john:posts", 3600)
+        assert redis_client.pipe.called("expire") == []
+        assert local_cache.get("john_posts:john") is not None
+
+        redis_client.pipe.execute.side_effect = [[{b"john_posts:john"}], []]
+        await patch_(AsyncMock(return_value={}))(_request("PATCH"), username="john", id=1)
+        assert redis_client.pipe.called("smembers") == [(("tag:user:john:posts",), {})]
+        assert redis_client.pipe.called("unlink") == [(("john_post_cache:1", b"john_posts:john"), {})]
+        assert redis_client.pipe.called("srem") == [(("tag:user:john:posts", b"john_posts:john"), {})]
+        assert len(redis_client.pipe.called("eval")) == 1
+        redis_client.scan.assert_not_called()
+        assert local_cache.get("john_posts:john") is None
+        assert redis_client.pipe.execute.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_miss_returns_original_object_and_raw_hit_returns_stored_bytes(self, redis_client):
+        post = {"id": 1, "title": "hello"}
+        func = AsyncMock(return_value=post)
+        endpoint = cache(key_prefix="post_cache", resource_id_name="id", raw_response=True)(func)
+
+        assert await endpoint(_request(), id=1) is post
+        [((_, stored), _)] = redis_client.pipe.called("set")
+
+        redis_client.get = AsyncMock(return_value=stored)
+        hit = await endpoint(_request(), id=1)
+        assert isinstance(hit, Response)
+        assert hit.body == stored
+        assert json.loads(hit.body) == post
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_cached_and_replayed(self, redis_client, local_cache):
+        func = AsyncMock(side_effect=NotFoundException("Post not found"))
+        endpoint = cache(key_prefix="post_cache", resource_id_name="id", expiration=600, negative_expiration=30)(func)
+
+        with pytest.raises(NotFoundException):
+            await endpoint(_request(), id=404)
+        [(_, kwargs)] = redis_client.pipe.called("set")
+        assert kwargs == {"ex": 30}
+
+        with pytest.raises(HTTPException) as exc_info:
+            await endpoint(_request(), id=404)
+        assert (exc_info.value.status_code, exc_info.value.detail) == (404, "Post not found")
+        func.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_created_post_evicts_cached_not_found(self, redis_client, local_cache, mock_db, sample_user_read):
+        with (
+            patch("app.api.v1.posts.crud_users") as crud_users,
+            patch("app.api.v1.posts.crud_posts") as crud_posts,
+        ):
+            crud_users.get = AsyncMock(return_value=sample_user_read)
+            crud_posts.get = AsyncMock(return_value=None)
+            with pytest.raises(NotFoundException):
+                await read_post(_request(), username="john", id=5, db=mock_db)
+            assert local_cache.get("john_post_cache:5") is not None
+
+            crud_posts.create = AsyncMock(return_value=Mock(id=5))
+            crud_posts.get = AsyncMock(return_value={"id": 5})
+            post = PostCreate(title="Hello", text="World")
+            await write_post(_request("POST"), "john", post, {"id": sample_user_read.id}, mock_db)
+
+        assert local_cache.get("john_post_cache:5") is None
+        assert redis_client.pipe.called("unlink") == [(("john_post_cache:5",), {})]
+        assert redis_client.pipe.called("smembers") == [(("tag:user:john:posts",), {})]
+
+    @pytest.mark.asyncio
+    async def test_other_status_codes_are_not_cached(self, redis_client):
+        func = AsyncMock(side_effect=HTTPException(status_code=503))
+        endpoint = cache(key_prefix="post_cache", resource_id_name="id", negative_expiration=30)(func)
+
+        with pytest.raises(HTTPException):
+            await endpoint(_request(), id=1)
+        assert redis_client.pipe.called("set") == []
+
+    @pytest.mark.asyncio
+    async def test_large_entries_are_compressed(self, redis_client):
+        page = {"data": [{"id": i, "text": "lorem ipsum " * 20} for i in range(20)]}
+        key_prefix = "{username}_posts"
+        endpoint = cache(key_prefix=key_prefix, resource_id_name="username", compress_threshold=1024)(
+            AsyncMock(return_value=page)
+        )
+        saved_before = cache_module.compression_bytes_saved.value(key_prefix=key_prefix)
+
+        await endpoint(_request(), username="john")
+        [((_, stored), _)] = redis_client.pipe.called("set")
+        assert stored[:1] == b"\x02"
+        assert cache_module.compression_bytes_saved.value(key_prefix=key_prefix) - saved_before > 0
+
+        redis_client.get = AsyncMock(return_value=stored)
+        assert await endpoint(_request(), username="john") == page
+
+    @pytest.mark.asyncio
+    async def test_local_tier_holds_compressed_entries_decompressed(self, redis_client, local_cache):
+        page = {"data": [{"id": i, "text": "lorem ipsum " * 20} for i in range(20)]}
+        endpoint = cache(key_prefix="{username}_posts", resource_id_name="username", compress_threshold=1024)(
+            AsyncMock(return_value=page)
+        )
+
+        await endpoint(_request(), username="john")
+        [((_, stored), _)] = redis_client.pipe.called("set")
+        assert stored[:1] == b"\x02"
+        assert json.loads(local_cache.get("john_posts:john"))["data"] == page["data"]
+
+        local_cache.clear()
+        redis_client.get = AsyncMock(return_value=stored)
+        assert await endpoint(_request(), username="john") == page
+        with patch.object(cache_module.zlib, "decompress") as decompress:
+            assert await endpoint(_request(), username="john") == page
+        decompress.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_hits_and_misses_are_counted_per_key_prefix(self, redis_client, local_cache):
+        key_prefix = "{username}_post_cache"
+        endpoint = cache(key_prefix=key_prefix, resource_id_name="id")(AsyncMock(return_value={"id": 1}))
+        before = (
+            cache_module.misses.value(key_prefix=key_prefix),
+            cache_module.hits.value(key_prefix=key_prefix, tier="local"),
+            cache_module.redis_latency.count(key_prefix=key_prefix, operation="get"),
+        )
+
+        await endpoint(_request(), username="john", id=1)
+        await endpoint(_request(), username="john", id=1)
+
+        after = (
+            cache_module.misses.value(key_prefix=key_prefix),
+            cache_module.hits.value(key_prefix=key_prefix, tier="local"),
+            cache_module.redis_latency.count(key_prefix=key_prefix, operation="get"),
+        )
+        assert [b - a for a, b in zip(before, after)] == [1, 1, 1]
+
+
+class TestTagsOnRedis:
+    """Run tag registration and invalidation against fakeredis."""
+
+    @pytest.mark.asyncio
+    async def test_tag_ttl_only_grows_and_members_are_invalidated(self):
+        redis = FakeAsyncRedis()
+        with patch.object(cache_module, "client", redis), patch.object(cache_module, "local_cache", None):
+            await _store("john_posts:1", b"[]", 60, ["user:john:posts"])
+            await _store("john_posts:2", b"[]", 30, ["user:john:posts"])
+            assert 30 < await redis.ttl("tag:user:john:posts") <= 60
+
+            await _store("john_posts:3", b"[]", 120, ["user:john:posts"])
+            assert 60 < await redis.ttl("tag:user:john:posts") <= 120
+
+            await redis.set("other", b"{}")
+            await _invalidate(keys=[], patterns=[], tags=["user:john:posts"])
+
+        assert await redis.keys("*") == [b"other"]
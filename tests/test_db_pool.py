@@ -0,0 +1,157 @@
+"""Tests for the database connection pool metrics and read replica routing."""
+
+from typing import Annotated
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import main
+from app.assessment_engine import question_catalog
+from app.core.db import database
+from app.core.db import pool as pool_metrics
+from app.core.db.database import async_get_db, async_get_read_db
+from app.core.db.pool import InstrumentedPool, instrument_pool
+from app.core.db.replicas import ReplicaSet
+from app.models.category import Category
+from app.models.question import Question
+from app.models.question_option import QuestionOption
+
+
+def _engine(name: str, **kwargs):
+    engine = create_async_engine(
+        "sqlite+aiosqlite://", poolclass=InstrumentedPool, pool_logging_name=name, pool_size=1, **kwargs
+    )
+    instrument_pool(engine)
+    return engine
+
+
+@pytest.mark.asyncio
+async def test_checkouts_overflow_and_wait_are_recorded():
+    engine = _engine("test_checkouts", max_overflow=1)
+
+    async with engine.connect() as first, engine.connect() as second:
+        await first.execute(text("SELECT 1"))
+        await second.execute(text("SELECT 1"))
+        assert pool_metrics.checked_out.value(pool="test_checkouts") == 2
+        assert pool_metrics.overflow.value(pool="test_checkouts") == 1
+
+    assert pool_metrics.checked_out.value(pool="test_checkouts") == 0
+    assert pool_metrics.checkouts.value(pool="test_checkouts") == 2
+    assert pool_metrics.checkout_wait.count(pool="test_checkouts") == 2
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_timeouts_and_invalidations_are_counted():
+    engine = _engine("test_timeouts", max_overflow=0, pool_timeout=0.01)
+
+    async with engine.connect() as connection:
+        with pytest.raises(exc.TimeoutError):
+            await engine.connect().start()
+        await connection.invalidate()
+
+    assert pool_metrics.checkout_timeouts.value(pool="test_timeouts") == 1
+    assert pool_metrics.invalidations.value(pool="test_timeouts") == 1
+    await engine.dispose()
+
+
+def test_replicas_are_used_round_robin_and_skipped_while_ejected():
+    replicas = ReplicaSet([_engine("test_replica_a"), _engine("test_replica_b")], eject_seconds=60)
+    assert [replicas.choose() for _ in range(3)] == [0, 1, 0]
+
+    replicas.eject(1)
+    assert [replicas.choose() for _ in range(2)] == [0, 0]
+    replicas.eject(0)
+    assert replicas.choose() is None
+
+    with patch("app.core.db.replicas.time.monotonic", return_value=10**9):
+        assert replicas.choose() is not None
+
+
+@pytest.mark.asyncio
+async def test_read_db_ejects_a_replica_on_connection_errors():
+    replicas = ReplicaSet([_engine("test_replica_read")])
+    primary = Mock(spec=AsyncSession)
+    with patch.object(database, "read_replicas", replicas):
+        sessions = database.async_get_read_db(primary)
+        db = await anext(sessions)
+        assert db.bind is replicas.engines[0]
+        with pytest.raises(ConnectionRefusedError):
+            await sessions.athrow(ConnectionRefusedError())
+
+        sessions = database.async_get_read_db(primary)
+        assert await anext(sessions) is primary
+        await sessions.aclose()
+
+    assert replicas.choose() is None
+
+
+def test_request_shares_one_lazy_session_across_dependencies():
+    engine = _engine("test_request_session")
+    sessions: list[AsyncSession] = []
+
+    async def authenticated(db: Annotated[AsyncSession, Depends(async_get_db)]) -> None:
+        sessions.append(db)
+
+    app = FastAPI()
+
+    @app.get("/cached", dependencies=[Depends(authenticated)])
+    async def cached(db: Annotated[AsyncSession, Depends(async_get_read_db)]) -> dict:
+        sessions.append(db)
+        return {}
+
+    @app.get("/query", dependencies=[Depends(authenticated)])
+    async def query(db: Annotated[AsyncSession, Depends(async_get_db)]) -> dict:
+        sessions.append(db)
+        await db.execute(text("SELECT 1"))
+        return {}
+
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    with (
+        patch.object(database, "local_session", session_factory),
+        patch.object(database, "read_replicas", ReplicaSet([])),
+        TestClient(app) as client,
+    ):
+        assert client.get("/cached").status_code == 200
+        assert sessions[0] is sessions[1]
+        assert pool_metrics.checkouts.value(pool="test_request_session") == 0
+
+        assert client.get("/query").status_code == 200
+        assert sessions[2] is sessions[3]
+        assert pool_metrics.checkouts.value(pool="test_request_session") == 1
+
+
+def test_full_assessment_data_is_read_from_a_replica(client: TestClient, tmp_path):
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    seed = create_engine(url)
+    tables = [Category.__table__, Question.__table__, QuestionOption.__table__]
+    with seed.begin() as connection:
+        database.Base.metadata.create_all(connection, tables=tables)
+        connection.execute(insert(Category).values(id="passwords", title="Passwords"))
+        connection.execute(insert(Question).values(id=1, category_id="passwords", question_text="Do you use MFA?"))
+        connection.execute(insert(QuestionOption).values(id=10, question_id=1, option_text="Yes", option_value="yes"))
+    seed.dispose()
+
+    replica = create_async_engine(url.replace("sqlite:", "sqlite+aiosqlite:"), poolclass=NullPool)
+
+    async def replica_session():
+        async with AsyncSession(replica) as session:
+            yield session
+
+    primary = Mock()
+    with (
+        patch.dict(main.app.dependency_overrides, {async_get_read_db: replica_session, async_get_db: lambda: primary}),
+        patch.object(question_catalog, "snapshot", None),
+    ):
+        response = client.get("/api/v1/assessment/data/full")
+
+    assert response.status_code == 200
+    [category] = response.json()["categories"]
+    assert category["id"] == "passwords"
+    assert [option["option_value"] for option in category["questions"][0]["options"]] == ["yes"]
+    assert primary.mock_calls == []
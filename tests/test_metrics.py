@@ -0,0 +1,64 @@
+"""Tests for the in-process metrics registry and its /metrics endpoint."""
+
+import pytest
+from fastapi import APIRouter
+from fastapi.testclient import TestClient
+
+from app.core.config import MetricsSettings
+from app.core.setup import create_application
+from app.core.utils.metrics import Counter, Histogram, Metric, Registry
+
+
+def test_registry_renders_prometheus_text(monkeypatch) -> None:
+    registry = Registry()
+    monkeypatch.setattr("app.core.utils.metrics.registry", registry)
+    hits = Counter("test_hits_total", "Hits.", labelnames=("key_prefix",))
+    latency = Histogram("test_latency_seconds", "Latency.", labelnames=("operation",), buckets=(0.01, 0.1))
+
+    hits.inc(key_prefix='{username}_"posts"')
+    latency.observe(0.005, operation="get")
+    latency.observe(0.05, operation="get")
+    latency.observe(5, operation="get")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE test_hits_total counter" in lines
+    assert 'test_hits_total{key_prefix="{username}_\\"posts\\""} 1.0' in lines
+    assert 'test_latency_seconds_bucket{operation="get",le="0.01"} 1' in lines
+    assert 'test_latency_seconds_bucket{operation="get",le="0.1"} 2' in lines
+    assert 'test_latency_seconds_bucket{operation="get",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_count{operation="get"} 3' in lines
+
+
+def test_metric_without_samples_cannot_be_created(monkeypatch) -> None:
+    registry = Registry()
+    monkeypatch.setattr("app.core.utils.metrics.registry", registry)
+
+    class Incomplete(Metric):
+        type = "gauge"
+
+    with pytest.raises(TypeError):
+        Incomplete("test_incomplete", "Forgot samples().")
+    assert registry.get("test_incomplete") is None
+
+
+def test_metrics_endpoint_is_disabled_by_default() -> None:
+    assert MetricsSettings.model_fields["METRICS_ENABLED"].default is False
+
+    client = TestClient(create_application(APIRouter(), MetricsSettings(METRICS_ENABLED=False)))
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_endpoint() -> None:
+    from app.core.utils import cache
+
+    cache.misses.inc(key_prefix="metrics_endpoint_test")
+    settings = MetricsSettings(METRICS_ENABLED=True, METRICS_TOKEN="scrape-token")
+    client = TestClient(create_application(APIRouter(), settings))
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'cache_misses_total{key_prefix="metrics_endpoint_test"} 1.0' in response.text
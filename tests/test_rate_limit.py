@@ -0,0 +1,344 @@
+"""Unit tests for the Redis rate limiter."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from fastapi import Response
+
+from app.api.dependencies import rate_limiter_dependency
+from app.core.exceptions.http_exceptions import RateLimitException
+from app.core.utils import rate_limit as rate_limit_module
+from app.core.utils.rate_limit import (
+    _SCRIPTS,
+    LocalRateLimitCounters,
+    RateLimiter,
+    RateLimitResult,
+    RateLimitRule,
+    RateLimitRules,
+)
+from app.schemas.rate_limit import RateLimitAlgorithm
+
+
+@pytest.fixture
+def limiter():
+    limiter = RateLimiter()
+    client, scripts = limiter.client, limiter.scripts
+    limiter.client = Mock()
+    limiter.client.register_script = Mock(side_effect=lambda source: AsyncMock(return_value=[0, 4, 1000]))
+    limiter.scripts = {}
+    yield limiter
+    limiter.client, limiter.scripts = client, scripts
+
+
+class TestRateLimiter:
+    """Test algorithm dispatch against a mocked Redis client."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("algorithm", list(RateLimitAlgorithm))
+    async def test_runs_the_algorithm_script_once(self, limiter, algorithm):
+        limited = await limiter.is_rate_limited(
+            db=Mock(), user_id=1, path="/api/v1/posts", limit=5, period=60, algorithm=algorithm
+        )
+
+        assert limited is False
+        limiter.client.register_script.assert_called_once_with(_SCRIPTS[algorithm])
+        script = limiter.scripts[algorithm]
+        script.assert_awaited_once()
+        assert script.await_args.kwargs["keys"] == [f"ratelimit:1:api_v1_posts:{algorithm.value}"]
+        assert script.await_args.kwargs["args"][:2] == [5, 60]
+
+    @pytest.mark.asyncio
+    async def test_scripts_are_registered_once_per_algorithm(self, limiter):
+        for _ in range(3):
+            await limiter.is_rate_limited(
+                db=Mock(), user_id=1, path="posts", limit=5, period=60, algorithm=RateLimitAlgorithm.TOKEN_BUCKET
+            )
+
+        limiter.client.register_script.assert_called_once()
+        assert limiter.scripts[RateLimitAlgorithm.TOKEN_BUCKET].await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_sliding_window_log_members_are_unique(self, limiter):
+        for _ in range(2):
+            await limiter.is_rate_limited(
+                db=Mock(), user_id=1, path="posts", limit=5, period=60, algorithm=RateLimitAlgorithm.SLIDING_WINDOW_LOG
+            )
+
+        calls = limiter.scripts[RateLimitAlgorithm.SLIDING_WINDOW_LOG].await_args_list
+        assert calls[0].kwargs["args"][2] != calls[1].kwargs["args"][2]
+
+    @pytest.mark.asyncio
+    async def test_limited_reply(self, limiter):
+        limiter.client.register_script = Mock(return_value=AsyncMock(return_value=[1, 0, 2500]))
+
+        assert await limiter.is_rate_limited(db=Mock(), user_id=1, path="posts", limit=5, period=60) is True
+
+
+# A multiple of every period used below, so fixed windows start at START.
+START = 1_700_006_400.0
+
+
+@pytest.fixture
+def clock():
+    clock = Mock(now=START)
+    with patch("time.time", lambda: clock.now):
+        yield clock
+
+
+@pytest.fixture
+def redis_limiter(clock):
+    limiter = RateLimiter()
+    client, scripts = limiter.client, limiter.scripts
+    limiter.client = FakeAsyncRedis()
+    limiter.scripts = {}
+    yield limiter
+    limiter.client, limiter.scripts = client, scripts
+
+
+class TestRateLimitScripts:
+    """Run the algorithm scripts on fakeredis's Lua interpreter, with its `TIME` driven by `clock`."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("algorithm", list(RateLimitAlgorithm))
+    async def test_limit_is_enforced(self, redis_limiter, algorithm):
+        results = [
+            await redis_limiter.check(user_id=1, path="posts", limit=3, period=60, algorithm=algorithm)
+            for _ in range(4)
+        ]
+
+        replies = [(result.limited, result.remaining) for result in results]
+        assert replies == [(False, 2), (False, 1), (False, 0), (True, 0)]
+        assert results[-1].reset_after > 0
+        assert await redis_limiter.client.pttl(f"ratelimit:1:posts:{algorithm.value}") > 0
+
+    @pytest.mark.asyncio
+    async def test_sliding_window_log_has_no_window_edge_burst(self, redis_limiter, clock):
+        clock.now = START + 59
+        for algorithm in (RateLimitAlgorithm.FIXED_WINDOW, RateLimitAlgorithm.SLIDING_WINDOW_LOG):
+            for _ in range(3):
+                await redis_limiter.check(user_id=1, path="posts", limit=3, period=60, algorithm=algorithm)
+
+        clock.now = START + 61
+        fixed = await redis_limiter.check(
+            user_id=1, path="posts", limit=3, period=60, algorithm=RateLimitAlgorithm.FIXED_WINDOW
+        )
+        log = await redis_limiter.check(
+            user_id=1, path="posts", limit=3, period=60, algorithm=RateLimitAlgorithm.SLIDING_WINDOW_LOG
+        )
+
+        assert (fixed.limited, fixed.remaining) == (False, 2)
+        assert (log.limited, log.reset_after) == (True, 58.0)
+
+    @pytest.mark.asyncio
+    async def test_sliding_window_counter_weights_the_previous_window(self, redis_limiter, clock):
+        algorithm = RateLimitAlgorithm.SLIDING_WINDOW_COUNTER
+        clock.now = START + 30
+        for _ in range(10):
+            await redis_limiter.check(user_id=1, path="posts", limit=10, period=60, algorithm=algorithm)
+
+        # Halfway through the next window, the previous window's 10 requests count as 5.
+        clock.now = START + 90
+        results = [
+            await redis_limiter.check(user_id=1, path="posts", limit=10, period=60, algorithm=algorithm)
+            for _ in range(6)
+        ]
+
+        assert [result.remaining for result in results[:5]] == [4, 3, 2, 1, 0]
+        assert results[5].limited
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_refills_at_the_limit_rate(self, redis_limiter, clock):
+        algorithm = RateLimitAlgorithm.TOKEN_BUCKET
+        for _ in range(3):
+            assert not (
+                await redis_limiter.check(user_id=1, path="posts", limit=3, period=60, algorithm=algorithm)
+            ).limited
+
+        rejected = await redis_limiter.check(user_id=1, path="posts", limit=3, period=60, algorithm=algorithm)
+        assert (rejected.limited, rejected.reset_after) == (True, 20.0)
+
+        clock.now = START + 20
+        refilled = await redis_limiter.check(user_id=1, path="posts", limit=3, period=60, algorithm=algorithm)
+        assert (refilled.limited, refilled.remaining) == (False, 0)
+        assert (await redis_limiter.check(user_id=1, path="posts", limit=3, period=60, algorithm=algorithm)).limited
+
+
+@pytest.fixture
+def rules():
+    rules = RateLimitRules()
+    rules.loaded = True
+    rules.tiers = {1: "free"}
+    rules.rules = {(1, "api_v1_posts"): RateLimitRule(limit=5, period=60, algorithm=RateLimitAlgorithm.TOKEN_BUCKET)}
+    with patch.object(RateLimiter, "rules", rules):
+        yield rules
+
+
+def _request(path: str) -> Mock:
+    request = Mock()
+    request.url.path = path
+    del request.app.state.initialization_complete
+    return request
+
+
+class TestRateLimitRules:
+    """Test the in-process rule table used by `rate_limiter_dependency`."""
+
+    @pytest.mark.asyncio
+    async def test_load(self):
+        tiers = {"data": [{"id": 1, "name": "free"}]}
+        rate_limits = {
+            "data": [{"tier_id": 1, "path": "api_v1_posts", "limit": 5, "period": 60, "algorithm": "token_bucket"}]
+        }
+        rules = RateLimitRules()
+        with (
+            patch.object(rate_limit_module.crud_tiers, "get_multi", AsyncMock(return_value=tiers)),
+            patch.object(rate_limit_module.crud_rate_limits, "get_multi", AsyncMock(return_value=rate_limits)),
+        ):
+            await rules.load(Mock())
+
+        assert rules.loaded
+        assert rules.tiers == {1: "free"}
+        assert rules.get(1, "api_v1_posts") == RateLimitRule(limit=5, period=60, algorithm="token_bucket")
+        assert rules.get(1, "api_v1_users") is None
+
+    @pytest.mark.asyncio
+    async def test_dependency_runs_no_queries(self, rules):
+        result = RateLimitResult(limited=False, limit=5, remaining=4, reset_after=60)
+        with (
+            patch.object(rate_limit_module.rate_limiter, "check", AsyncMock(return_value=result)) as check,
+            patch.object(rate_limit_module.crud_tiers, "get_multi") as tiers_query,
+            patch.object(rate_limit_module.crud_rate_limits, "get_multi") as rate_limits_query,
+        ):
+            await rate_limiter_dependency(
+                _request("/api/v1/posts"), Response(), db=Mock(), user={"id": 7, "tier_id": 1}
+            )
+
+        tiers_query.assert_not_called()
+        rate_limits_query.assert_not_called()
+        check.assert_awaited_once_with(
+            user_id=7,
+            path="api_v1_posts",
+            limit=5,
+            period=60,
+            algorithm=RateLimitAlgorithm.TOKEN_BUCKET,
+            approximate=False,
+        )
+
+    @pytest.mark.asyncio
+    async def test_refresh_reloads_and_announces(self, limiter, rules):
+        limiter.client.publish = AsyncMock()
+        with patch.object(rules, "load", AsyncMock()) as load:
+            await limiter.refresh_rules(Mock())
+
+        load.assert_awaited_once()
+        limiter.client.publish.assert_awaited_once_with(limiter.rules_channel, rate_limit_module._WORKER_ID)
+
+
+@pytest.fixture
+def counters():
+    client = Mock()
+    client.register_script = Mock(return_value=AsyncMock(return_value=[[3, 30_000]]))
+    return LocalRateLimitCounters(client, sync_interval=60, sync_hits=2)
+
+
+class TestLocalRateLimitCounters:
+    """Test approximate counting with batched Redis syncs."""
+
+    @pytest.mark.asyncio
+    async def test_hits_are_synced_in_one_batch(self, counters):
+        counters.client.register_script.return_value.return_value = [[1, 30_000], [1, 30_000]]
+        assert counters.hit("ratelimit:a:posts:fixed_window", limit=5, period=60).limited is False
+        assert counters.hit("ratelimit:b:posts:fixed_window", limit=5, period=60).limited is False
+
+        await counters.sync()
+
+        script = counters.client.register_script.return_value
+        script.assert_awaited_once_with(
+            keys=["ratelimit:a:posts:fixed_window", "ratelimit:b:posts:fixed_window"], args=[1, 60, 1, 60]
+        )
+
+    @pytest.mark.asyncio
+    async def test_rejects_locally_once_the_global_count_reaches_the_limit(self, counters):
+        key = "ratelimit:a:posts:fixed_window"
+        assert counters.hit(key, limit=3, period=60).limited is False
+        assert counters._sync_requested.is_set() is False
+        assert counters.hit(key, limit=3, period=60).limited is False
+        assert counters._sync_requested.is_set() is True
+
+        await counters.sync()
+
+        assert counters.hit(key, limit=3, period=60).limited is True
+        counters.client.register_script.return_value.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_window_end_resets_the_known_count(self, counters):
+        key = "ratelimit:a:posts:fixed_window"
+        counters.hit(key, limit=3, period=60)
+        with patch("app.core.utils.rate_limit.time.monotonic", return_value=100.0):
+            await counters.sync()
+        with patch("app.core.utils.rate_limit.time.monotonic", return_value=131.0):
+            assert counters.hit(key, limit=3, period=60).limited is False
+
+    @pytest.mark.asyncio
+    async def test_failed_sync_keeps_pending_hits(self, counters):
+        counters.client.register_script.return_value.side_effect = ConnectionError
+        counters.hit("ratelimit:a:posts:fixed_window", limit=3, period=60)
+
+        with pytest.raises(ConnectionError):
+            await counters.sync()
+        assert counters._counters["ratelimit:a:posts:fixed_window"].pending == 1
+
+    @pytest.mark.asyncio
+    async def test_approximate_checks_skip_redis(self, limiter, counters):
+        counters.running = True
+        limiter.local_counters = counters
+        try:
+            limited = await limiter.is_rate_limited(
+                db=Mock(), user_id="127.0.0.1", path="posts", limit=5, period=60, approximate=True
+            )
+        finally:
+            limiter.local_counters = None
+
+        assert limited is False
+        limiter.client.register_script.assert_not_called()
+        assert counters._counters["ratelimit:127.0.0.1:posts:fixed_window"].pending == 1
+
+
+class TestRateLimitHeaders:
+    """Test the quota and retry hints returned to clients."""
+
+    def test_result_headers(self):
+        allowed = RateLimitResult(limited=False, limit=5, remaining=4, reset_after=59.2)
+        limited = RateLimitResult(limited=True, limit=5, remaining=0, reset_after=2.5)
+
+        assert allowed.headers == {"RateLimit-Limit": "5", "RateLimit-Remaining": "4", "RateLimit-Reset": "60"}
+        assert limited.headers["Retry-After"] == "3"
+
+    @pytest.mark.asyncio
+    async def test_script_reply_becomes_result(self, limiter):
+        limiter.client.register_script = Mock(return_value=AsyncMock(return_value=[1, 0, 2500]))
+
+        result = await limiter.check(user_id=1, path="posts", limit=5, period=60)
+
+        assert result == RateLimitResult(limited=True, limit=5, remaining=0, reset_after=2.5)
+
+    @pytest.mark.asyncio
+    async def test_dependency_sets_headers(self, rules):
+        response = Response()
+        result = RateLimitResult(limited=False, limit=10, remaining=9, reset_after=30)
+        with patch.object(rate_limit_module.rate_limiter, "check", AsyncMock(return_value=result)):
+            await rate_limiter_dependency(_request("/api/v1/posts"), response, db=Mock(), user=None)
+
+        assert response.headers["RateLimit-Remaining"] == "9"
+        assert "Retry-After" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_rejection_carries_retry_after(self, rules):
+        result = RateLimitResult(limited=True, limit=10, remaining=0, reset_after=30)
+        with patch.object(rate_limit_module.rate_limiter, "check", AsyncMock(return_value=result)):
+            with pytest.raises(RateLimitException) as exc_info:
+                await rate_limiter_dependency(_request("/api/v1/posts"), Response(), db=Mock(), user=None)
+
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.headers["Retry-After"] == "30"
@@ -0,0 +1,360 @@
+"""Unit tests for token verification, its caches and the password hashing pool."""
+
+import asyncio
+import json
+import threading
+from unittest.mock import AsyncMock, Mock, patch
+
+import bcrypt
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.api import dependencies
+from app.core import security
+from app.core.exceptions.http_exceptions import ServiceUnavailableException
+from app.core.schemas import TokenData
+from app.core.security import (
+    PasswordHashPool,
+    TokenType,
+    VerifiedTokenCache,
+    authenticate_user,
+    blacklist_token,
+    create_access_token,
+    hash_password,
+    password_needs_rehash,
+    verify_password,
+    verify_token,
+)
+from app.core.utils.cache import LocalCache
+from app.core.utils.token_blacklist import BloomFilter, RedisTokenBlacklist
+from app.schemas.user import UserPrincipal
+
+
+@pytest.fixture
+def verified_tokens():
+    tokens = VerifiedTokenCache(maxsize=2)
+    with patch.object(security, "verified_tokens", tokens), patch.object(security.cache, "client", None):
+        yield tokens
+
+
+@pytest.fixture
+def redis_client():
+    client = Mock(set=AsyncMock(), exists=AsyncMock(return_value=0), publish=AsyncMock())
+    redis_blacklist = RedisTokenBlacklist(capacity=100)
+    redis_blacklist.ready = True
+    with patch.object(security.cache, "client", client), patch.object(security, "token_blacklist", redis_blacklist):
+        yield client
+
+
+@pytest.fixture
+def blacklist():
+    with (
+        patch.object(security.crud_token_blacklist, "exists", AsyncMock(return_value=False)) as exists,
+        patch.object(security.crud_token_blacklist, "create", AsyncMock()),
+    ):
+        yield exists
+
+
+class TestVerifiedTokenCache:
+    """Test the LRU of verified tokens."""
+
+    def test_evicts_least_recently_used(self):
+        tokens = VerifiedTokenCache(maxsize=2)
+        tokens.set("a", {"exp": 4102444800})
+        tokens.set("b", {"exp": 4102444800})
+        tokens.get("a")
+        tokens.set("c", {"exp": 4102444800})
+
+        assert tokens.get("a") is not None
+        assert tokens.get("b") is None
+
+    def test_entries_expire_with_the_token(self):
+        tokens = VerifiedTokenCache()
+        tokens.set("a", {"exp": 1000})
+        with patch("app.core.security.time.time", return_value=1000.0):
+            assert tokens.get("a") is None
+        assert len(tokens) == 0
+
+    def test_tokens_without_exp_are_not_cached(self):
+        tokens = VerifiedTokenCache()
+        tokens.set("a", {"sub": "john"})
+        assert len(tokens) == 0
+
+
+class TestVerifyToken:
+    """Test `verify_token` against a mocked blacklist."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_verification_skips_blacklist_and_decode(self, verified_tokens, blacklist):
+        token = await create_access_token(data={"sub": "john"})
+
+        assert (await verify_token(token, TokenType.ACCESS, Mock())).username_or_email == "john"
+        with patch.object(security.signing_keys, "decode") as decode:
+            assert (await verify_token(token, TokenType.ACCESS, Mock())).username_or_email == "john"
+
+        decode.assert_not_called()
+        blacklist.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_cached_token_still_checks_token_type(self, verified_tokens, blacklist):
+        token = await create_access_token(data={"sub": "john"})
+        await verify_token(token, TokenType.ACCESS, Mock())
+
+        assert await verify_token(token, TokenType.REFRESH, Mock()) is None
+
+    @pytest.mark.asyncio
+    async def test_blacklisting_evicts_the_cached_token(self, verified_tokens, blacklist):
+        token = await create_access_token(data={"sub": "john"})
+        await verify_token(token, TokenType.ACCESS, Mock())
+
+        await blacklist_token(token, Mock())
+        blacklist.return_value = True
+
+        assert await verify_token(token, TokenType.ACCESS, Mock()) is None
+
+    @pytest.mark.asyncio
+    async def test_revocation_is_announced_to_other_workers(self, verified_tokens):
+        client = Mock(publish=AsyncMock())
+        with patch.object(security.cache, "client", client):
+            await security.revoke_cached_tokens("a", "b", jtis=("1",))
+
+        [(channel, message), _] = client.publish.await_args
+        assert channel == security.token_revocation_channel
+        assert json.loads(message) == {
+            "digests": [VerifiedTokenCache.digest("a"), VerifiedTokenCache.digest("b")],
+            "jtis": ["1"],
+        }
+
+    @pytest.mark.asyncio
+    async def test_tokens_with_jti_skip_the_blacklist_table(self, verified_tokens, blacklist, redis_client):
+        token = await create_access_token(data={"sub": "john"})
+
+        assert await verify_token(token, TokenType.ACCESS, Mock()) is not None
+        blacklist.assert_not_awaited()
+        redis_client.exists.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_blacklisting_revokes_the_jti(self, verified_tokens, blacklist, redis_client):
+        token = await create_access_token(data={"sub": "john"})
+        await verify_token(token, TokenType.ACCESS, Mock())
+
+        await blacklist_token(token, Mock())
+        [((key, _), kwargs)] = redis_client.set.await_args_list
+        assert key.startswith(RedisTokenBlacklist.prefix)
+        assert 0 < kwargs["ex"] <= 30 * 60
+
+        redis_client.exists = AsyncMock(return_value=1)
+        assert await verify_token(token, TokenType.ACCESS, Mock()) is None
+        blacklist.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_the_table_when_redis_is_down(self, verified_tokens, blacklist, redis_client):
+        token = await create_access_token(data={"sub": "john"})
+        security.token_blacklist.ready = False
+        redis_client.exists.side_effect = RedisConnectionError
+        blacklist.return_value = True
+
+        assert await verify_token(token, TokenType.ACCESS, Mock()) is None
+        blacklist.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_blacklisting_survives_a_redis_outage(self, verified_tokens, blacklist, redis_client):
+        token = await create_access_token(data={"sub": "john"})
+        redis_client.set.side_effect = RedisConnectionError
+        redis_client.publish.side_effect = RedisConnectionError
+
+        await blacklist_token(token, Mock())
+        security.crud_token_blacklist.create.assert_awaited_once()
+
+        async def scan_iter(match, count):
+            for key in ():
+                yield key
+
+        redis_client.set.side_effect = None
+        redis_client.scan_iter = scan_iter
+        [jti] = await security.token_blacklist.rebuild()
+        assert redis_client.set.await_args.args == (f"{RedisTokenBlacklist.prefix}{jti}", 1)
+        assert jti in security.token_blacklist.bloom
+        assert await security.token_blacklist.rebuild() == []
+
+
+class TestRedisTokenBlacklist:
+    """Test the Bloom filter in front of the Redis blacklist."""
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+
+        assert all(f"jti-{i}" in bloom for i in range(1000))
+        assert sum(f"other-{i}" in bloom for i in range(10_000)) < 300
+
+    @pytest.mark.asyncio
+    async def test_rebuild_loads_revoked_ids_from_redis(self, redis_client):
+        async def scan_iter(match, count):
+            for key in (b"blacklist:jti:revoked",):
+                yield key
+
+        redis_client.scan_iter = scan_iter
+        redis_client.exists.return_value = 1
+        await security.token_blacklist.rebuild()
+
+        assert await security.token_blacklist.is_revoked("valid") is False
+        redis_client.exists.assert_not_awaited()
+        assert await security.token_blacklist.is_revoked("revoked") is True
+        redis_client.exists.assert_awaited_once_with("blacklist:jti:revoked")
+
+    @pytest.mark.asyncio
+    async def test_checks_redis_until_the_filter_is_ready(self, redis_client):
+        security.token_blacklist.ready = False
+
+        assert await security.token_blacklist.is_revoked("valid") is False
+        redis_client.exists.assert_awaited_once()
+
+
+class TestPrincipalCache:
+    """Test the cache of users resolved by `get_current_user`."""
+
+    @pytest.fixture
+    def principals(self):
+        principals = LocalCache(maxsize=2, ttl=60)
+        with (
+            patch.object(security, "principals", principals),
+            patch.object(dependencies, "principals", principals),
+            patch.object(dependencies, "verify_token", AsyncMock(return_value=TokenData(username_or_email="john"))),
+            patch.object(security.cache, "client", None),
+        ):
+            yield principals
+
+    @pytest.mark.asyncio
+    async def test_repeated_resolution_skips_the_user_query(self, principals):
+        user = {"id": 1, "username": "john", "email": "john@example.com", "tier_id": None, "is_superuser": False}
+        with patch.object(dependencies.crud_users, "get", AsyncMock(return_value=user)) as get:
+            assert await dependencies.get_current_user("token", Mock()) == user
+            assert await dependencies.get_current_user("token", Mock()) == user
+
+        get.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_only_the_principal_fields_are_cached(self, principals):
+        row = {"id": 1, "username": "john", "email": "john@example.com", "tier_id": None, "is_superuser": False}
+        with patch.object(dependencies.crud_users, "get", AsyncMock(return_value={**row, "hashed_password": "x"})):
+            assert await dependencies.get_current_user("token", Mock()) == row
+
+        assert principals.get("john") == row
+        assert set(row) == set(UserPrincipal.model_fields)
+
+    @pytest.mark.asyncio
+    async def test_invalidation_forces_a_fresh_lookup(self, principals):
+        user = {"id": 1, "username": "john", "email": "john@example.com", "tier_id": None, "is_superuser": False}
+        with patch.object(dependencies.crud_users, "get", AsyncMock(return_value=user)) as get:
+            await dependencies.get_current_user("token", Mock())
+            await security.invalidate_principals("john")
+            get.return_value = {**user, "is_superuser": True}
+
+            assert (await dependencies.get_current_user("token", Mock()))["is_superuser"] is True
+
+        assert get.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidation_is_announced_to_other_workers(self, principals):
+        principals.set("john@example.com", {"username": "john"}, tags=[security.principal_tag("john")])
+        client = Mock(publish=AsyncMock())
+        with patch.object(security.cache, "client", client):
+            await security.invalidate_principals("john")
+
+        assert len(principals) == 0
+        [(channel, message), _] = client.publish.await_args
+        assert channel == security.token_revocation_channel
+        assert json.loads(message) == {"usernames": ["john"]}
+
+    @pytest.mark.asyncio
+    async def test_invalidation_survives_a_redis_outage(self, principals):
+        principals.set("john", {"username": "john"}, tags=[security.principal_tag("john")])
+        client = Mock(publish=AsyncMock(side_effect=RedisConnectionError))
+        with patch.object(security.cache, "client", client):
+            await security.invalidate_principals("john")
+
+        assert len(principals) == 0
+
+
+class TestPasswordHashPool:
+    """Test that bcrypt runs off the event loop and sheds load when the pool is full."""
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify_run_in_the_pool(self):
+        pool = PasswordHashPool(max_workers=1, max_pending=4)
+        with patch.object(security, "password_hash_pool", pool), patch.object(security, "PASSWORD_HASH_ROUNDS", 4):
+            hashed = await hash_password("secret")
+            assert await verify_password("secret", hashed)
+            assert not await verify_password("wrong", hashed)
+
+        assert pool.pending == 0
+        assert hashed.startswith("$2b$04$")
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_full_pool_rejects_new_calls(self):
+        pool = PasswordHashPool(max_workers=1, max_pending=1)
+        release = threading.Event()
+        rejected_before = security.password_hash_rejections.value(operation="verify")
+
+        waiting = asyncio.create_task(pool.run("verify", release.wait))
+        await asyncio.sleep(0)
+        assert security.password_hash_queue_depth.value() == 1
+
+        with pytest.raises(ServiceUnavailableException) as exc_info:
+            await pool.run("verify", release.wait)
+        assert exc_info.value.headers == {"Retry-After": "1"}
+        assert security.password_hash_rejections.value(operation="verify") - rejected_before == 1
+
+        release.set()
+        await waiting
+        assert security.password_hash_queue_depth.value() == 0
+        pool.shutdown()
+
+
+class TestAuthenticateUser:
+    """Test that logging in upgrades hashes made with an outdated cost."""
+
+    @pytest.fixture
+    def crud_users(self):
+        pool = PasswordHashPool(max_workers=1)
+        with (
+            patch.object(security, "password_hash_pool", pool),
+            patch.object(security, "PASSWORD_HASH_ROUNDS", 5),
+            patch.object(security.cache, "client", None),
+            patch.object(security, "crud_users") as crud_users,
+        ):
+            crud_users.update = AsyncMock()
+            yield crud_users
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_outdated_cost_is_rehashed_on_login(self, crud_users):
+        stored = bcrypt.hashpw(b"secret", bcrypt.gensalt(4)).decode()
+        crud_users.get = AsyncMock(return_value={"id": 1, "username": "john", "hashed_password": stored})
+
+        user = await authenticate_user("john", "secret", Mock())
+
+        [(_, kwargs)] = crud_users.update.await_args_list
+        assert kwargs["id"] == 1
+        assert kwargs["object"]["hashed_password"].startswith("$2b$05$")
+        assert user["hashed_password"] == kwargs["object"]["hashed_password"]
+        assert await verify_password("secret", user["hashed_password"])
+
+    @pytest.mark.asyncio
+    async def test_current_cost_and_wrong_password_are_left_alone(self, crud_users):
+        stored = bcrypt.hashpw(b"secret", bcrypt.gensalt(5)).decode()
+        crud_users.get = AsyncMock(return_value={"id": 1, "username": "john", "hashed_password": stored})
+
+        assert await authenticate_user("john", "secret", Mock())
+        assert await authenticate_user("john", "wrong", Mock()) is False
+        crud_users.update.assert_not_awaited()
+
+    def test_password_needs_rehash(self):
+        with patch.object(security, "PASSWORD_HASH_ROUNDS", 12):
+            assert not password_needs_rehash("$2b$12$" + "a" * 53)
+            assert password_needs_rehash("$2b$10$" + "a" * 53)
+            assert password_needs_rehash("$2a$12$" + "a" * 53)
+            assert password_needs_rehash("$argon2id$v=19$m=65536,t=3,p=4$c2FsdA$aGFzaA")
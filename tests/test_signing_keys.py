@@ -0,0 +1,110 @@
+"""Unit tests for the JWT key set and its rotation."""
+
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi.testclient import TestClient
+from jose import JWTError, jwk, jwt
+
+from app.core.utils.signing_keys import KeySet
+
+
+def _rsa_jwk(kid: str) -> dict:
+    pem = rsa.generate_private_key(public_exponent=65537, key_size=2048).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    return {**jwk.construct(pem, "RS256").to_dict(), "kid": kid}
+
+
+def _public(key: dict) -> dict:
+    return {name: value for name, value in key.items() if name in ("kty", "alg", "kid", "n", "e")}
+
+
+@pytest.fixture(scope="module")
+def rsa_keys() -> tuple[dict, dict]:
+    return _rsa_jwk("2026-01"), _rsa_jwk("2026-02")
+
+
+def _write(path, *keys: dict) -> None:
+    path.write_text(json.dumps({"keys": list(keys)}))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_without_a_file_tokens_are_signed_with_the_secret():
+    keys = KeySet(algorithm="HS256", secret="secret")
+    token = keys.sign({"sub": "john"})
+
+    assert "kid" not in jwt.get_unverified_header(token)
+    assert jwt.decode(token, "secret", algorithms=["HS256"]) == {"sub": "john"}
+    assert keys.decode(token) == {"sub": "john"}
+    assert keys.public_jwks() == {"keys": []}
+
+
+def test_rsa_tokens_carry_the_active_kid(tmp_path, rsa_keys):
+    old, new = rsa_keys
+    path = tmp_path / "jwks.json"
+    _write(path, old, new)
+    keys = KeySet(algorithm="HS256", secret="secret", path=str(path), active_kid="2026-02")
+
+    token = keys.sign({"sub": "john"})
+
+    assert jwt.get_unverified_header(token) == {"alg": "RS256", "kid": "2026-02", "typ": "JWT"}
+    assert keys.decode(token) == {"sub": "john"}
+    [public_old, public_new] = keys.public_jwks()["keys"]
+    assert "d" not in public_new
+    assert (public_old["kid"], public_new["use"]) == ("2026-01", "sig")
+
+
+def test_verify_only_key_set_rejects_tokens_from_unknown_keys(tmp_path, rsa_keys):
+    old, new = rsa_keys
+    signer_path, verifier_path = tmp_path / "signer.json", tmp_path / "verifier.json"
+    _write(signer_path, old, new)
+    _write(verifier_path, _public(old))
+    signer = KeySet(algorithm="HS256", secret="secret", path=str(signer_path))
+    verifier = KeySet(algorithm="HS256", secret="secret", path=str(verifier_path))
+
+    assert verifier.decode(signer.sign({"sub": "john"})) == {"sub": "john"}
+    with pytest.raises(RuntimeError):
+        verifier.sign({"sub": "john"})
+    with pytest.raises(JWTError):
+        verifier.decode(KeySet(algorithm="HS256", secret="secret").sign({"sub": "john"}))
+
+
+def test_rotation_reloads_the_file_without_a_restart(tmp_path, rsa_keys):
+    old, new = rsa_keys
+    path = tmp_path / "jwks.json"
+    _write(path, old)
+    keys = KeySet(algorithm="HS256", secret="secret", path=str(path), reload_interval=0)
+    old_token = keys.sign({"sub": "john"})
+
+    _write(path, new, old)
+    new_token = keys.sign({"sub": "john"})
+
+    assert jwt.get_unverified_header(new_token)["kid"] == "2026-02"
+    assert keys.decode(old_token) == keys.decode(new_token) == {"sub": "john"}
+
+
+def test_broken_file_keeps_the_current_keys(tmp_path, rsa_keys):
+    path = tmp_path / "jwks.json"
+    _write(path, rsa_keys[0])
+    keys = KeySet(algorithm="HS256", secret="secret", path=str(path), reload_interval=0)
+
+    path.write_text("{not json")
+    os.utime(path, ns=(0, 0))
+
+    assert keys.decode(keys.sign({"sub": "john"})) == {"sub": "john"}
+
+
+def test_jwks_endpoint(client: TestClient, tmp_path, rsa_keys):
+    path = tmp_path / "jwks.json"
+    _write(path, rsa_keys[0])
+    with patch("app.api.v1.login.signing_keys", KeySet(algorithm="HS256", secret="secret", path=str(path))):
+        response = client.get("/api/v1/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert response.json() == {"keys": [{**_public(rsa_keys[0]), "use": "sig"}]}
@@ -4,7 +4,7 @@ from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
-from app.api.v1.users import erase_user, patch_user, read_user, read_users, write_user
+from app.api.v1.users import erase_user, patch_user, read_user, read_users, read_users_me, write_user
 from app.core.exceptions.http_exceptions import DuplicateValueException, ForbiddenException, NotFoundException
 from app.schemas.user import UserCreate, UserRead, UserUpdate
 
@@ -23,9 +23,7 @@ class TestWriteUser:
             mock_crud.create = AsyncMock(return_value=Mock(id=1))
             mock_crud.get = AsyncMock(return_value=sample_user_read)
 
-            with patch("app.api.v1.users.get_password_hash") as mock_hash:
-                mock_hash.return_value = "hashed_password"
-
+            with patch("app.api.v1.users.hash_password", AsyncMock(return_value="hashed_password")):
                 result = await write_user(Mock(), user_create, mock_db)
 
                 assert result == sample_user_read
@@ -88,6 +86,23 @@ class TestReadUser:
                 await read_user(Mock(), username, mock_db)
 
 
+class TestReadUsersMe:
+    """Test the current user endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_profile_is_read_from_the_database(self, mock_db, sample_user_read, current_user_dict):
+        """The principal cache holds no profile fields, so the profile is loaded by id."""
+        with patch("app.api.v1.users.crud_users") as mock_crud:
+            mock_crud.get = AsyncMock(return_value=sample_user_read)
+
+            result = await read_users_me(Mock(), current_user_dict, mock_db)
+
+            assert result == sample_user_read
+            mock_crud.get.assert_called_once_with(
+                db=mock_db, id=current_user_dict["id"], is_deleted=False, schema_to_select=UserRead
+            )
+
+
 class TestReadUsers:
     """Test users list endpoint."""
 
@@ -125,10 +140,12 @@ class TestPatchUser:
             mock_crud.exists = AsyncMock(return_value=False)  # No conflicts
             mock_crud.update = AsyncMock(return_value=None)
 
-            result = await patch_user(Mock(), user_update, username, current_user_dict, mock_db)
+            with patch("app.api.v1.users.invalidate_principals", new_callable=AsyncMock) as mock_invalidate:
+                result = await patch_user(Mock(), user_update, username, current_user_dict, mock_db)
 
             assert result == {"message": "User updated"}
             mock_crud.update.assert_called_once()
+            mock_invalidate.assert_awaited_once_with(username)
 
     @pytest.mark.asyncio
     async def test_patch_user_forbidden(self, mock_db, current_user_dict, sample_user_read):
@@ -158,12 +175,16 @@ class TestEraseUser:
             mock_crud.get = AsyncMock(return_value=sample_user_read)
             mock_crud.delete = AsyncMock(return_value=None)
 
-            with patch("app.api.v1.users.blacklist_token", new_callable=AsyncMock) as mock_blacklist:
+            with (
+                patch("app.api.v1.users.blacklist_token", new_callable=AsyncMock) as mock_blacklist,
+                patch("app.api.v1.users.invalidate_principals", new_callable=AsyncMock) as mock_invalidate,
+            ):
                 result = await erase_user(Mock(), username, current_user_dict, mock_db, token)
 
                 assert result == {"message": "User deleted"}
                 mock_crud.delete.assert_called_once_with(db=mock_db, username=username)
                 mock_blacklist.assert_called_once_with(token=token, db=mock_db)
+                mock_invalidate.assert_awaited_once_with(username)
 
     @pytest.mark.asyncio
     async def test_erase_user_not_found(self, mock_db, current_user_dict):